@@ -0,0 +1,199 @@
+"""
+Load test of the cat API. It sends a mix of create, get, list and delete requests to
+ujcatapi.main:app in-process through ASGI, from a number of concurrent clients, and prints the
+requests per second and the p50/p95/p99 latencies, overall and per operation, as JSON.
+
+By default Cats are stored in an in-memory stand-in for MongoDB, so that the numbers show the
+cost of the API itself. With --mongo test they are stored in the database of MONGODB_URL, which
+must be a test database since its cats collection is emptied before and after the run.
+
+Usage:
+    poetry run python -m benchmarks.api_load [--mongo memory|test] [--concurrency 10]
+        [--requests 2000] [--mix create=1,get=4,list=4,delete=1] [--seed-cats 1000]
+        [--page-size 50] [--output api_load.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Tuple
+
+from starlette.types import ASGIApp
+
+from benchmarks import asgi
+from benchmarks.in_memory_mongo import InMemoryClient
+from ujcatapi import config, dto
+from ujcatapi.libs import dates
+from ujcatapi.main import app
+from ujcatapi.models import cat_model, common
+
+OPERATIONS = ["create", "get", "list", "delete"]
+
+
+def _parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for element in mix.split(","):
+        operation, _, weight = element.partition("=")
+        if operation.strip() not in OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                f"{operation} is not an operation. Choices are: {', '.join(OPERATIONS)}."
+            )
+        weights[operation.strip()] = int(weight)
+    return weights
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    # Nearest-rank percentile.
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(percent / 100 * len(sorted_values)) - 1)]
+
+
+def _summarize(latencies: List[float], errors: int, duration: float) -> Dict[str, Any]:
+    sorted_latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / duration, 1),
+        "latency_ms": {
+            name: round(_percentile(sorted_latencies, percent) * 1000, 3)
+            for name, percent in [("p50", 50), ("p95", 95), ("p99", 99), ("max", 100)]
+        },
+    }
+
+
+class _LoadTest:
+    def __init__(self, asgi_app: ASGIApp, page_size: int, rng: random.Random):
+        self.app = asgi_app
+        self.page_size = page_size
+        self.rng = rng
+        self.cat_ids: List[dto.CatID] = []
+        self.latencies: Dict[str, List[float]] = {operation: [] for operation in OPERATIONS}
+        self.errors: Dict[str, int] = {operation: 0 for operation in OPERATIONS}
+
+    async def seed(self, count: int) -> None:
+        now = dates.get_utcnow()
+        for start in range(0, count, config.CAT_BATCH_MAX_SIZE):
+            new_cats = [
+                dto.UnsavedCat(name=f"Load Test Cat {uuid.uuid4().hex}")
+                for _ in range(min(config.CAT_BATCH_MAX_SIZE, count - start))
+            ]
+            cats = await cat_model.create_cats(new_cats, now=now)
+            self.cat_ids.extend(cat.id for cat in cats if isinstance(cat, dto.Cat))
+
+    async def _send(self, operation: str) -> Tuple[int, bytes]:
+        if operation == "create":
+            body = json.dumps({"name": f"Load Test Cat {uuid.uuid4().hex}"}).encode()
+            messages = await asgi.request(
+                self.app,
+                "POST",
+                "/v1/cats",
+                body=body,
+                headers=[(b"content-type", b"application/json")],
+            )
+        elif operation == "get":
+            cat_id = self.rng.choice(self.cat_ids)
+            messages = await asgi.request(self.app, "GET", f"/v1/cats/{cat_id}")
+        elif operation == "list":
+            query_string = f"page_number=1&page_size={self.page_size}".encode()
+            messages = await asgi.request(self.app, "GET", "/v1/cats", query_string=query_string)
+        else:
+            cat_id = self.cat_ids.pop(self.rng.randrange(len(self.cat_ids)))
+            messages = await asgi.request(self.app, "DELETE", f"/v1/cats/{cat_id}")
+        return asgi.response_start(messages)["status"], asgi.response_body(messages)
+
+    async def _client(self, operations: Iterator[str]) -> None:
+        # All clients take their next operation from the same iterator.
+        for operation in operations:
+            if operation in ("get", "delete") and not self.cat_ids:
+                operation = "create"
+
+            start = time.perf_counter()
+            status_code, body = await self._send(operation)
+            self.latencies[operation].append(time.perf_counter() - start)
+
+            if status_code >= 400:
+                self.errors[operation] += 1
+            elif operation == "create":
+                self.cat_ids.append(json.loads(body)["id"])
+
+    async def run(self, operations: List[str], concurrency: int) -> Dict[str, Any]:
+        iterator = iter(operations)
+        start = time.perf_counter()
+        await asyncio.gather(*(self._client(iterator) for _ in range(concurrency)))
+        duration = time.perf_counter() - start
+
+        all_latencies = [latency for latencies in self.latencies.values() for latency in latencies]
+        return {
+            "duration_seconds": round(duration, 3),
+            **_summarize(all_latencies, sum(self.errors.values()), duration),
+            "operations": {
+                operation: _summarize(self.latencies[operation], self.errors[operation], duration)
+                for operation in OPERATIONS
+                if self.latencies[operation]
+            },
+        }
+
+
+async def _clear_cats() -> None:
+    collection = await common.get_collection("cats")
+    await collection.delete_many({})
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.mongo == "memory":
+        common._db = InMemoryClient().get_database()
+    elif not config.MONGODB_URL.endswith("_test"):
+        raise SystemExit("--mongo test empties the cats collection, use a *_test database.")
+
+    rng = random.Random(args.seed)
+    load_test = _LoadTest(app, page_size=args.page_size, rng=rng)
+    operations = rng.choices(list(args.mix), weights=list(args.mix.values()), k=args.requests)
+
+    await app.router.startup()
+    try:
+        await _clear_cats()
+        await load_test.seed(args.seed_cats)
+        results = await load_test.run(operations, concurrency=args.concurrency)
+        await _clear_cats()
+    finally:
+        await app.router.shutdown()
+
+    return {
+        "version": config.VERSION,
+        "mongo": args.mongo,
+        "concurrency": args.concurrency,
+        "mix": args.mix,
+        "seed_cats": args.seed_cats,
+        **results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mongo", choices=["memory", "test"], default="memory")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--mix", type=_parse_mix, default="create=1,get=4,list=4,delete=1")
+    parser.add_argument("--seed-cats", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random operation mix.")
+    parser.add_argument("--output", help="File to write the results to instead of stdout.")
+    args = parser.parse_args()
+
+    # Request logs would make the run measure the terminal.
+    logging.disable(logging.INFO)
+    results = json.dumps(asyncio.run(_main(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(results + "\n")
+    else:
+        print(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Helpers to send requests to an ASGI app in-process, without a server or an HTTP client, so that
+benchmarks measure the app rather than I/O.
+"""
+import asyncio
+from typing import Iterable, List, Tuple
+
+from starlette.types import ASGIApp, Message
+
+
+async def request(
+    app: ASGIApp,
+    method: str,
+    path: str,
+    query_string: bytes = b"",
+    body: bytes = b"",
+    headers: Iterable[Tuple[bytes, bytes]] = (),
+) -> List[Message]:
+    """
+    Sends one request to the app and returns the messages it sent back.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string,
+        "headers": [(b"host", b"localhost"), (b"content-length", str(len(body)).encode())]
+        + list(headers),
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 10000),
+    }
+    messages: List[Message] = []
+    request_sent = False
+    response_complete = asyncio.Event()
+
+    async def receive() -> Message:
+        # Like a server, this hands out the request once and then blocks until the client
+        # disconnects, which here is when the response has been sent.
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_complete.set()
+
+    await app(scope, receive, send)
+    return messages
+
+
+def response_start(messages: List[Message]) -> Message:
+    return next(message for message in messages if message["type"] == "http.response.start")
+
+
+def response_body(messages: List[Message]) -> bytes:
+    return b"".join(
+        message.get("body", b"") for message in messages if message["type"] == "http.response.body"
+    )
@@ -0,0 +1,119 @@
+"""
+Microbenchmark of the per-document cost of turning Cat documents read from MongoDB into a JSON
+response body. It compares the path list_cats and get_cat used to take (validated DTOs, a dict()
+per DTO, FastAPI's response_model validation and jsonable_encoder) with the FastJSONResponse path.
+
+Usage:
+    poetry run python -m benchmarks.cat_serialization [--documents 1000] [--repeat 5]
+"""
+import argparse
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, List
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from ujcatapi import dto
+from ujcatapi.models import cat_model
+from ujcatapi.models.common import BSONDocument, bson_id_to_cat_id
+from ujcatapi.responses import FastJSONResponse
+
+UTC = timezone.utc
+
+
+def _cat_documents(count: int) -> List[BSONDocument]:
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Sammybridge Cat {index}",
+            "ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+            "mtime": datetime(2020, 1, 2, 0, 0, tzinfo=UTC),
+        }
+        for index in range(count)
+    ]
+
+
+def _validated_list_response(documents: List[BSONDocument]) -> bytes:
+    cat_summaries = [
+        dto.CatSummary(id=bson_id_to_cat_id(document["_id"]), **document) for document in documents
+    ]
+    content = dto.ListResponse[dto.CatSummary](
+        results=cat_summaries, metadata=dto.PageMetadata(has_next_page=False)
+    )
+    # This is what FastAPI does with the returned value when the route has a response_model.
+    value = dto.ListResponse[dto.CatSummary](**content.dict(exclude_unset=True))
+    return JSONResponse(jsonable_encoder(value, exclude_unset=True)).body
+
+
+def _fast_list_response(documents: List[BSONDocument]) -> bytes:
+    cat_summaries = [cat_model.cat_summary_from_bson(document) for document in documents]
+    metadata = dto.PageMetadata(has_next_page=False)
+    return FastJSONResponse(
+        {
+            "results": [cat_summary.dict() for cat_summary in cat_summaries],
+            "metadata": metadata.dict(exclude_unset=True),
+        }
+    ).body
+
+
+def _validated_detail_response(document: BSONDocument) -> bytes:
+    cat = dto.Cat(
+        id=bson_id_to_cat_id(document["_id"]),
+        name=document["name"],
+        ctime=document["ctime"],
+        mtime=document["mtime"],
+    )
+    value = dto.Cat(**cat.dict())
+    return JSONResponse(jsonable_encoder(value, exclude_unset=True)).body
+
+
+def _fast_detail_response(document: BSONDocument) -> bytes:
+    return FastJSONResponse(cat_model.cat_from_bson(document).dict(exclude_unset=True)).body
+
+
+def _per_document_microseconds(
+    function: Callable[[], bytes], documents: int, number: int, repeat: int
+) -> float:
+    best = min(timeit.repeat(function, number=number, repeat=repeat))
+    return best / (number * documents) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = _cat_documents(args.documents)
+    assert _validated_list_response(documents) == _fast_list_response(documents)
+    assert _validated_detail_response(documents[0]) == _fast_detail_response(documents[0])
+
+    cases = [
+        (
+            "list_cats",
+            lambda: _validated_list_response(documents),
+            lambda: _fast_list_response(documents),
+            args.documents,
+            1,
+        ),
+        (
+            "get_cat",
+            lambda: _validated_detail_response(documents[0]),
+            lambda: _fast_detail_response(documents[0]),
+            1,
+            args.documents,
+        ),
+    ]
+    for name, before, after, documents_per_call, number in cases:
+        before_us = _per_document_microseconds(before, documents_per_call, number, args.repeat)
+        after_us = _per_document_microseconds(after, documents_per_call, number, args.repeat)
+        print(
+            f"{name}: {before_us:.2f} us/document before, {after_us:.2f} us/document after "
+            f"({before_us / after_us:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Microbenchmarks of the pure-Python functions that run on every request: parsing query
+parameters, building the Mongo match, turning documents into DTOs and rendering validation
+errors. Each case reports the best time per call, in microseconds, over a number of repeats.
+
+Timings can be saved as a baseline and later compared against it, e.g. before and after a change
+to the request pipeline. Baselines only compare well on the machine they were recorded on, so
+record one before making the change.
+
+Usage:
+    poetry run python -m benchmarks.hot_paths [--number 2000] [--repeat 20] [--filter name]
+        [--save [PATH]] [--compare [PATH]] [--threshold 0.2]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from typing import Any, Callable, Coroutine, Dict, List
+
+from bson import ObjectId
+from fastapi.exceptions import RequestValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import MissingError
+
+from ujcatapi import config, dto, error_handler, serializers
+from ujcatapi.models import cat_model
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "hot_paths.json")
+
+
+def _run_coroutine(coroutine: Coroutine) -> Any:
+    # The handlers do not await anything, so they complete on the first send and do not need an
+    # event loop, which would otherwise dominate the timing.
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("The coroutine did not complete without suspending.")
+
+
+def _cases() -> Dict[str, Callable[[], Any]]:
+    cat_filter = dto.CatFilter(
+        cat_id=dto.CatID("000000000000000000000101"),
+        name="Sammybridge Cat",
+        scope=dto.Scope(
+            type=dto.MembershipType.organization,
+            id=dto.OrganizationID("000000000000000000000b00"),
+        ),
+    )
+    cat_summary_document = {"_id": ObjectId("000000000000000000000101"), "name": "Sammybridge Cat"}
+    validation_error = RequestValidationError(
+        errors=[
+            ErrorWrapper(
+                exc=ValueError("'color' is not a valid CatSortKey"), loc=("query.sort_by",)
+            ),
+            ErrorWrapper(exc=MissingError(), loc=("body", "name")),
+        ]
+    )
+
+    return {
+        "serializers._cat_sort_by_from_str": lambda: serializers._cat_sort_by_from_str("-name,id"),
+        "serializers.scope_from_query_param": lambda: serializers.scope_from_query_param(
+            "org:000000000000000000000b00"
+        ),
+        "cat_model.cat_filter_to_db_match": lambda: cat_model.cat_filter_to_db_match(cat_filter),
+        "cat_model.cat_summary_from_bson": lambda: cat_model.cat_summary_from_bson(
+            cat_summary_document
+        ),
+        "error_handler.validation_exception_handler": lambda: _run_coroutine(
+            error_handler.validation_exception_handler(None, validation_error)  # type: ignore
+        ),
+    }
+
+
+def _measure(
+    cases: Dict[str, Callable[[], Any]], number: int, repeat: int
+) -> Dict[str, Dict[str, float]]:
+    # The cases take turns in every round, so that a noisy period of the machine affects all of
+    # them instead of one, and the best round of each case is kept.
+    best = {name: float("inf") for name in cases}
+    for _ in range(repeat):
+        for name, function in cases.items():
+            best[name] = min(best[name], timeit.timeit(function, number=number))
+    return {name: {"us_per_call": round(best[name] / number * 1e6, 3)} for name in cases}
+
+
+def _compare(
+    baseline: Dict[str, Dict[str, float]],
+    results: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """
+    Prints the change of each case against the baseline and returns the names of the cases that
+    got slower by more than the threshold, a fraction.
+    """
+    regressions = []
+    for name, result in results.items():
+        current = result["us_per_call"]
+        if name not in baseline:
+            print(f"{name}: {current:.3f} us (not in the baseline)")
+            continue
+
+        before = baseline[name]["us_per_call"]
+        change = current / before - 1
+        is_regression = change > threshold
+        if is_regression:
+            regressions.append(name)
+        print(
+            f"{name}: {before:.3f} us -> {current:.3f} us ({change:+.1%})"
+            f"{'  REGRESSION' if is_regression else ''}"
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--filter", default="", help="Only run the cases whose name contains it.")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE_PATH)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Slowdown, as a fraction, above which --compare reports a regression and fails.",
+    )
+    args = parser.parse_args()
+
+    cases = {name: function for name, function in _cases().items() if args.filter in name}
+    results = _measure(cases, number=args.number, repeat=args.repeat)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = _compare(baseline, results, threshold=args.threshold)
+        if regressions:
+            print(f"{len(regressions)} of {len(results)} cases got slower than the baseline.")
+            sys.exit(1)
+    else:
+        for name, result in results.items():
+            print(f"{name}: {result['us_per_call']:.3f} us")
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save), exist_ok=True)
+        with open(args.save, "w") as baseline_file:
+            json.dump(
+                {
+                    "version": config.VERSION,
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "number": args.number,
+                    "repeat": args.repeat,
+                    "results": results,
+                },
+                baseline_file,
+                indent=2,
+            )
+            baseline_file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+A small in-memory stand-in for the Motor database, in the spirit of mongomock-motor, for load
+tests that should measure the API rather than MongoDB. It implements only the collection
+methods and query operators that the models use, and enforces the unique Cat name index. Like
+MongoDB, it fails with an OperationFailure on query operators it does not know, see
+validate_match.
+"""
+import asyncio
+import copy
+import operator
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pymongo.errors
+from bson import ObjectId
+
+from ujcatapi.models.common import MONGO_DUPLICATION_ERROR, BSONDocument
+
+# Unique indexes per collection, see migrations/.
+UNIQUE_KEYS = {"cats": ["name"]}
+# The code of the error MongoDB fails a query with when it has an unknown operator.
+MONGO_BAD_VALUE_ERROR = 2
+
+# The value of a field that a document does not have. It equals null in queries, like in MongoDB,
+# but does not exist.
+_MISSING = object()
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
+_QUERY_OPERATORS = {"$in", "$exists", "$elemMatch", *_COMPARISONS}
+
+
+def validate_match(match: BSONDocument) -> None:
+    """
+    Fails with an OperationFailure, like MongoDB does, if the match has an operator that is not
+    implemented here.
+    """
+    for key, condition in match.items():
+        if key in ("$and", "$or"):
+            for sub_match in condition:
+                validate_match(sub_match)
+        elif key.startswith("$"):
+            raise pymongo.errors.OperationFailure(
+                f"unknown top level operator: {key}", code=MONGO_BAD_VALUE_ERROR
+            )
+        elif isinstance(condition, dict) and any(name.startswith("$") for name in condition):
+            for query_operator, operand in condition.items():
+                if query_operator not in _QUERY_OPERATORS:
+                    raise pymongo.errors.OperationFailure(
+                        f"unknown operator: {query_operator}", code=MONGO_BAD_VALUE_ERROR
+                    )
+                if query_operator == "$elemMatch":
+                    validate_match(operand)
+
+
+def _matches_operator(value: Any, query_operator: str, operand: Any) -> bool:
+    if query_operator == "$exists":
+        return (value is not _MISSING) == bool(operand)
+    if value is _MISSING:
+        value = None
+    if query_operator == "$in":
+        return value in operand
+    if query_operator == "$elemMatch":
+        return isinstance(value, list) and any(
+            isinstance(element, dict) and matches(element, operand) for element in value
+        )
+    # Any other operator is a comparison, see validate_match.
+    return value is not None and bool(_COMPARISONS[query_operator](value, operand))
+
+
+def _matches_condition(value: Any, condition: Any) -> bool:
+    if not isinstance(condition, dict) or not any(key.startswith("$") for key in condition):
+        return bool((None if value is _MISSING else value) == condition)
+
+    return all(
+        _matches_operator(value, query_operator, operand)
+        for query_operator, operand in condition.items()
+    )
+
+
+def matches(document: BSONDocument, match: BSONDocument) -> bool:
+    for key, condition in match.items():
+        if key == "$and":
+            if not all(matches(document, sub_match) for sub_match in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(document, sub_match) for sub_match in condition):
+                return False
+        elif not _matches_condition(document.get(key, _MISSING), condition):
+            return False
+    return True
+
+
+async def _round_trip() -> None:
+    # Lets other requests run, like awaiting a reply from the server would.
+    await asyncio.sleep(0)
+
+
+def _sort_key(value: Any, collation: Any) -> Tuple[bool, Any]:
+    # Missing values sort first, like null does in MongoDB. A collation with a locale compares
+    # strings case-insensitively at the default strength.
+    if collation is not None and isinstance(value, str):
+        value = value.casefold()
+    return value is not None, value
+
+
+def _project(document: BSONDocument, projection: Optional[BSONDocument]) -> BSONDocument:
+    if projection is None:
+        return document
+    # Like MongoDB, an inclusion projection returns the _id unless it is excluded.
+    fields = {"_id": 1, **projection}
+    return {key: document[key] for key, include in fields.items() if include and key in document}
+
+
+class InMemoryCursor:
+    def __init__(
+        self,
+        documents: List[BSONDocument],
+        projection: Optional[BSONDocument],
+        sort: Optional[Sequence[Tuple[str, int]]],
+        collation: Any,
+    ):
+        self._documents = documents
+        self._projection = projection
+        self._sort = list(sort or [])
+        self._collation = collation
+        self._skip = 0
+        self._limit = 0
+
+    def skip(self, skip: int) -> "InMemoryCursor":
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int) -> "InMemoryCursor":
+        self._limit = limit
+        return self
+
+    def _results(self) -> List[BSONDocument]:
+        documents = self._documents
+        for key, order in reversed(self._sort):
+            documents = sorted(
+                documents,
+                key=lambda document: _sort_key(document.get(key), self._collation),
+                reverse=order == pymongo.DESCENDING,
+            )
+        documents = documents[self._skip :]
+        if self._limit:
+            documents = documents[: self._limit]
+        return [_project(document, self._projection) for document in documents]
+
+    async def __aiter__(self) -> AsyncIterator[BSONDocument]:
+        for document in self._results():
+            await _round_trip()
+            yield copy.deepcopy(document)
+
+
+class _InsertOneResult:
+    def __init__(self, inserted_id: ObjectId):
+        self.inserted_id = inserted_id
+
+
+class _DeleteResult:
+    def __init__(self, deleted_count: int):
+        self.deleted_count = deleted_count
+
+
+class InMemoryCollection:
+    def __init__(self, name: str):
+        self.name = name
+        self._documents: Dict[ObjectId, BSONDocument] = {}
+        # Per unique key, the _id of the document holding each value.
+        self._unique_indexes: Dict[str, Dict[Any, ObjectId]] = {
+            key: {} for key in UNIQUE_KEYS.get(name, [])
+        }
+
+    def _insert(self, document: BSONDocument) -> ObjectId:
+        document.setdefault("_id", ObjectId())
+        for key, index in self._unique_indexes.items():
+            if document.get(key) in index:
+                raise pymongo.errors.DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.name} index: {key}_1",
+                    code=MONGO_DUPLICATION_ERROR,
+                )
+        for key, index in self._unique_indexes.items():
+            index[document.get(key)] = document["_id"]
+        self._documents[document["_id"]] = copy.deepcopy(document)
+        return document["_id"]
+
+    def _delete(self, document: BSONDocument) -> None:
+        for key, index in self._unique_indexes.items():
+            index.pop(document.get(key), None)
+        del self._documents[document["_id"]]
+
+    def _find(self, match: BSONDocument) -> List[BSONDocument]:
+        validate_match(match)
+        # Lookups by _id use the primary key instead of scanning the collection.
+        if isinstance(match.get("_id"), ObjectId):
+            document = self._documents.get(match["_id"])
+            return [document] if document is not None and matches(document, match) else []
+        return [document for document in self._documents.values() if matches(document, match)]
+
+    async def insert_one(self, document: BSONDocument, **kwargs: Any) -> _InsertOneResult:
+        await _round_trip()
+        return _InsertOneResult(self._insert(document))
+
+    async def insert_many(
+        self, documents: Iterable[BSONDocument], ordered: bool = True, **kwargs: Any
+    ) -> None:
+        await _round_trip()
+        write_errors = []
+        for index, document in enumerate(documents):
+            try:
+                self._insert(document)
+            except pymongo.errors.DuplicateKeyError as e:
+                write_errors.append({"index": index, "code": e.code, "errmsg": str(e)})
+                if ordered:
+                    break
+        if write_errors:
+            raise pymongo.errors.BulkWriteError({"writeErrors": write_errors})
+
+    async def find_one(self, match: BSONDocument, **kwargs: Any) -> Optional[BSONDocument]:
+        await _round_trip()
+        found = self._find(match)
+        return copy.deepcopy(found[0]) if found else None
+
+    def find(
+        self,
+        match: BSONDocument,
+        projection: Optional[BSONDocument] = None,
+        sort: Optional[Sequence[Tuple[str, int]]] = None,
+        collation: Any = None,
+        limit: int = 0,
+        **kwargs: Any,
+    ) -> InMemoryCursor:
+        return InMemoryCursor(self._find(match), projection, sort, collation).limit(limit)
+
+    async def delete_one(self, match: BSONDocument, **kwargs: Any) -> _DeleteResult:
+        await _round_trip()
+        found = self._find(match)
+        if found:
+            self._delete(found[0])
+        return _DeleteResult(len(found[:1]))
+
+    async def find_one_and_delete(
+        self, match: BSONDocument, projection: Optional[BSONDocument] = None, **kwargs: Any
+    ) -> Optional[BSONDocument]:
+        await _round_trip()
+        found = self._find(match)
+        if not found:
+            return None
+        self._delete(found[0])
+        return copy.deepcopy(_project(found[0], projection))
+
+    async def delete_many(self, match: BSONDocument, **kwargs: Any) -> _DeleteResult:
+        await _round_trip()
+        found = self._find(match)
+        for document in found:
+            self._delete(document)
+        return _DeleteResult(len(found))
+
+
+class InMemoryDatabase:
+    def __init__(self, client: "InMemoryClient"):
+        self.client = client
+        self._collections: Dict[str, InMemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = InMemoryCollection(name)
+        return self._collections[name]
+
+    async def command(self, command: str) -> BSONDocument:
+        await _round_trip()
+        return {"ok": 1.0}
+
+
+class InMemoryClient:
+    def __init__(self) -> None:
+        self._database = InMemoryDatabase(self)
+
+    def get_database(self) -> InMemoryDatabase:
+        return self._database
+
+    def close(self) -> None:
+        pass
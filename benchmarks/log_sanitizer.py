@@ -0,0 +1,74 @@
+"""
+Microbenchmark of log_sanitizer._sanitize_string on long log lines. It compares the previous
+implementation (one regex scan per sensitive field plus one re.sub per email) with the current
+one, after checking that both give the same output.
+
+Usage:
+    poetry run python -m benchmarks.log_sanitizer [--length 2000] [--lines 1000] [--repeat 5]
+"""
+import argparse
+import re
+import timeit
+from typing import Callable, List
+
+from ujcatapi.libs import log_sanitizer
+
+_LEGACY_SENSITIVE_FIELD_PATTERNS = [
+    re.compile(
+        f"({field}|'{field}'|\"{field}\"){log_sanitizer.SEPARATOR_PATTERN}"
+        f"{log_sanitizer.VALUE_PATTERN}"
+    )
+    for field in log_sanitizer.SENSITIVE_FIELDS
+]
+
+
+def _legacy_sanitize_string(msg: str) -> str:
+    for email in log_sanitizer.EMAIL_PATTERN.findall(msg):
+        msg = msg.replace(
+            email,
+            re.sub(log_sanitizer.EMAIL_REPLACEMENT, log_sanitizer.EMAIL_SUBSTITUTION, email),
+        )
+    for field_pattern in _LEGACY_SENSITIVE_FIELD_PATTERNS:
+        msg = field_pattern.sub(log_sanitizer.FIELD_SUBSTITUTION_PATTERN, msg)
+    return msg
+
+
+def _log_lines(length: int) -> List[str]:
+    filler = "Successfully created Cat 000000000000000000000101 in Ujcatapi. "
+    clean = (filler * (length // len(filler) + 1))[:length]
+    with_fields = (
+        f"{clean[: length // 2]} {{'jwt': 'abcd.efg.hijk', 'access_token': '456', "
+        f"'credentials': {{'password': 'password'}}}} {clean[length // 2 :]}"
+    )
+    with_email = (
+        f"{clean[: length // 2]} email='alice@admin.sammybridge.com' {clean[length // 2 :]}"
+    )
+    return [clean, with_fields, with_email]
+
+
+def _lines_per_second(function: Callable[[str], str], line: str, lines: int, repeat: int) -> float:
+    best = min(timeit.repeat(lambda: function(line), number=lines, repeat=repeat))
+    return lines / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--length", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    names = ["no sensitive data", "sensitive fields", "email address"]
+    for name, line in zip(names, _log_lines(args.length)):
+        assert _legacy_sanitize_string(line) == log_sanitizer._sanitize_string(line)
+
+        before = _lines_per_second(_legacy_sanitize_string, line, args.lines, args.repeat)
+        after = _lines_per_second(log_sanitizer._sanitize_string, line, args.lines, args.repeat)
+        print(
+            f"{name}: {before:,.0f} lines/s before, {after:,.0f} lines/s after "
+            f"({after / before:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark of requests per second on GET /status, served in-process through ASGI without a
+server or an HTTP client, so that the cost of the middleware stack is not hidden by I/O. It
+compares the content-type middleware as a BaseHTTPMiddleware (@app.middleware("http")), as it
+was registered before, with the pure ASGI ContentTypeMiddleware, after checking that both send
+the same headers.
+
+Usage:
+    poetry run python -m benchmarks.status_requests [--requests 2000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Callable, List, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from starlette.types import ASGIApp, Message
+
+from benchmarks import asgi
+from ujcatapi.middlewares import ContentTypeMiddleware
+from ujcatapi.views import status_view
+
+
+def _legacy_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(status_view.router)
+
+    @app.middleware("http")
+    async def replace_content_type_header(request: Request, call_next: Callable) -> Response:
+        response = await call_next(request)
+        if response.headers.get("content-type") == "application/json":
+            response.headers["content-type"] = "application/json; charset=utf-8"
+        return response
+
+    return app
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(status_view.router)
+    app.add_middleware(ContentTypeMiddleware)
+    return app
+
+
+async def _request(app: ASGIApp) -> List[Message]:
+    return await asgi.request(app, "GET", "/status")
+
+
+def _response_headers(messages: List[Message]) -> List[Tuple[Any, ...]]:
+    return sorted(asgi.response_start(messages)["headers"])
+
+
+async def _requests_per_second(app: ASGIApp, requests: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await _request(app)
+        best = min(best, time.perf_counter() - start)
+    return requests / best
+
+
+async def _main(requests: int, repeat: int) -> None:
+    legacy_app, app = _legacy_app(), _app()
+    assert _response_headers(await _request(legacy_app)) == _response_headers(await _request(app))
+
+    before = await _requests_per_second(legacy_app, requests, repeat)
+    after = await _requests_per_second(app, requests, repeat)
+    print(
+        f"GET /status: {before:,.0f} requests/s before, {after:,.0f} requests/s after "
+        f"({after / before:.2f}x)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(_main(args.requests, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+load('helpers/runMigration.js');
+
+function migrate() {
+  // Holds the events of deleted Cats until the outbox relay publishes them.
+  const result = db.createCollection("event_outbox");
+
+  if (result.ok !== 1) {
+    throw new Error(tojson(result));
+  }
+}
+
+runMigration(migrate, 3);
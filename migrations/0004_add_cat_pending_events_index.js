@@ -0,0 +1,15 @@
+load('helpers/runMigration.js');
+
+function migrate() {
+  // Only Cats with outbox events that have not been published yet are indexed.
+  const result = db.cats.createIndex(
+    {"pending_events._id": 1},
+    {partialFilterExpression: {"pending_events": {"$exists": true}}}
+  );
+
+  if (result.ok !== 1) {
+    throw new Error(tojson(result));
+  }
+}
+
+runMigration(migrate, 4);
@@ -12,13 +12,14 @@ UNIT=false
 FIX=false
 TDD=false
 COVERAGE=false
+BENCHMARK=false
 
 exit_and_show_usage() {
-  echo "Usage: $0 [-fstucxd]" 1>&2
+  echo "Usage: $0 [-fstucbxd]" 1>&2
   exit 1
 }
 
-while getopts fstucxd OPT
+while getopts fstucbxd OPT
 do
   case $OPT in
     # task types
@@ -27,6 +28,7 @@ do
     't' ) TYPE=true ;;
     'u' ) UNIT=true ;;
     'c' ) COVERAGE=true ;;
+    'b' ) BENCHMARK=true ;;
     # options
     'x' ) FIX=true ;;
     'd' ) TDD=true ;;
@@ -35,7 +37,8 @@ do
 done
 
 # if no task is specified default to all tasks
-if [ "$FORMAT" = false ] && [ "$STYLE" = false ] && [ "$TYPE" = false ] && [ "$UNIT" = false ] && [ "$COVERAGE" = false ]; then
+# (benchmarks only run when asked for with -b)
+if [ "$FORMAT" = false ] && [ "$STYLE" = false ] && [ "$TYPE" = false ] && [ "$UNIT" = false ] && [ "$COVERAGE" = false ] && [ "$BENCHMARK" = false ]; then
   FORMAT=true
   STYLE=true
   TYPE=true
@@ -56,17 +59,17 @@ autoformat() {
   poetry run black . $BLACK_FLAG
 
   echo '---- format (isort) ----'
-  poetry run isort ujcatapi tests $ISORT_FLAG
+  poetry run isort ujcatapi tests benchmarks $ISORT_FLAG
 }
 
 check_style() {
   echo '---- style ----'
-  poetry run flake8 ujcatapi tests
+  poetry run flake8 ujcatapi tests benchmarks
 }
 
 check_type() {
   echo '---- type ----'
-  poetry run mypy ujcatapi tests
+  poetry run mypy ujcatapi tests benchmarks
 }
 
 check_unit() {
@@ -97,6 +100,12 @@ check_coverage() {
   fi
 }
 
+run_benchmark() {
+  echo '---- benchmark ----'
+  # Extra arguments for the load test can be passed with BENCHMARK_ARGS, e.g. "--mongo test".
+  poetry run python -m benchmarks.api_load $BENCHMARK_ARGS
+}
+
 if $FORMAT; then
   autoformat
 fi
@@ -112,3 +121,6 @@ fi
 if $COVERAGE; then
   check_coverage
 fi
+if $BENCHMARK; then
+  run_benchmark
+fi
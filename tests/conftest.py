@@ -39,6 +39,7 @@ def mock_config(monkeypatch: Any) -> None:
     """
     monkeypatch.setattr("ujcatapi.config.ENABLE_FOO", "true")
     monkeypatch.setattr("ujcatapi.config.ENABLE_BAR", "false")
+    monkeypatch.setattr("ujcatapi.config.ENABLE_MONGODB", False)
 
 
 @pytest.fixture(autouse=True)
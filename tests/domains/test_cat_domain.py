@@ -1,4 +1,5 @@
 from datetime import datetime, timezone
+from typing import Any
 from unittest import mock
 
 import pytest
@@ -6,10 +7,17 @@ import pytest
 from tests import conftest
 from ujcatapi import dto
 from ujcatapi.domains import cat_domain
+from ujcatapi.events import cat_events
+from ujcatapi.exceptions import DuplicateCatError
 
 UTC = timezone.utc
 
 
+@pytest.fixture(autouse=True)
+def clear_cat_cache() -> None:
+    cat_domain._cat_cache.clear()
+
+
 @pytest.mark.parametrize(
     "new_cat, expected_cat",
     [
@@ -26,12 +34,14 @@ UTC = timezone.utc
         )
     ],
 )
+@mock.patch("ujcatapi.events.cat_events.fire_cat_created")
 @mock.patch("ujcatapi.models.cat_model.create_cat")
 @mock.patch("ujcatapi.libs.dates.get_utcnow")
 @conftest.async_test
 async def test_create_cat(
     mock_utcnow: mock.Mock,
     mock_cat_model_create_cat: mock.Mock,
+    mock_fire_cat_created: mock.Mock,
     new_cat: dto.UnsavedCat,
     expected_cat: dto.Cat,
 ) -> None:
@@ -44,6 +54,98 @@ async def test_create_cat(
     mock_cat_model_create_cat.assert_called_once_with(
         new_cat, now=datetime(2019, 1, 1, 23, 59, tzinfo=UTC)
     )
+    mock_fire_cat_created.assert_called_once_with(expected_cat.id)
+
+
+@pytest.mark.parametrize(
+    "new_cat, expected_cat",
+    [
+        (
+            dto.UnsavedCat(name="Sammybridge Cat"),
+            dto.Cat(
+                id=dto.CatID("000000000000000000000101"),
+                name="Sammybridge Cat",
+                ctime=datetime(2019, 1, 1, 23, 59, tzinfo=UTC),
+                mtime=datetime(2019, 1, 1, 23, 59, tzinfo=UTC),
+            ),
+        )
+    ],
+)
+@mock.patch("ujcatapi.events.cat_events.fire_cat_created")
+@mock.patch("ujcatapi.models.cat_model.create_cat")
+@mock.patch("ujcatapi.libs.dates.get_utcnow")
+@conftest.async_test
+async def test_create_cat_with_event_outbox(
+    mock_utcnow: mock.Mock,
+    mock_cat_model_create_cat: mock.Mock,
+    mock_fire_cat_created: mock.Mock,
+    new_cat: dto.UnsavedCat,
+    expected_cat: dto.Cat,
+    monkeypatch: Any,
+) -> None:
+    monkeypatch.setattr("ujcatapi.config.ENABLE_EVENT_OUTBOX", True)
+    now = datetime(2019, 1, 1, 23, 59, tzinfo=UTC)
+    mock_utcnow.return_value = now
+    mock_cat_model_create_cat.return_value = expected_cat
+
+    result = await cat_domain.create_cat(new_cat)
+
+    assert result == expected_cat
+    mock_cat_model_create_cat.assert_called_once_with(
+        new_cat, now=now, created_event=cat_events.cat_created_event
+    )
+    mock_fire_cat_created.assert_not_called()
+
+
+@mock.patch("ujcatapi.events.cat_events.fire_cats_created")
+@mock.patch("ujcatapi.models.cat_model.create_cats")
+@mock.patch("ujcatapi.libs.dates.get_utcnow")
+@conftest.async_test
+async def test_create_cats(
+    mock_utcnow: mock.Mock,
+    mock_cat_model_create_cats: mock.Mock,
+    mock_fire_cats_created: mock.Mock,
+) -> None:
+    now = datetime(2019, 1, 1, 23, 59, tzinfo=UTC)
+    mock_utcnow.return_value = now
+    new_cats = [dto.UnsavedCat(name="Sammybridge Cat"), dto.UnsavedCat(name="Gengo Cat")]
+    results = [
+        DuplicateCatError("Cat with name Sammybridge Cat already exists."),
+        dto.Cat(id=dto.CatID("000000000000000000000102"), name="Gengo Cat", ctime=now, mtime=now),
+    ]
+    mock_cat_model_create_cats.return_value = results
+
+    assert await cat_domain.create_cats(new_cats) == results
+    mock_utcnow.assert_called_once_with()
+    mock_cat_model_create_cats.assert_called_once_with(new_cats, now=now)
+    mock_fire_cats_created.assert_called_once_with(["000000000000000000000102"])
+
+
+@mock.patch("ujcatapi.events.cat_events.fire_cats_created")
+@mock.patch("ujcatapi.models.cat_model.create_cats")
+@mock.patch("ujcatapi.libs.dates.get_utcnow")
+@conftest.async_test
+async def test_create_cats_with_event_outbox(
+    mock_utcnow: mock.Mock,
+    mock_cat_model_create_cats: mock.Mock,
+    mock_fire_cats_created: mock.Mock,
+    monkeypatch: Any,
+) -> None:
+    monkeypatch.setattr("ujcatapi.config.ENABLE_EVENT_OUTBOX", True)
+    now = datetime(2019, 1, 1, 23, 59, tzinfo=UTC)
+    mock_utcnow.return_value = now
+    new_cats = [dto.UnsavedCat(name="Sammybridge Cat"), dto.UnsavedCat(name="Gengo Cat")]
+    results = [
+        DuplicateCatError("Cat with name Sammybridge Cat already exists."),
+        dto.Cat(id=dto.CatID("000000000000000000000102"), name="Gengo Cat", ctime=now, mtime=now),
+    ]
+    mock_cat_model_create_cats.return_value = results
+
+    assert await cat_domain.create_cats(new_cats) == results
+    mock_cat_model_create_cats.assert_called_once_with(
+        new_cats, now=now, created_event=cat_events.cat_created_event
+    )
+    mock_fire_cats_created.assert_not_called()
 
 
 @pytest.mark.parametrize(
@@ -63,6 +165,37 @@ async def test_find_one(mock_cat_model_find_one: mock.Mock, cat_filter: dto.CatF
     mock_cat_model_find_one.assert_called_once_with(cat_filter=cat_filter)
 
 
+@mock.patch("ujcatapi.models.cat_model.find_many_by_ids")
+@conftest.async_test
+async def test_find_many_by_ids(mock_cat_model_find_many_by_ids: mock.Mock) -> None:
+    cats = [
+        dto.Cat(
+            id=dto.CatID(cat_id),
+            name=f"Sammybridge Cat {cat_id}",
+            ctime=datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+            mtime=datetime(2020, 1, 2, 0, 0, tzinfo=UTC),
+        )
+        for cat_id in ["000000000000000000000102", "000000000000000000000101"]
+    ]
+    mock_cat_model_find_many_by_ids.return_value = cats
+    scope = dto.Scope(
+        id=dto.OrganizationID("000000000000000000000b00"), type=dto.MembershipType.organization
+    )
+    cat_ids = [
+        dto.CatID("000000000000000000000101"),
+        dto.CatID("000000000000000000000103"),
+        dto.CatID("000000000000000000000102"),
+        dto.CatID("000000000000000000000101"),
+    ]
+
+    result = await cat_domain.find_many_by_ids(cat_ids=cat_ids, scope=scope)
+
+    assert result == dto.CatBatchGetResponse(
+        results=[cats[1], cats[0]], not_found=[dto.CatID("000000000000000000000103")]
+    )
+    mock_cat_model_find_many_by_ids.assert_called_once_with(cat_ids=cat_ids[:3], scope=scope)
+
+
 @pytest.mark.parametrize(
     "cat_filter, cat_sort_params, page",
     [
@@ -100,25 +233,261 @@ async def test_find_many(
     )
 
 
+@pytest.mark.parametrize(
+    "cat_filter, cat_sort_params, page",
+    [
+        (
+            dto.CatFilter(name="Sammybridge Cat"),
+            [dto.CatSortPredicate(key=dto.CatSortKey.name, order=dto.SortOrder.desc)],
+            dto.Page(number=1, size=30),
+        )
+    ],
+)
+@mock.patch("ujcatapi.models.cat_model.stream_many")
+@conftest.async_test
+async def test_stream_many(
+    mock_cat_model_stream_many: mock.Mock,
+    cat_filter: dto.CatFilter,
+    cat_sort_params: dto.CatSortPredicates,
+    page: dto.Page,
+) -> None:
+    await cat_domain.stream_many(
+        cat_filter=cat_filter,
+        cat_sort_params=cat_sort_params,
+        page=page,
+    )
+
+    mock_cat_model_stream_many.assert_called_once_with(
+        cat_filter=cat_filter,
+        cat_sort_params=cat_sort_params,
+        page=page,
+    )
+
+
 @pytest.mark.parametrize(
     "cat_id",
     [dto.CatID("000000000000000000000101")],
 )
+@mock.patch("ujcatapi.events.cat_events.fire_cat_deleted")
 @mock.patch("ujcatapi.models.cat_model.delete_one")
 @conftest.async_test
-async def test_delete_one(mock_cat_model_delete_one: mock.Mock, cat_id: dto.CatID) -> None:
+async def test_delete_one(
+    mock_cat_model_delete_one: mock.Mock, mock_fire_cat_deleted: mock.Mock, cat_id: dto.CatID
+) -> None:
+    mock_cat_model_delete_one.return_value = dto.DeletedCats(
+        deleted_count=1, cat_ids=[cat_id], pending_events=[]
+    )
+
     await cat_domain.delete_one(cat_id)
 
     mock_cat_model_delete_one.assert_called_once_with(cat_id=cat_id)
+    mock_fire_cat_deleted.assert_called_once_with(cat_id)
 
 
 @pytest.mark.parametrize(
     "cat_id",
     [dto.CatID("000000000000000000000201")],
 )
+@mock.patch("ujcatapi.events.cat_events.fire_cat_deleted")
 @mock.patch("ujcatapi.models.cat_model.delete_one")
 @conftest.async_test
-async def test_delete_not_found(mock_cat_model_delete_one: mock.Mock, cat_id: dto.CatID) -> None:
+async def test_delete_not_found(
+    mock_cat_model_delete_one: mock.Mock, mock_fire_cat_deleted: mock.Mock, cat_id: dto.CatID
+) -> None:
+    mock_cat_model_delete_one.return_value = dto.DeletedCats(
+        deleted_count=0, cat_ids=[], pending_events=[]
+    )
+
     await cat_domain.delete_one(cat_id)
 
     mock_cat_model_delete_one.assert_called_once_with(cat_id=cat_id)
+    mock_fire_cat_deleted.assert_not_called()
+
+
+@pytest.mark.parametrize("is_deleted", [True, False])
+@mock.patch("ujcatapi.events.cat_events.fire_cat_deleted")
+@mock.patch("ujcatapi.events.cat_events.store_cats_deleted")
+@mock.patch("ujcatapi.models.cat_model.delete_one")
+@mock.patch("ujcatapi.libs.dates.get_utcnow")
+@conftest.async_test
+async def test_delete_one_with_event_outbox(
+    mock_utcnow: mock.Mock,
+    mock_cat_model_delete_one: mock.Mock,
+    mock_store_cats_deleted: mock.Mock,
+    mock_fire_cat_deleted: mock.Mock,
+    is_deleted: bool,
+    monkeypatch: Any,
+) -> None:
+    monkeypatch.setattr("ujcatapi.config.ENABLE_EVENT_OUTBOX", True)
+    now = datetime(2019, 1, 1, 23, 59, tzinfo=UTC)
+    mock_utcnow.return_value = now
+    cat_id = dto.CatID("000000000000000000000201")
+    deleted_cats = dto.DeletedCats(
+        deleted_count=int(is_deleted), cat_ids=[cat_id] if is_deleted else [], pending_events=[]
+    )
+    mock_cat_model_delete_one.return_value = deleted_cats
+
+    assert await cat_domain.delete_one(cat_id) is is_deleted
+
+    mock_cat_model_delete_one.assert_called_once_with(cat_id=cat_id)
+    if is_deleted:
+        mock_store_cats_deleted.assert_called_once_with(deleted_cats, now=now)
+    else:
+        mock_store_cats_deleted.assert_not_called()
+    mock_fire_cat_deleted.assert_not_called()
+
+
+@mock.patch("ujcatapi.models.cat_model.find_one")
+@conftest.async_test
+async def test_find_one_cached(mock_cat_model_find_one: mock.Mock, monkeypatch: Any) -> None:
+    monkeypatch.setattr("ujcatapi.config.ENABLE_CAT_CACHE", True)
+    cat = dto.Cat(
+        id=dto.CatID("000000000000000000000101"),
+        name="Sammybridge Cat",
+        ctime=datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+        mtime=datetime(2020, 1, 2, 0, 0, tzinfo=UTC),
+    )
+    mock_cat_model_find_one.return_value = cat
+    scope = dto.Scope(
+        id=dto.OrganizationID("000000000000000000000b00"), type=dto.MembershipType.organization
+    )
+
+    results = [
+        await cat_domain.find_one(dto.CatFilter(cat_id=cat.id)),
+        await cat_domain.find_one(dto.CatFilter(cat_id=cat.id)),
+        await cat_domain.find_one(dto.CatFilter(cat_id=cat.id, scope=scope)),
+    ]
+
+    assert results == [cat, cat, cat]
+    assert mock_cat_model_find_one.call_args_list == [
+        mock.call(cat_filter=dto.CatFilter(cat_id=cat.id)),
+        mock.call(cat_filter=dto.CatFilter(cat_id=cat.id, scope=scope)),
+    ]
+
+    cat_domain.invalidate_cached_cat(cat.id)
+    await cat_domain.find_one(dto.CatFilter(cat_id=cat.id))
+
+    assert mock_cat_model_find_one.call_count == 3
+    assert cat_domain.get_cat_cache_stats() == {
+        "enabled": True,
+        "size": 1,
+        "max_size": cat_domain._cat_cache.max_size,
+        "hits": 1,
+        "misses": 3,
+        "evictions": 0,
+    }
+
+
+@pytest.mark.parametrize(
+    "cat_filter",
+    [
+        dto.CatFilter(name="Sammybridge Cat"),
+        dto.CatFilter(cat_id=dto.CatID("000000000000000000000101"), name="Sammybridge Cat"),
+    ],
+)
+@mock.patch("ujcatapi.models.cat_model.find_one")
+@conftest.async_test
+async def test_find_one_not_cached(
+    mock_cat_model_find_one: mock.Mock, cat_filter: dto.CatFilter, monkeypatch: Any
+) -> None:
+    monkeypatch.setattr("ujcatapi.config.ENABLE_CAT_CACHE", True)
+
+    await cat_domain.find_one(cat_filter)
+    await cat_domain.find_one(cat_filter)
+
+    assert mock_cat_model_find_one.call_count == 2
+
+
+@mock.patch("ujcatapi.events.cat_events.fire_cat_deleted")
+@mock.patch("ujcatapi.models.cat_model.delete_one")
+@conftest.async_test
+async def test_delete_one_invalidates_cache(
+    mock_cat_model_delete_one: mock.Mock, mock_fire_cat_deleted: mock.Mock
+) -> None:
+    cat_id = dto.CatID("000000000000000000000101")
+    cat_domain._cat_cache.set((cat_id, None, None), mock.Mock())
+    mock_cat_model_delete_one.return_value = dto.DeletedCats(
+        deleted_count=1, cat_ids=[cat_id], pending_events=[]
+    )
+
+    await cat_domain.delete_one(cat_id)
+
+    assert cat_domain._cat_cache.get((cat_id, None, None)) is None
+    mock_fire_cat_deleted.assert_called_once_with(cat_id)
+
+
+@mock.patch("ujcatapi.events.cat_events.fire_cats_deleted")
+@mock.patch("ujcatapi.models.cat_model.delete_many")
+@conftest.async_test
+async def test_delete_many(
+    mock_cat_model_delete_many: mock.Mock, mock_fire_cats_deleted: mock.Mock
+) -> None:
+    deleted_cat_ids = [
+        dto.CatID("000000000000000000000101"),
+        dto.CatID("000000000000000000000102"),
+    ]
+    mock_cat_model_delete_many.return_value = dto.DeletedCats(
+        deleted_count=2, cat_ids=deleted_cat_ids, pending_events=[]
+    )
+    cat_domain._cat_cache.set((deleted_cat_ids[0], None, None), mock.Mock())
+    cat_domain._cat_cache.set((dto.CatID("000000000000000000000103"), None, None), mock.Mock())
+    cat_filter = dto.CatFilter(name="Sammybridge Cat")
+
+    assert await cat_domain.delete_many(cat_filter=cat_filter) == 2
+
+    mock_cat_model_delete_many.assert_called_once_with(cat_filter=cat_filter, cat_ids=None)
+    mock_fire_cats_deleted.assert_called_once_with(deleted_cat_ids)
+    assert cat_domain._cat_cache.stats()["size"] == 1
+
+
+@mock.patch("ujcatapi.events.cat_events.fire_cats_deleted")
+@mock.patch("ujcatapi.models.cat_model.delete_many")
+@conftest.async_test
+async def test_delete_many_none_deleted(
+    mock_cat_model_delete_many: mock.Mock, mock_fire_cats_deleted: mock.Mock
+) -> None:
+    mock_cat_model_delete_many.return_value = dto.DeletedCats(
+        deleted_count=0, cat_ids=[], pending_events=[]
+    )
+
+    assert await cat_domain.delete_many(dto.CatFilter(name="Sammybridge Cat")) == 0
+
+    mock_fire_cats_deleted.assert_not_called()
+
+
+@mock.patch("ujcatapi.events.cat_events.fire_cats_deleted")
+@mock.patch("ujcatapi.events.cat_events.store_cats_deleted")
+@mock.patch("ujcatapi.models.cat_model.delete_chunk")
+@mock.patch("ujcatapi.libs.dates.get_utcnow")
+@conftest.async_test
+async def test_delete_many_with_event_outbox(
+    mock_utcnow: mock.Mock,
+    mock_cat_model_delete_chunk: mock.Mock,
+    mock_store_cats_deleted: mock.Mock,
+    mock_fire_cats_deleted: mock.Mock,
+    monkeypatch: Any,
+) -> None:
+    monkeypatch.setattr("ujcatapi.config.ENABLE_EVENT_OUTBOX", True)
+    now = datetime(2019, 1, 1, 23, 59, tzinfo=UTC)
+    mock_utcnow.return_value = now
+    first_chunk = [dto.CatID("000000000000000000000101"), dto.CatID("000000000000000000000102")]
+    second_chunk = [dto.CatID("000000000000000000000103")]
+    first_deleted_cats = dto.DeletedCats(deleted_count=2, cat_ids=first_chunk, pending_events=[])
+    second_deleted_cats = dto.DeletedCats(deleted_count=1, cat_ids=second_chunk, pending_events=[])
+    mock_cat_model_delete_chunk.side_effect = [
+        (first_deleted_cats, True),
+        (second_deleted_cats, True),
+        (dto.DeletedCats(deleted_count=0, cat_ids=[], pending_events=[]), False),
+    ]
+    cat_domain._cat_cache.set((second_chunk[0], None, None), mock.Mock())
+    cat_filter = dto.CatFilter(name="Sammybridge Cat")
+
+    assert await cat_domain.delete_many(cat_filter=cat_filter) == 3
+
+    assert mock_cat_model_delete_chunk.call_args_list == [mock.call(cat_filter, cat_ids=None)] * 3
+    assert mock_store_cats_deleted.call_args_list == [
+        mock.call(first_deleted_cats, now=now),
+        mock.call(second_deleted_cats, now=now),
+    ]
+    mock_fire_cats_deleted.assert_not_called()
+    assert cat_domain._cat_cache.stats()["size"] == 0
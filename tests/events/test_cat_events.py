@@ -1,7 +1,16 @@
+from datetime import datetime, timezone
 from typing import Any
 from unittest import mock
 
-from ujcatapi.events.cat_events import fire_cat_created
+from tests import conftest
+from ujcatapi import dto
+from ujcatapi.events.cat_events import (
+    fire_cat_created,
+    fire_cat_deleted,
+    fire_cats_created,
+    fire_cats_deleted,
+    store_cats_deleted,
+)
 
 
 @mock.patch("ujcatapi.events.common.fire_event")
@@ -16,3 +25,61 @@ def test_fire_cat_created(mock_fire_event: mock.Mock, monkeypatch: Any) -> None:
         "cat.created",
         {"cat_id": "000000000000000000000001"},
     )
+
+
+@mock.patch("ujcatapi.events.common.fire_event")
+def test_fire_cat_deleted(mock_fire_event: mock.Mock) -> None:
+    fire_cat_deleted("000000000000000000000001")
+
+    mock_fire_event.assert_called_once_with(
+        "cat.deleted",
+        {"cat_id": "000000000000000000000001"},
+    )
+
+
+@mock.patch("ujcatapi.events.common.fire_event")
+def test_fire_cats_created(mock_fire_event: mock.Mock) -> None:
+    fire_cats_created(["000000000000000000000001", "000000000000000000000002"])
+
+    assert mock_fire_event.call_args_list == [
+        mock.call("cat.created", {"cat_id": "000000000000000000000001"}),
+        mock.call("cat.created", {"cat_id": "000000000000000000000002"}),
+    ]
+
+
+@mock.patch("ujcatapi.events.common.fire_event")
+def test_fire_cats_deleted(mock_fire_event: mock.Mock) -> None:
+    fire_cats_deleted(["000000000000000000000001", "000000000000000000000002"])
+
+    assert mock_fire_event.call_args_list == [
+        mock.call("cat.deleted", {"cat_id": "000000000000000000000001"}),
+        mock.call("cat.deleted", {"cat_id": "000000000000000000000002"}),
+    ]
+
+
+@mock.patch("ujcatapi.events.common.store_events")
+@conftest.async_test
+async def test_store_cats_deleted(mock_store_events: mock.Mock) -> None:
+    now = datetime(2020, 1, 1, 0, 0, tzinfo=timezone.utc)
+    pending_event = dto.OutboxEvent(
+        id=dto.OutboxEventID("000000000000000000000003"),
+        event_name="cat.created",
+        data={"cat_id": "000000000000000000000001"},
+        ctime=now,
+    )
+    deleted_cats = dto.DeletedCats(
+        deleted_count=2,
+        cat_ids=[dto.CatID("000000000000000000000001"), dto.CatID("000000000000000000000002")],
+        pending_events=[pending_event],
+    )
+
+    await store_cats_deleted(deleted_cats, now=now)
+
+    mock_store_events.assert_called_once_with(
+        [
+            ("cat.created", {"cat_id": "000000000000000000000001"}),
+            ("cat.deleted", {"cat_id": "000000000000000000000001"}),
+            ("cat.deleted", {"cat_id": "000000000000000000000002"}),
+        ],
+        now=now,
+    )
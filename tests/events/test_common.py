@@ -1,13 +1,52 @@
+from typing import Any
 from unittest import mock
 
-from ujcatapi.events.common import fire_event
+from ujcatapi.events.common import (
+    fire_event,
+    get_event_publisher_stats,
+    start_event_publisher,
+    stop_event_publisher,
+)
 
 
 @mock.patch("ujcatapi.events.common.get_producer")
-def test_fire_event(mock_get_producer: mock.Mock) -> None:
+def test_fire_event(mock_get_producer: mock.Mock, monkeypatch: Any) -> None:
+    monkeypatch.setattr("ujcatapi.config.ENABLE_AMQP", True)
     mock_producer = mock.Mock()
     mock_get_producer.return_value = mock_producer
 
     fire_event("event_name", {"foo": "bar"})
 
     mock_producer.produce.assert_called_with("event_name", {"foo": "bar"})
+
+
+@mock.patch("ujcatapi.events.common.get_producer")
+def test_fire_event_with_started_publisher(mock_get_producer: mock.Mock, monkeypatch: Any) -> None:
+    monkeypatch.setattr("ujcatapi.config.ENABLE_AMQP", True)
+    monkeypatch.setattr("ujcatapi.events.common._publisher", None)
+    mock_producer = mock.Mock()
+    mock_get_producer.return_value = mock_producer
+
+    start_event_publisher()
+    fire_event("event_name", {"foo": "bar"})
+    assert get_event_publisher_stats()["running"] is True
+    stop_event_publisher()
+
+    mock_producer.produce.assert_called_once_with("event_name", {"foo": "bar"})
+    assert get_event_publisher_stats() == {
+        "enabled": True,
+        "running": False,
+        "queued": 0,
+        "published": 1,
+        "retried": 0,
+        "dropped": 0,
+    }
+
+
+@mock.patch("ujcatapi.events.common.get_producer")
+def test_fire_event_amqp_disabled(mock_get_producer: mock.Mock, monkeypatch: Any) -> None:
+    monkeypatch.setattr("ujcatapi.config.ENABLE_AMQP", False)
+
+    fire_event("event_name", {"foo": "bar"})
+
+    mock_get_producer.assert_not_called()
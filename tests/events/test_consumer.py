@@ -0,0 +1,315 @@
+import threading
+from typing import Any, Dict, List
+from unittest import mock
+
+import pytest
+
+from ujcatapi import config, dto
+from ujcatapi.events.consumer import EventConsumerPool, EventHandlerMap
+from ujcatapi.metrics import EVENTS_CONSUMED_TOTAL
+
+
+def test_run_starts_one_consumer_per_worker() -> None:
+    started: List[EventHandlerMap] = []
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def run_consumer(event_handler_map: EventHandlerMap) -> None:
+        with lock:
+            started.append(event_handler_map)
+            is_last = len(started) == 3
+        # The last worker to start returns, which stops the pool.
+        if not is_last:
+            release.wait(5)
+
+    pool = EventConsumerPool(
+        consumer_factory=lambda event_handler_map: mock.Mock(
+            run=lambda: run_consumer(event_handler_map)
+        ),
+        event_handler_map={"ping": mock.Mock()},
+        workers=3,
+    )
+
+    pool.run()
+    release.set()
+
+    assert len(started) == 3
+    assert all(event_handler_map is pool.event_handler_map for event_handler_map in started)
+
+
+def test_run_stops_when_a_worker_fails() -> None:
+    consumer = mock.Mock()
+    consumer.run.side_effect = Exception("Connection lost")
+    pool = EventConsumerPool(
+        consumer_factory=lambda event_handler_map: consumer,
+        event_handler_map={},
+        workers=1,
+    )
+
+    pool.run()
+
+    consumer.run.assert_called_once_with()
+
+
+def test_sync_handler() -> None:
+    handler = mock.Mock(return_value=None)
+    pool = EventConsumerPool(
+        consumer_factory=mock.Mock(), event_handler_map={"cat.created": handler}, workers=1
+    )
+
+    pool.event_handler_map["cat.created"]({"cat_id": "000000000000000000000101"})
+
+    handler.assert_called_once_with({"cat_id": "000000000000000000000101"})
+
+
+def test_async_handler() -> None:
+    handled: List[dto.JSON] = []
+    loop_threads = []
+
+    async def handle_cat_created(data: dto.JSON) -> None:
+        loop_threads.append(threading.current_thread().name)
+        handled.append(data)
+
+    pool = EventConsumerPool(
+        consumer_factory=mock.Mock(),
+        event_handler_map={"cat.created": handle_cat_created},
+        workers=1,
+    )
+    pool.start_loop()
+    try:
+        pool.event_handler_map["cat.created"]({"cat_id": "000000000000000000000101"})
+    finally:
+        pool.stop_loop()
+
+    assert handled == [{"cat_id": "000000000000000000000101"}]
+    assert loop_threads == ["EventHandlerLoop"]
+
+
+def test_async_handler_exception_is_raised_to_consumer() -> None:
+    async def handle_cat_created(data: dto.JSON) -> None:
+        raise ValueError("Cannot process event")
+
+    pool = EventConsumerPool(
+        consumer_factory=mock.Mock(),
+        event_handler_map={"cat.created": handle_cat_created},
+        workers=1,
+    )
+    pool.start_loop()
+    try:
+        with pytest.raises(ValueError, match="Cannot process event"):
+            pool.event_handler_map["cat.created"]({})
+    finally:
+        pool.stop_loop()
+
+
+def test_async_handler_without_loop() -> None:
+    async def handle_cat_created(data: dto.JSON) -> None:
+        pass
+
+    pool = EventConsumerPool(
+        consumer_factory=mock.Mock(),
+        event_handler_map={"cat.created": handle_cat_created},
+        workers=1,
+    )
+
+    with pytest.raises(RuntimeError, match="The event handler loop has not been started."):
+        pool.event_handler_map["cat.created"]({})
+
+
+def test_handler_concurrency_limit() -> None:
+    lock = threading.Lock()
+    release = threading.Event()
+    running = 0
+    max_running = 0
+
+    def handle_cat_created(data: Any) -> None:
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        release.wait(0.1)
+        with lock:
+            running -= 1
+
+    pool = EventConsumerPool(
+        consumer_factory=mock.Mock(),
+        event_handler_map={"cat.created": handle_cat_created},
+        workers=4,
+        handler_concurrency={"cat.created": 2},
+    )
+    threads = [
+        threading.Thread(target=pool.event_handler_map["cat.created"], args=({},))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max_running == 2
+
+
+def test_batch_handler_with_default_settings() -> None:
+    batches: List[List[dto.JSON]] = []
+    pool = EventConsumerPool(
+        consumer_factory=mock.Mock(),
+        event_handler_map={},
+        workers=config.CONSUMER_WORKERS,
+        batch_event_handler_map={"cat.created": batches.append},
+        batch_max_size=config.CONSUMER_BATCH_MAX_SIZE,
+        batch_max_wait=config.CONSUMER_BATCH_MAX_WAIT_MS / 1000,
+    )
+    messages: List[dto.JSON] = [{"cat_id": str(index)} for index in range(10)]
+
+    # A single worker hands the messages over one after the other.
+    for message in messages:
+        pool.event_handler_map["cat.created"](message)
+    pool.stop_batchers()
+
+    assert batches == [messages]
+
+
+def test_batch_handler_failures(caplog: Any) -> None:
+    failure = ValueError("Cannot process event")
+
+    def handle_cats_created(messages: List[dto.JSON]) -> Dict[int, Exception]:
+        return {index: failure for index, data in enumerate(messages) if "cat_id" not in data}
+
+    pool = EventConsumerPool(
+        consumer_factory=mock.Mock(),
+        event_handler_map={},
+        workers=1,
+        batch_event_handler_map={"cat.created": handle_cats_created},
+        batch_max_size=4,
+        batch_max_wait=5,
+    )
+    handled_before = EVENTS_CONSUMED_TOTAL.get(event_name="cat.created", result="handled")
+    failed_before = EVENTS_CONSUMED_TOTAL.get(event_name="cat.created", result="failed")
+
+    messages: List[dto.JSON] = [{"cat_id": "1"}, {"cat_id": "2"}, {}, {"cat_id": "4"}]
+    for message in messages:
+        pool.event_handler_map["cat.created"](message)
+    pool.stop_batchers()
+
+    assert EVENTS_CONSUMED_TOTAL.get(event_name="cat.created", result="handled") == (
+        handled_before + 3
+    )
+    assert EVENTS_CONSUMED_TOTAL.get(event_name="cat.created", result="failed") == (
+        failed_before + 1
+    )
+    assert [record.getMessage() for record in caplog.records] == [
+        "Failed to handle event cat.created because of ValueError('Cannot process event')"
+    ]
+    assert caplog.records[0].payload == {}
+
+
+def test_batch_handler_max_size() -> None:
+    batches: List[List[dto.JSON]] = []
+    pool = EventConsumerPool(
+        consumer_factory=mock.Mock(),
+        event_handler_map={},
+        workers=1,
+        batch_event_handler_map={"cat.created": batches.append},
+        batch_max_size=2,
+        batch_max_wait=5,
+    )
+
+    for index in range(4):
+        pool.event_handler_map["cat.created"]({"cat_id": str(index)})
+    pool.stop_batchers()
+
+    assert batches == [
+        [{"cat_id": "0"}, {"cat_id": "1"}],
+        [{"cat_id": "2"}, {"cat_id": "3"}],
+    ]
+
+
+def test_batch_handler_max_wait() -> None:
+    batches: List[List[dto.JSON]] = []
+    is_handled = threading.Event()
+
+    def handle_cats_created(messages: List[dto.JSON]) -> None:
+        batches.append(messages)
+        is_handled.set()
+
+    pool = EventConsumerPool(
+        consumer_factory=mock.Mock(),
+        event_handler_map={},
+        workers=1,
+        batch_event_handler_map={"cat.created": handle_cats_created},
+        batch_max_size=100,
+        batch_max_wait=0.01,
+    )
+
+    pool.event_handler_map["cat.created"]({"cat_id": "1"})
+    assert is_handled.wait(5)
+    pool.event_handler_map["cat.created"]({"cat_id": "2"})
+    pool.stop_batchers()
+
+    assert batches == [[{"cat_id": "1"}], [{"cat_id": "2"}]]
+
+
+def test_batch_handler_exception_fails_every_message() -> None:
+    def handle_cats_created(messages: List[dto.JSON]) -> None:
+        raise ValueError("Database is down")
+
+    pool = EventConsumerPool(
+        consumer_factory=mock.Mock(),
+        event_handler_map={},
+        workers=1,
+        batch_event_handler_map={"cat.created": handle_cats_created},
+        batch_max_size=2,
+        batch_max_wait=5,
+    )
+    failed_before = EVENTS_CONSUMED_TOTAL.get(event_name="cat.created", result="failed")
+
+    pool.event_handler_map["cat.created"]({"cat_id": "1"})
+    pool.event_handler_map["cat.created"]({"cat_id": "2"})
+    pool.stop_batchers()
+
+    assert EVENTS_CONSUMED_TOTAL.get(event_name="cat.created", result="failed") == (
+        failed_before + 2
+    )
+
+
+def test_batch_handler_after_stop() -> None:
+    batches: List[List[dto.JSON]] = []
+    pool = EventConsumerPool(
+        consumer_factory=mock.Mock(),
+        event_handler_map={},
+        workers=1,
+        batch_event_handler_map={"cat.created": batches.append},
+        batch_max_size=100,
+        batch_max_wait=5,
+    )
+    pool.stop_batchers()
+
+    pool.event_handler_map["cat.created"]({"cat_id": "1"})
+
+    assert batches == [[{"cat_id": "1"}]]
+
+
+def test_async_batch_handler() -> None:
+    batches: List[List[dto.JSON]] = []
+
+    async def handle_cats_created(messages: List[dto.JSON]) -> Dict[int, Exception]:
+        batches.append(messages)
+        return {}
+
+    pool = EventConsumerPool(
+        consumer_factory=mock.Mock(),
+        event_handler_map={},
+        workers=1,
+        batch_event_handler_map={"cat.created": handle_cats_created},
+        batch_max_size=100,
+        batch_max_wait=5,
+    )
+    pool.start_loop()
+    try:
+        pool.event_handler_map["cat.created"]({"cat_id": "1"})
+        pool.event_handler_map["cat.created"]({"cat_id": "2"})
+        pool.stop_batchers()
+    finally:
+        pool.stop_loop()
+
+    assert batches == [[{"cat_id": "1"}, {"cat_id": "2"}]]
@@ -1,10 +1,44 @@
+import logging
+from typing import List
+
+import pytest
+
 from ujcatapi import dto
-from ujcatapi.events.event_handlers import handle_cat_created
+from ujcatapi.events.event_handlers import handle_cat_deleted, handle_cats_created
+from ujcatapi.exceptions import EventException
+
+
+def test_handle_cats_created() -> None:
+    messages: List[dto.JSON] = [
+        {"cat_id": "000000000000000000000101"},
+        {"event_id": "123"},
+        {"cat_id": "000000000000000000000102"},
+    ]
+
+    failures = handle_cats_created(messages)
 
+    assert list(failures) == [1]
+    assert str(failures[1]) == (
+        "Cannot process event: missing required keys. Got: event_id. Expected: cat_id"
+    )
 
-def test_handle_cat_created() -> None:
+
+def test_handle_cat_deleted(caplog: pytest.LogCaptureFixture) -> None:
     data: dto.JSON = {
+        "event_id": "123",
         "cat_id": "000000000000000000000101",
     }
 
-    handle_cat_created(data)
+    with caplog.at_level(logging.INFO):
+        handle_cat_deleted(data)
+
+    assert caplog.messages == ["[123] Cat 000000000000000000000101 has been deleted"]
+
+
+def test_handle_cat_deleted_missing_keys() -> None:
+    with pytest.raises(EventException) as event_exception:
+        handle_cat_deleted({"event_id": "123"})
+
+    assert str(event_exception.value) == (
+        "Cannot process event: missing required keys. Got: event_id. Expected: cat_id"
+    )
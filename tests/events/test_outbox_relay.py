@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+from unittest import mock
+
+import pytest
+
+from tests import conftest
+from ujcatapi import dto
+from ujcatapi.events import outbox_relay
+
+UTC = timezone.utc
+
+_EVENTS = [
+    dto.OutboxEvent(
+        id=dto.OutboxEventID(f"00000000000000000000010{index}"),
+        event_name="cat.created",
+        data={"cat_id": f"00000000000000000000020{index}"},
+        ctime=datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+    )
+    for index in range(3)
+]
+
+
+@pytest.mark.parametrize(
+    "cat_pending_events, outbox_pending_events",
+    [(_EVENTS, []), ([], _EVENTS)],
+)
+@pytest.mark.parametrize(
+    "produce_side_effect, expected_deleted_event_ids, expected_count",
+    [
+        (
+            None,
+            ["000000000000000000000100", "000000000000000000000101", "000000000000000000000102"],
+            3,
+        ),
+        (
+            [None, Exception("Connection reset"), None],
+            ["000000000000000000000100"],
+            1,
+        ),
+    ],
+)
+@mock.patch("ujcatapi.events.common.get_producer")
+@mock.patch("ujcatapi.models.outbox_model.delete_many")
+@mock.patch("ujcatapi.models.outbox_model.find_pending")
+@mock.patch("ujcatapi.models.cat_model.delete_pending_events")
+@mock.patch("ujcatapi.models.cat_model.find_pending_events")
+@conftest.async_test
+async def test_relay_batch(
+    mock_find_pending_events: mock.Mock,
+    mock_delete_pending_events: mock.Mock,
+    mock_find_pending: mock.Mock,
+    mock_delete_many: mock.Mock,
+    mock_get_producer: mock.Mock,
+    cat_pending_events: List[dto.OutboxEvent],
+    outbox_pending_events: List[dto.OutboxEvent],
+    produce_side_effect: Optional[List[Optional[Exception]]],
+    expected_deleted_event_ids: List[dto.OutboxEventID],
+    expected_count: int,
+) -> None:
+    mock_find_pending_events.return_value = cat_pending_events
+    mock_find_pending.return_value = outbox_pending_events
+    mock_get_producer.return_value.produce.side_effect = produce_side_effect
+
+    assert await outbox_relay.relay_batch(batch_size=10) == expected_count
+
+    mock_find_pending_events.assert_called_once_with(limit=10)
+    mock_find_pending.assert_called_once_with(limit=10)
+    assert mock_get_producer.return_value.produce.call_args_list[:expected_count] == [
+        mock.call(event.event_name, event.data) for event in _EVENTS[:expected_count]
+    ]
+    mock_delete_published = mock_delete_pending_events if cat_pending_events else mock_delete_many
+    mock_delete_published.assert_called_once_with(expected_deleted_event_ids)
+
+
+@mock.patch("ujcatapi.events.common.get_producer")
+@mock.patch("ujcatapi.models.outbox_model.delete_many")
+@mock.patch("ujcatapi.models.outbox_model.find_pending")
+@mock.patch("ujcatapi.models.cat_model.delete_pending_events")
+@mock.patch("ujcatapi.models.cat_model.find_pending_events")
+@conftest.async_test
+async def test_relay_batch_nothing_pending(
+    mock_find_pending_events: mock.Mock,
+    mock_delete_pending_events: mock.Mock,
+    mock_find_pending: mock.Mock,
+    mock_delete_many: mock.Mock,
+    mock_get_producer: mock.Mock,
+) -> None:
+    mock_find_pending_events.return_value = []
+    mock_find_pending.return_value = []
+
+    assert await outbox_relay.relay_batch(batch_size=10) == 0
+
+    mock_get_producer.assert_not_called()
+    mock_delete_pending_events.assert_not_called()
+    mock_delete_many.assert_not_called()
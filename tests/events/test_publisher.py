@@ -0,0 +1,129 @@
+import threading
+import time
+from typing import Any, List
+from unittest import mock
+
+from ujcatapi.events.publisher import EventPublisher
+
+
+def _publisher(
+    producer: mock.Mock, max_queue_size: int = 10, batch_size: int = 2
+) -> EventPublisher:
+    return EventPublisher(
+        get_producer=lambda: producer,
+        max_queue_size=max_queue_size,
+        batch_size=batch_size,
+        max_retries=2,
+        retry_backoff=0,
+    )
+
+
+def test_publish_and_flush_on_stop() -> None:
+    producer = mock.Mock()
+    publisher = _publisher(producer)
+    publisher.start()
+
+    for index in range(5):
+        assert publisher.publish("cat.created", {"cat_id": str(index)}) is True
+    publisher.stop(timeout=5)
+
+    assert producer.produce.call_args_list == [
+        mock.call("cat.created", {"cat_id": str(index)}) for index in range(5)
+    ]
+    assert publisher.stats() == {
+        "running": False,
+        "queued": 0,
+        "published": 5,
+        "retried": 0,
+        "dropped": 0,
+    }
+
+
+def test_publish_flushes_events_queued_before_start() -> None:
+    producer = mock.Mock()
+    publisher = _publisher(producer)
+
+    publisher.publish("cat.created", {"cat_id": "1"})
+    publisher.start()
+    publisher.stop(timeout=5)
+
+    producer.produce.assert_called_once_with("cat.created", {"cat_id": "1"})
+
+
+def test_publish_drops_events_when_queue_is_full(caplog: Any) -> None:
+    producer = mock.Mock()
+    publisher = _publisher(producer, max_queue_size=2)
+
+    results = [publisher.publish("cat.created", {"cat_id": str(index)}) for index in range(3)]
+    publisher.start()
+    publisher.stop(timeout=5)
+
+    assert results == [True, True, False]
+    assert producer.produce.call_count == 2
+    assert publisher.stats()["dropped"] == 1
+    assert [(record.getMessage(), record.payload) for record in caplog.records] == [
+        ("Event queue is full, dropping event cat.created", {"cat_id": "2"})
+    ]
+
+
+def test_stop_does_not_block_when_queue_is_full() -> None:
+    is_released = threading.Event()
+    producer = mock.Mock()
+    producer.produce.side_effect = lambda event_name, data: is_released.wait()
+    publisher = _publisher(producer, max_queue_size=2, batch_size=1)
+    publisher.start()
+    # The thread is stuck on the first event while two more fill the queue.
+    publisher.publish("cat.created", {"cat_id": "0"})
+    while not producer.produce.called:
+        time.sleep(0.001)
+    for index in range(1, 3):
+        assert publisher.publish("cat.created", {"cat_id": str(index)}) is True
+    thread = publisher._thread
+    assert thread is not None
+
+    start = time.monotonic()
+    publisher.stop(timeout=0.1)
+
+    assert time.monotonic() - start < 1
+    # The thread still publishes the queued events, and then stops.
+    is_released.set()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert producer.produce.call_count == 3
+
+
+def test_publish_retries_failed_events() -> None:
+    producer = mock.Mock()
+    producer.produce.side_effect = [Exception("Connection reset"), None, Exception("Down")] + [
+        Exception("Down")
+    ] * 2
+    publisher = _publisher(producer)
+    publisher.start()
+
+    publisher.publish("cat.created", {"cat_id": "1"})
+    publisher.publish("cat.created", {"cat_id": "2"})
+    publisher.stop(timeout=5)
+
+    assert producer.produce.call_count == 5
+    assert publisher.stats() == {
+        "running": False,
+        "queued": 0,
+        "published": 1,
+        "retried": 3,
+        "dropped": 1,
+    }
+
+
+def test_publish_batches_queued_events() -> None:
+    batches: List[int] = []
+    publisher = _publisher(mock.Mock(), batch_size=3)
+
+    with mock.patch.object(
+        publisher, "_publish_batch", side_effect=lambda batch: batches.append(len(batch))
+    ):
+        for index in range(7):
+            publisher.publish("cat.created", {"cat_id": str(index)})
+        publisher.start()
+        publisher.stop(timeout=5)
+
+    assert batches == [3, 3, 1]
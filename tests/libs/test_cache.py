@@ -0,0 +1,69 @@
+from typing import List
+
+from ujcatapi.libs.cache import TTLCache
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_and_set() -> None:
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl=10)
+
+    assert cache.get("a") is None
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.stats() == {"size": 1, "max_size": 2, "hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_evicts_least_recently_used() -> None:
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+
+    cache.set("c", 3)
+
+    assert [cache.get("a"), cache.get("b"), cache.get("c")] == [1, None, 3]
+    assert cache.evictions == 1
+
+
+def test_expires_entries() -> None:
+    timer = FakeTimer()
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl=10, timer=timer)
+    cache.set("a", 1)
+
+    timer.now = 9.9
+    assert cache.get("a") == 1
+
+    timer.now = 10
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_discard_group() -> None:
+    timer = FakeTimer()
+    cache: TTLCache[str, int] = TTLCache(
+        max_size=3, ttl=10, timer=timer, group_of=lambda key: key[0]
+    )
+    for key, value in [("a1", 1), ("a2", 2), ("b1", 3)]:
+        cache.set(key, value)
+
+    cache.discard_group("a")
+    cache.discard_group("c")
+
+    values: List = [cache.get("a1"), cache.get("a2"), cache.get("b1")]
+    assert values == [None, None, 3]
+
+    # Keys that expire or are evicted leave their group too.
+    cache.set("c1", 4)
+    timer.now = 10
+    assert cache.get("b1") is None
+    for key, value in [("d1", 5), ("d2", 6), ("d3", 7), ("e1", 8)]:
+        cache.set(key, value)
+    assert cache._groups == {"d": {"d2", "d3"}, "e": {"e1"}}
@@ -0,0 +1,67 @@
+import gzip
+import zlib
+from typing import List, Optional
+
+import pytest
+
+from ujcatapi.libs import compression
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, encodings, expected_encoding",
+    [
+        ("gzip, deflate, br", ["br", "gzip"], "br"),
+        ("gzip, deflate, br", ["gzip", "br"], "gzip"),
+        ("gzip;q=0.5, br;q=0.8", ["gzip", "br"], "br"),
+        ("br;q=0, gzip", ["br", "gzip"], "gzip"),
+        ("*", ["br", "gzip"], "br"),
+        ("*;q=0.5, gzip", ["br", "gzip"], "gzip"),
+        ("identity", ["br", "gzip"], None),
+        ("gzip;q=invalid", ["gzip"], None),
+        ("", ["gzip"], None),
+        ("gzip", [], None),
+    ],
+)
+def test_negotiate_encoding(
+    accept_encoding: str, encodings: List[str], expected_encoding: Optional[str]
+) -> None:
+    assert compression.negotiate_encoding(accept_encoding, encodings) == expected_encoding
+
+
+def test_get_compressor_factories() -> None:
+    factories = compression.get_compressor_factories(["deflate", "gzip"], gzip_level=6)
+
+    assert list(factories) == ["gzip"]
+
+
+def test_get_compressor_factories_optional_encodings() -> None:
+    factories = compression.get_compressor_factories(["br", "zstd", "gzip"], gzip_level=6)
+
+    assert list(factories) == [
+        encoding
+        for encoding, module in [
+            ("br", compression.brotli),
+            ("zstd", compression.zstandard),
+            ("gzip", gzip),
+        ]
+        if module is not None
+    ]
+
+
+def test_gzip_compressor() -> None:
+    compressor = compression.GzipCompressor(level=6)
+    chunks = [b'{"name":"Sammybridge Cat"}\n' for _ in range(100)]
+
+    compressed = b"".join(compressor.compress(chunk) for chunk in chunks) + compressor.finish()
+
+    assert gzip.decompress(compressed) == b"".join(chunks)
+    assert len(compressed) < len(b"".join(chunks))
+
+
+def test_gzip_compressor_flush() -> None:
+    compressor = compression.GzipCompressor(level=6)
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    flushed = compressor.compress(b'{"name":"Sammybridge Cat"}\n') + compressor.flush()
+
+    assert decompressor.decompress(flushed) == b'{"name":"Sammybridge Cat"}\n'
@@ -0,0 +1,161 @@
+import logging
+import queue
+import threading
+from typing import Any, List
+
+from ujcatapi.libs import log_queue
+from ujcatapi.libs.log_queue import DroppingQueueHandler, QueuedLogging
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads: List[str] = []
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.threads.append(threading.current_thread().name)
+        self.messages.append(self.format(record))
+
+
+def _logger(name: str) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def test_queued_logging_writes_records_on_background_thread() -> None:
+    logger = _logger("tests.log_queue.background")
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    queued_logging = QueuedLogging(logger, max_size=10)
+
+    queued_logging.start()
+    assert logger.handlers == [queued_logging.handler]
+    payload = {"cat_id": "000000000000000000000101"}
+    logger.info("Cat %s has been created", payload)
+    payload["cat_id"] = "changed"
+    queued_logging.stop()
+
+    assert handler.messages == ["Cat {'cat_id': '000000000000000000000101'} has been created"]
+    assert handler.threads != [threading.current_thread().name]
+    assert logger.handlers == [handler]
+
+    logger.info("Written right away after stopping")
+    assert handler.messages[-1] == "Written right away after stopping"
+    logger.removeHandler(handler)
+
+
+def test_queued_logging_formats_exceptions() -> None:
+    logger = _logger("tests.log_queue.exceptions")
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    queued_logging = QueuedLogging(logger, max_size=10)
+
+    queued_logging.start()
+    try:
+        raise ValueError("Cannot process event")
+    except ValueError:
+        logger.exception("Failed")
+    queued_logging.stop()
+
+    assert handler.messages[0].startswith("Failed\nTraceback")
+    assert handler.messages[0].endswith("ValueError: Cannot process event")
+    logger.removeHandler(handler)
+
+
+def test_dropping_queue_handler_drops_records_when_full() -> None:
+    log_queue_: "queue.Queue[Any]" = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(log_queue_)
+    logger = _logger("tests.log_queue.dropping")
+    logger.addHandler(handler)
+
+    for index in range(5):
+        logger.info("Record %d", index)
+
+    assert handler.dropped == 3
+    assert [log_queue_.get_nowait().msg for _ in range(2)] == ["Record 0", "Record 1"]
+    logger.removeHandler(handler)
+
+
+def test_stop_flushes_a_full_queue() -> None:
+    logger = _logger("tests.log_queue.flush")
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    queued_logging = QueuedLogging(logger, max_size=3)
+
+    # The listener is not started yet, so records pile up in the queue.
+    logger.removeHandler(handler)
+    logger.addHandler(queued_logging.handler)
+    for index in range(4):
+        logger.info("Record %d", index)
+    logger.removeHandler(queued_logging.handler)
+    logger.addHandler(handler)
+    queued_logging.start()
+    queued_logging.stop()
+
+    assert handler.messages == ["Record 0", "Record 1", "Record 2"]
+    assert queued_logging.stats() == {"running": False, "queued": 0, "max_size": 3, "dropped": 1}
+    logger.removeHandler(handler)
+
+
+def test_install(monkeypatch: Any) -> None:
+    monkeypatch.setattr("ujcatapi.libs.log_queue._queued_logging", None)
+    logger = _logger("tests.log_queue.install")
+    handler = _ListHandler()
+    logger.addHandler(handler)
+
+    assert log_queue.get_stats() == {"enabled": False}
+
+    log_queue.install(logger, max_size=10)
+    logger.info("Hello")
+    assert log_queue.get_stats()["running"] is True
+    log_queue.stop()
+
+    assert handler.messages == ["Hello"]
+    assert log_queue.get_stats() == {
+        "enabled": True,
+        "running": False,
+        "queued": 0,
+        "max_size": 10,
+        "dropped": 0,
+    }
+    logger.removeHandler(handler)
+
+
+def test_install_twice(monkeypatch: Any) -> None:
+    monkeypatch.setattr("ujcatapi.libs.log_queue._queued_logging", None)
+    logger = _logger("tests.log_queue.install_twice")
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    threads_before = threading.active_count()
+
+    log_queue.install(logger, max_size=10)
+    log_queue.install(logger, max_size=10)
+    assert len(logger.handlers) == 1
+    assert threading.active_count() == threads_before + 1
+
+    log_queue.stop()
+    log_queue.install(logger, max_size=10)
+    logger.info("Hello")
+    log_queue.stop()
+
+    assert handler.messages == ["Hello"]
+    assert logger.handlers == [handler]
+    logger.removeHandler(handler)
+
+
+def test_install_with_a_queue_handler_of_another_install(monkeypatch: Any) -> None:
+    monkeypatch.setattr("ujcatapi.libs.log_queue._queued_logging", None)
+    logger = _logger("tests.log_queue.install_other")
+    logger.addHandler(_ListHandler())
+    queued_logging = QueuedLogging(logger, max_size=10)
+    queued_logging.start()
+
+    log_queue.install(logger, max_size=10)
+
+    assert logger.handlers == [queued_logging.handler]
+    assert log_queue.get_stats() == {"enabled": False}
+    queued_logging.stop()
+    logger.handlers.clear()
@@ -1,9 +1,13 @@
+import json
 import logging
+import sys
+from datetime import datetime, timezone
 from typing import Any, NamedTuple
 
 import pytest
 
-from ujcatapi.libs.log_sanitizer import sanitize_formatters
+from ujcatapi.libs import log_sanitizer
+from ujcatapi.libs.log_sanitizer import SanitizedJSONFormatter, sanitize_formatters
 
 
 @pytest.mark.parametrize(
@@ -29,6 +33,18 @@ from ujcatapi.libs.log_sanitizer import sanitize_formatters
         ("password='password'", "password='**** [hidden for privacy] ****'"),
         # Case: value may contain "s or 's
         ("password='p@^&*(\\')\"xyz'", "password='**** [hidden for privacy] ****'"),
+        # Case: field names that contain other field names
+        (
+            "{'client_secret': 'abc', \"password_reset_token\": \"def\"}",
+            "{'client_secret': '**** [hidden for privacy] ****', "
+            '"password_reset_token": "**** [hidden for privacy] ****"}',
+        ),
+        # Case: several fields and an email in one message
+        (
+            "first_name='Alice' last_name = 'Doe' email='alice@admin.sammybridge.com'",
+            "first_name='**** [hidden for privacy] ****' "
+            "last_name = '**** [hidden for privacy] ****' email='ali**@adm**.sam********.c**'",
+        ),
         # Case: partial request params with stack strace
         (
             "{'jwt': '123.123.123456\nTraceback:",
@@ -97,3 +113,124 @@ def test_sanitizes_dicts(caplog: Any) -> None:
         "'email': 'ali**@adm**.sam********.c**', 'credentials': {'password': "
         "'**** [hidden for privacy] ****'}}"
     ) in caplog.text
+
+
+def _make_record(msg: str, args: Any = None, **extra: Any) -> logging.LogRecord:
+    record = logging.LogRecord(
+        "ujcatapi.events.common", logging.INFO, __file__, 42, msg, args, None
+    )
+    record.created = 1577836800.5
+    record.threadName = "MainThread"
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sanitized_formatter_sanitizes_whole_line() -> None:
+    formatter = log_sanitizer.SanitizedFormatter(logging.Formatter("[%(threadName)s] %(message)s"))
+    record = _make_record("Logged in %s", ("alice@admin.sammybridge.com",))
+    record.threadName = "Worker-bob@admin.sammybridge.com"
+
+    line = formatter.format(record)
+
+    assert line == "[Wor***-b**@adm**.sam********.c**] Logged in ali**@adm**.sam********.c**"
+    assert record.getMessage() == "Logged in alice@admin.sammybridge.com"
+
+
+def test_sanitized_formatter_sanitizes_exceptions() -> None:
+    try:
+        raise ValueError("password='12345'")
+    except ValueError:
+        record = _make_record("Failed")
+        record.exc_info = sys.exc_info()
+
+    line = log_sanitizer.SanitizedFormatter(logging.Formatter("%(message)s")).format(record)
+
+    assert line.startswith("Failed\nTraceback")
+    assert line.endswith("ValueError: password='**** [hidden for privacy] ****'")
+    assert record.exc_info is not None
+
+
+def test_sanitized_formatter_appends_extra() -> None:
+    record = _make_record(
+        "Failed to create event cat.created",
+        payload={"cat_id": "000000000000000000000101", "password": "12345"},
+    )
+
+    line = log_sanitizer.SanitizedFormatter(logging.Formatter("%(message)s")).format(record)
+
+    assert line == (
+        'Failed to create event cat.created {"payload": {"cat_id": "000000000000000000000101", '
+        '"password": "**** [hidden for privacy] ****"}}'
+    )
+
+
+def test_json_formatter() -> None:
+    record = _make_record(
+        "Failed to create event %s for alice@admin.sammybridge.com",
+        ("cat.created",),
+        event_name="cat.created",
+        data={
+            "cat_id": "000000000000000000000101",
+            "user": {"email": "alice@admin.sammybridge.com", "password": "12345"},
+            "tokens": [{"jwt": "abcd.efg.hijk"}],
+        },
+        access_token="456",
+    )
+
+    log_entry = json.loads(SanitizedJSONFormatter().format(record))
+
+    assert log_entry == {
+        "timestamp": "2020-01-01T00:00:00.500000+00:00",
+        "level": "INFO",
+        "logger": "ujcatapi.events.common",
+        "line": 42,
+        "thread": "MainThread",
+        "message": "Failed to create event cat.created for ali**@adm**.sam********.c**",
+        "event_name": "cat.created",
+        "data": {
+            "cat_id": "000000000000000000000101",
+            "user": {
+                "email": "ali**@adm**.sam********.c**",
+                "password": "**** [hidden for privacy] ****",
+            },
+            "tokens": [{"jwt": "**** [hidden for privacy] ****"}],
+        },
+        "access_token": "**** [hidden for privacy] ****",
+    }
+
+
+def test_json_formatter_sanitizes_exceptions() -> None:
+    try:
+        raise ValueError("password='12345'")
+    except ValueError:
+        record = _make_record("Failed")
+        record.exc_info = sys.exc_info()
+
+    log_entry = json.loads(SanitizedJSONFormatter().format(record))
+
+    assert log_entry["message"] == "Failed"
+    assert log_entry["exception"].startswith("Traceback")
+    assert log_entry["exception"].endswith("ValueError: password='**** [hidden for privacy] ****'")
+
+
+def test_json_formatter_non_serializable_extra() -> None:
+    record = _make_record("Created", ctime=datetime(2020, 1, 1, tzinfo=timezone.utc))
+
+    log_entry = json.loads(SanitizedJSONFormatter().format(record))
+
+    assert log_entry["ctime"] == "2020-01-01 00:00:00+00:00"
+
+
+def test_mask_email_cache() -> None:
+    log_sanitizer.clear_caches()
+
+    assert log_sanitizer._sanitize_string("Logged in alice@admin.sammybridge.com") == (
+        "Logged in ali**@adm**.sam********.c**"
+    )
+    assert log_sanitizer._sanitize_string("Other user alice@admin.sammybridge.com") == (
+        "Other user ali**@adm**.sam********.c**"
+    )
+
+    assert log_sanitizer.get_cache_stats() == {
+        "emails": {"size": 1, "max_size": 1024, "hits": 1, "misses": 1, "hit_rate": 0.5},
+    }
@@ -0,0 +1,101 @@
+import urllib.request
+from typing import Any
+
+import pytest
+
+from ujcatapi.libs.metrics import Counter, Histogram, Registry, start_http_server
+
+
+def test_counter() -> None:
+    counter = Counter("cats_total", "Number of cats.", ["color"])
+
+    counter.inc(color="black")
+    counter.inc(2, color="black")
+    counter.inc(0.5, color='"white"\n')
+
+    assert counter.get(color="black") == 3
+    assert counter.render() == [
+        "# HELP cats_total Number of cats.",
+        "# TYPE cats_total counter",
+        'cats_total{color="\\"white\\"\\n"} 0.5',
+        'cats_total{color="black"} 3',
+    ]
+
+
+def test_counter_without_labels() -> None:
+    counter = Counter("pings_total", "Number of pings.")
+
+    counter.inc()
+
+    assert counter.render()[2:] == ["pings_total 1"]
+
+
+def test_counter_wrong_labels() -> None:
+    counter = Counter("cats_total", "Number of cats.", ["color"])
+
+    with pytest.raises(ValueError, match="cats_total expects the labels color."):
+        counter.inc(size="large")
+
+
+def test_histogram() -> None:
+    histogram = Histogram("duration_seconds", "Duration.", ["route"], buckets=[0.1, 1])
+
+    histogram.observe(0.05, route="/cats")
+    histogram.observe(0.1, route="/cats")
+    histogram.observe(0.5, route="/cats")
+    histogram.observe(3, route="/cats")
+
+    assert histogram.get_count(route="/cats") == 4
+    assert histogram.get_count(route="/status") == 0
+    assert histogram.render() == [
+        "# HELP duration_seconds Duration.",
+        "# TYPE duration_seconds histogram",
+        'duration_seconds_bucket{route="/cats",le="0.1"} 2',
+        'duration_seconds_bucket{route="/cats",le="1"} 3',
+        'duration_seconds_bucket{route="/cats",le="+Inf"} 4',
+        'duration_seconds_sum{route="/cats"} 3.65',
+        'duration_seconds_count{route="/cats"} 4',
+    ]
+
+
+def test_histogram_time(monkeypatch: Any) -> None:
+    histogram = Histogram("duration_seconds", "Duration.", buckets=[1])
+    times = iter([10.0, 10.25])
+    monkeypatch.setattr("ujcatapi.libs.metrics.time.perf_counter", lambda: next(times))
+
+    with histogram.time():
+        pass
+
+    assert histogram.render()[2:] == [
+        'duration_seconds_bucket{le="1"} 1',
+        'duration_seconds_bucket{le="+Inf"} 1',
+        "duration_seconds_sum 0.25",
+        "duration_seconds_count 1",
+    ]
+
+
+def test_registry() -> None:
+    registry = Registry()
+    counter = Counter("pings_total", "Number of pings.")
+    registry.register(counter)
+    counter.inc()
+
+    assert registry.render() == (
+        "# HELP pings_total Number of pings.\n# TYPE pings_total counter\npings_total 1\n"
+    )
+    with pytest.raises(ValueError, match="Metric pings_total is already registered."):
+        registry.register(Counter("pings_total", "Number of pings."))
+
+
+def test_start_http_server() -> None:
+    registry = Registry()
+    registry.register(Counter("pings_total", "Number of pings."))
+    server = start_http_server(registry, port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            assert response.headers["Content-Type"] == "text/plain; version=0.0.4; charset=utf-8"
+            assert response.read().decode() == registry.render()
+    finally:
+        server.shutdown()
+        server.server_close()
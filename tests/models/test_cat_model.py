@@ -1,13 +1,15 @@
 import logging
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+from unittest import mock
 
+import pymongo
 import pytest
 from bson import ObjectId
 
 from tests import conftest
-from ujcatapi import dto
-from ujcatapi.exceptions import DuplicateCatError
+from ujcatapi import config, dto
+from ujcatapi.exceptions import DuplicateCatError, InvalidPageTokenError
 from ujcatapi.models import cat_model
 from ujcatapi.models.common import BSONDocument, get_collection
 
@@ -68,6 +70,37 @@ async def test_create_cat(
     assert actual_documents == [expected_document]
 
 
+@conftest.async_test
+async def test_create_cat_with_created_event() -> None:
+    now = datetime(2020, 1, 1, 0, 0, tzinfo=UTC)
+
+    created_cat = await cat_model.create_cat(
+        new_cat=dto.UnsavedCat(name="Sammybridge Cat"),
+        now=now,
+        created_event=lambda cat_id: ("cat.created", {"cat_id": cat_id}),
+    )
+
+    collection = await get_collection(cat_model._COLLECTION_NAME)
+    document = await collection.find_one({"_id": ObjectId(created_cat.id)})
+    assert document is not None
+    assert document["pending_events"] == [
+        {
+            "_id": document["pending_events"][0]["_id"],
+            "event_name": "cat.created",
+            "data": {"cat_id": created_cat.id},
+            "ctime": now,
+        }
+    ]
+    assert await cat_model.find_pending_events(limit=10) == [
+        dto.OutboxEvent(
+            id=dto.OutboxEventID(str(document["pending_events"][0]["_id"])),
+            event_name="cat.created",
+            data={"cat_id": created_cat.id},
+            ctime=now,
+        )
+    ]
+
+
 @pytest.mark.parametrize(
     "existing_cat_documents, unsaved_cat",
     [
@@ -105,6 +138,44 @@ async def test_create_cat_duplicate_name(
     assert str(duplicate_cat_error.value) == "Cat with name Sammybridge Cat already exists."
 
 
+@conftest.async_test
+async def test_create_cats() -> None:
+    now = datetime(2020, 1, 1, 0, 0, tzinfo=UTC)
+    collection = await get_collection(cat_model._COLLECTION_NAME)
+    await collection.insert_one(
+        {
+            "_id": ObjectId("000000000000000000000101"),
+            "name": "Sammybridge Cat",
+            "ctime": now,
+            "mtime": now,
+        }
+    )
+
+    results = await cat_model.create_cats(
+        new_cats=[
+            dto.UnsavedCat(name="Shirasu Sleep Industries Cat"),
+            dto.UnsavedCat(name="Sammybridge Cat"),
+            dto.UnsavedCat(name="Gengo Cat"),
+            dto.UnsavedCat(name="Gengo Cat"),
+        ],
+        now=now,
+    )
+
+    assert [
+        result.dict(exclude={"id"}) if isinstance(result, dto.Cat) else str(result)
+        for result in results
+    ] == [
+        {"name": "Shirasu Sleep Industries Cat", "ctime": now, "mtime": now},
+        "Cat with name Sammybridge Cat already exists.",
+        {"name": "Gengo Cat", "ctime": now, "mtime": now},
+        "Cat with name Gengo Cat already exists.",
+    ]
+    actual_documents = [document async for document in collection.find({}, {"_id": 1})]
+    assert sorted(str(document["_id"]) for document in actual_documents) == sorted(
+        ["000000000000000000000101", results[0].id, results[2].id]  # type: ignore
+    )
+
+
 @pytest.mark.parametrize(
     "existing_cat_documents, cat_filter, expected_cat",
     [
@@ -210,6 +281,65 @@ async def test_find_one_empty_results_filter(
     assert await cat_model.find_one(cat_filter) is None
 
 
+@pytest.mark.parametrize(
+    "cat_ids, scope, expected_cat_ids",
+    [
+        (
+            [
+                dto.CatID("000000000000000000000101"),
+                dto.CatID("000000000000000000000102"),
+                dto.CatID("000000000000000000000103"),
+                dto.CatID("non-ObjectId"),
+            ],
+            None,
+            ["000000000000000000000101", "000000000000000000000102"],
+        ),
+        (
+            [dto.CatID("000000000000000000000101"), dto.CatID("000000000000000000000102")],
+            dto.Scope(
+                id=dto.OrganizationID("000000000000000000000b00"),
+                type=dto.MembershipType.organization,
+            ),
+            ["000000000000000000000102"],
+        ),
+        ([dto.CatID("non-ObjectId")], None, []),
+        (
+            [dto.CatID("000000000000000000000101")],
+            dto.Scope(id=dto.OrganizationID("non-ObjectId"), type=dto.MembershipType.organization),
+            [],
+        ),
+    ],
+)
+@conftest.async_test
+async def test_find_many_by_ids(
+    cat_ids: List[dto.CatID], scope: Optional[dto.Scope], expected_cat_ids: List[str]
+) -> None:
+    collection = await get_collection(cat_model._COLLECTION_NAME)
+    await collection.insert_many(
+        [
+            {
+                "_id": ObjectId("000000000000000000000101"),
+                "name": "Sammybridge Cat",
+                "ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                "mtime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+            },
+            {
+                "_id": ObjectId("000000000000000000000102"),
+                "name": "Shirasu Sleep Industries Cat",
+                "ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                "mtime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                "memberships": [
+                    {"type": "organization", "id": ObjectId("000000000000000000000b00")}
+                ],
+            },
+        ]
+    )
+
+    found_cats = await cat_model.find_many_by_ids(cat_ids, scope=scope)
+
+    assert sorted(cat.id for cat in found_cats) == expected_cat_ids
+
+
 @pytest.mark.parametrize(
     "existing_cat_documents, "
     "cat_filter, "
@@ -274,7 +404,48 @@ async def test_find_one_empty_results_filter(
                         name="Sammybridge Cat",
                     ),
                 ],
-                metadata=dto.PageMetadata(has_next_page=True),
+                metadata=dto.PageMetadata(
+                    has_next_page=True,
+                    next_page_token=dto.PageToken(
+                        "eyJzb3J0IjogW1sibmFtZSIsIDFdLCBbIl9pZCIsIDFdXSwgImFmdGVyIjogWyJTYW1teWJy"
+                        "aWRnZSBDYXQiLCB7IiRvaWQiOiAiMDAwMDAwMDAwMDAwMDAwMDAwMDAwMTAxIn1dfQ=="
+                    ),
+                ),
+            ),
+        ),
+        # Case: token-based pagination continues after the last Cat of the previous page.
+        (
+            [
+                {
+                    "_id": ObjectId("000000000000000000000101"),
+                    "name": "Sammybridge Cat",
+                    "ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                    "mtime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                },
+                {
+                    "_id": ObjectId("000000000000000000000102"),
+                    "name": "Shirasu Sleep Industries Cat",
+                    "ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                    "mtime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                },
+            ],
+            dto.CatFilter(),
+            [dto.CatSortPredicate(key=dto.CatSortKey.name, order=dto.SortOrder.asc)],
+            dto.Page(
+                size=1,
+                token=dto.PageToken(
+                    "eyJzb3J0IjogW1sibmFtZSIsIDFdLCBbIl9pZCIsIDFdXSwgImFmdGVyIjogWyJTYW1teWJy"
+                    "aWRnZSBDYXQiLCB7IiRvaWQiOiAiMDAwMDAwMDAwMDAwMDAwMDAwMDAwMTAxIn1dfQ=="
+                ),
+            ),
+            dto.PagedResult[dto.CatSummary](
+                results=[
+                    dto.CatSummary(
+                        id=dto.CatID("000000000000000000000102"),
+                        name="Shirasu Sleep Industries Cat",
+                    ),
+                ],
+                metadata=dto.PageMetadata(has_next_page=False),
             ),
         ),
     ],
@@ -299,6 +470,155 @@ async def test_find_many(
     assert found_cat_summaries == expected_cat_summaries
 
 
+@pytest.mark.parametrize(
+    "page, expected_cat_summaries",
+    [
+        (
+            None,
+            [
+                dto.CatSummary(id=dto.CatID("000000000000000000000101"), name="Sammybridge Cat"),
+                dto.CatSummary(
+                    id=dto.CatID("000000000000000000000102"), name="Shirasu Sleep Industries Cat"
+                ),
+            ],
+        ),
+        (
+            dto.Page(number=2, size=1),
+            [
+                dto.CatSummary(
+                    id=dto.CatID("000000000000000000000102"), name="Shirasu Sleep Industries Cat"
+                ),
+            ],
+        ),
+    ],
+)
+@conftest.async_test
+async def test_stream_many(
+    page: Optional[dto.Page], expected_cat_summaries: List[dto.CatSummary]
+) -> None:
+    collection = await get_collection(cat_model._COLLECTION_NAME)
+    await collection.insert_many(
+        [
+            {
+                "_id": ObjectId("000000000000000000000101"),
+                "name": "Sammybridge Cat",
+                "ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                "mtime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+            },
+            {
+                "_id": ObjectId("000000000000000000000102"),
+                "name": "Shirasu Sleep Industries Cat",
+                "ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                "mtime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+            },
+        ]
+    )
+
+    cat_summaries = await cat_model.stream_many(
+        cat_sort_params=dto.CatSortPredicates(
+            [dto.CatSortPredicate(key=dto.CatSortKey.name, order=dto.SortOrder.asc)]
+        ),
+        page=page,
+    )
+
+    assert [cat_summary async for cat_summary in cat_summaries] == expected_cat_summaries
+
+
+async def _find_many_with_facet_pipeline(
+    cat_sort_params: Optional[dto.CatSortPredicates], page: Optional[dto.Page]
+) -> List[dto.CatSummary]:
+    """
+    The aggregation pipeline find_many used before it was moved to a find() cursor, kept here to
+    make sure that both return the same results.
+    """
+    sort = {"_id": dto.SortOrder.desc}
+    collation = None
+    if cat_sort_params is not None:
+        sort = cat_model.cat_sort_params_to_db_sort(cat_sort_params)
+        collation = pymongo.collation.Collation(locale=config.DEFAULT_LOCALE)
+    sort.setdefault("_id", dto.SortOrder.asc)
+
+    skip_limit = (
+        []
+        if page is None
+        else [{"$skip": (page.number - 1) * page.size}, {"$limit": page.size}]  # type: ignore
+    )
+    pipeline: List[Dict[str, Any]] = [
+        {"$match": {}},
+        {"$sort": sort},
+        *skip_limit,
+        {"$facet": {"results": [{"$project": cat_model._CAT_SUMMARY_PROJECTION}]}},
+        {"$project": {"results": cat_model._CAT_SUMMARY_PROJECTION}},
+    ]
+    collection = await get_collection(cat_model._COLLECTION_NAME)
+    return [
+        cat_model.cat_summary_from_bson(result)
+        async for document in collection.aggregate(pipeline=pipeline, collation=collation)
+        for result in document["results"]
+    ]
+
+
+@pytest.mark.parametrize(
+    "cat_sort_params, page",
+    [
+        (None, None),
+        (None, dto.Page(number=2, size=2)),
+        ([dto.CatSortPredicate(key=dto.CatSortKey.name, order=dto.SortOrder.asc)], None),
+        (
+            [dto.CatSortPredicate(key=dto.CatSortKey.name, order=dto.SortOrder.desc)],
+            dto.Page(number=1, size=3),
+        ),
+        (
+            [
+                dto.CatSortPredicate(key=dto.CatSortKey.name, order=dto.SortOrder.asc),
+                dto.CatSortPredicate(key=dto.CatSortKey.id, order=dto.SortOrder.desc),
+            ],
+            dto.Page(number=3, size=2),
+        ),
+    ],
+)
+@conftest.async_test
+async def test_find_many_matches_facet_pipeline(
+    cat_sort_params: Optional[dto.CatSortPredicates], page: Optional[dto.Page]
+) -> None:
+    collection = await get_collection(cat_model._COLLECTION_NAME)
+    await collection.insert_many(
+        [
+            {
+                "_id": ObjectId(f"000000000000000000000{index:03}"),
+                "name": name,
+                "ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                "mtime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+            }
+            for index, name in enumerate(["b", "A", "a", "C", "c", "B", "d"], start=101)
+        ]
+    )
+
+    found_cat_summaries = await cat_model.find_many(cat_sort_params=cat_sort_params, page=page)
+
+    assert found_cat_summaries.results == await _find_many_with_facet_pipeline(
+        cat_sort_params, page
+    )
+
+
+@pytest.mark.parametrize(
+    "page_token",
+    [
+        # Case: not a token at all
+        dto.PageToken("not-a-token"),
+        # Case: token created for a different sort order
+        dto.PageToken(
+            "eyJzb3J0IjogW1sibmFtZSIsIDFdLCBbIl9pZCIsIDFdXSwgImFmdGVyIjogWyJTYW1teWJy"
+            "aWRnZSBDYXQiLCB7IiRvaWQiOiAiMDAwMDAwMDAwMDAwMDAwMDAwMDAwMTAxIn1dfQ=="
+        ),
+    ],
+)
+@conftest.async_test
+async def test_find_many_invalid_page_token(page_token: dto.PageToken) -> None:
+    with pytest.raises(InvalidPageTokenError):
+        await cat_model.find_many(page=dto.Page(size=1, token=page_token))
+
+
 # @pytest.mark.parametrize(
 #     "existing_cat_documents, cat_id, expected_response",
 #     [
@@ -367,7 +687,40 @@ async def test_find_many(
                 }
             ],
             dto.CatID("000000000000000000000101"),
-            True,
+            dto.DeletedCats(
+                deleted_count=1, cat_ids=[dto.CatID("000000000000000000000101")], pending_events=[]
+            ),
+        ),
+        (
+            [
+                {
+                    "_id": ObjectId("000000000000000000000101"),
+                    "name": "Sammybridge Cat",
+                    "ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                    "mtime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                    "pending_events": [
+                        {
+                            "_id": ObjectId("000000000000000000000e01"),
+                            "event_name": "cat.created",
+                            "data": {"cat_id": "000000000000000000000101"},
+                            "ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                        }
+                    ],
+                }
+            ],
+            dto.CatID("000000000000000000000101"),
+            dto.DeletedCats(
+                deleted_count=1,
+                cat_ids=[dto.CatID("000000000000000000000101")],
+                pending_events=[
+                    dto.OutboxEvent(
+                        id=dto.OutboxEventID("000000000000000000000e01"),
+                        event_name="cat.created",
+                        data={"cat_id": "000000000000000000000101"},
+                        ctime=datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                    )
+                ],
+            ),
         ),
     ],
 )
@@ -375,7 +728,7 @@ async def test_find_many(
 async def test_delete_one(
     existing_cat_documents: List[BSONDocument],
     cat_id: dto.CatID,
-    expected_response: bool,
+    expected_response: dto.DeletedCats,
 ) -> None:
     collection = await get_collection(cat_model._COLLECTION_NAME)
     await collection.insert_many(existing_cat_documents)
@@ -384,3 +737,181 @@ async def test_delete_one(
     actual_documents = [document async for document in collection.find()]
     assert result == expected_response
     assert actual_documents == []
+
+
+@pytest.mark.parametrize(
+    "cat_filter, cat_ids, chunk_size, expected_deleted_cat_ids, expected_remaining_cat_ids",
+    [
+        (
+            dto.CatFilter(),
+            [
+                dto.CatID("000000000000000000000101"),
+                dto.CatID("000000000000000000000103"),
+                dto.CatID("non-ObjectId"),
+            ],
+            1000,
+            ["000000000000000000000101", "000000000000000000000103"],
+            ["000000000000000000000102"],
+        ),
+        (
+            dto.CatFilter(name="Gengo Cat"),
+            None,
+            1,
+            ["000000000000000000000102", "000000000000000000000103"],
+            ["000000000000000000000101"],
+        ),
+        (
+            dto.CatFilter(
+                scope=dto.Scope(
+                    id=dto.OrganizationID("000000000000000000000b00"),
+                    type=dto.MembershipType.organization,
+                )
+            ),
+            [dto.CatID("000000000000000000000101"), dto.CatID("000000000000000000000102")],
+            1000,
+            ["000000000000000000000102"],
+            ["000000000000000000000101", "000000000000000000000103"],
+        ),
+    ],
+)
+@conftest.async_test
+async def test_delete_many(
+    cat_filter: dto.CatFilter,
+    cat_ids: Optional[List[dto.CatID]],
+    chunk_size: int,
+    expected_deleted_cat_ids: List[str],
+    expected_remaining_cat_ids: List[str],
+    monkeypatch: Any,
+) -> None:
+    monkeypatch.setattr("ujcatapi.config.CAT_BULK_DELETE_CHUNK_SIZE", chunk_size)
+    collection = await get_collection(cat_model._COLLECTION_NAME)
+    await collection.insert_many(
+        [
+            {
+                "_id": ObjectId("000000000000000000000101"),
+                "name": "Sammybridge Cat",
+                "ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                "mtime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+            },
+            {
+                "_id": ObjectId("000000000000000000000102"),
+                "name": "Gengo Cat",
+                "ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                "mtime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                "memberships": [
+                    {"type": "organization", "id": ObjectId("000000000000000000000b00")}
+                ],
+            },
+            {
+                "_id": ObjectId("000000000000000000000103"),
+                "name": "Gengo Cat",
+                "ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                "mtime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+            },
+        ]
+    )
+
+    deleted_cats = await cat_model.delete_many(cat_filter, cat_ids=cat_ids)
+
+    remaining_documents = [document async for document in collection.find()]
+    assert deleted_cats.deleted_count == len(expected_deleted_cat_ids)
+    assert sorted(deleted_cats.cat_ids) == expected_deleted_cat_ids
+    assert sorted(str(document["_id"]) for document in remaining_documents) == (
+        expected_remaining_cat_ids
+    )
+
+
+@conftest.async_test
+async def test_delete_chunk_with_concurrent_delete(monkeypatch: Any) -> None:
+    monkeypatch.setattr("ujcatapi.config.CAT_BULK_DELETE_CHUNK_SIZE", 2)
+    collection = await get_collection(cat_model._COLLECTION_NAME)
+    await collection.insert_many(
+        [
+            {
+                "_id": ObjectId(f"000000000000000000000{index}"),
+                "name": f"Gengo Cat {index}",
+                "ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                "mtime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+            }
+            for index in [101, 102]
+        ]
+    )
+    delete_many = collection.delete_many
+
+    async def delete_many_after_concurrent_delete(match: BSONDocument, **kwargs: Any) -> Any:
+        # Another request deletes one of the Cats after they have been found.
+        await collection.delete_one({"_id": ObjectId("000000000000000000000101")})
+        return await delete_many(match, **kwargs)
+
+    with mock.patch.object(
+        type(collection), "delete_many", side_effect=delete_many_after_concurrent_delete
+    ):
+        deleted_cats, has_more = await cat_model.delete_chunk(dto.CatFilter())
+
+    assert deleted_cats.deleted_count == 1
+    assert sorted(deleted_cats.cat_ids) == ["000000000000000000000101", "000000000000000000000102"]
+    # The chunk was full when it was found, so more Cats may match.
+    assert has_more
+
+
+@conftest.async_test
+async def test_delete_pending_events() -> None:
+    now = datetime(2020, 1, 1, 0, 0, tzinfo=UTC)
+    collection = await get_collection(cat_model._COLLECTION_NAME)
+    await collection.insert_many(
+        [
+            {
+                "_id": ObjectId("000000000000000000000101"),
+                "name": "Sammybridge Cat",
+                "ctime": now,
+                "mtime": now,
+                "pending_events": [
+                    {
+                        "_id": ObjectId(f"000000000000000000000e0{index}"),
+                        "event_name": "cat.created",
+                        "data": {"cat_id": "000000000000000000000101"},
+                        "ctime": now,
+                    }
+                    for index in [1, 2]
+                ],
+            },
+            {
+                "_id": ObjectId("000000000000000000000102"),
+                "name": "Gengo Cat",
+                "ctime": now,
+                "mtime": now,
+                "pending_events": [
+                    {
+                        "_id": ObjectId("000000000000000000000e03"),
+                        "event_name": "cat.created",
+                        "data": {"cat_id": "000000000000000000000102"},
+                        "ctime": now,
+                    }
+                ],
+            },
+        ]
+    )
+
+    assert (
+        await cat_model.delete_pending_events([dto.OutboxEventID("000000000000000000000e01")]) == 1
+    )
+    assert [event.id for event in await cat_model.find_pending_events(limit=10)] == [
+        "000000000000000000000e02",
+        "000000000000000000000e03",
+    ]
+
+    assert (
+        await cat_model.delete_pending_events(
+            [
+                dto.OutboxEventID("000000000000000000000e02"),
+                dto.OutboxEventID("000000000000000000000e03"),
+            ]
+        )
+        == 2
+    )
+    assert await cat_model.find_pending_events(limit=10) == []
+    # Cats without pending events do not keep an empty field.
+    assert [
+        document async for document in collection.find({"pending_events": {"$exists": True}})
+    ] == []
+    assert await cat_model.delete_pending_events([]) == 0
@@ -0,0 +1,179 @@
+from typing import Any, Dict, List
+from unittest import mock
+
+import pytest
+
+from ujcatapi.metrics import MONGO_COMMAND_DURATION_SECONDS
+from ujcatapi.models import command_monitoring
+from ujcatapi.models.command_monitoring import CommandMonitor
+
+_FIND_COMMAND = {
+    "find": "cats",
+    "filter": {"organization_id": "000000000000000000000001"},
+    "sort": {"name": 1},
+    "lsid": {"id": "session"},
+    "$db": "ujcatapi",
+}
+
+
+def _run_command(
+    monitor: CommandMonitor,
+    command: Dict[str, Any],
+    duration_micros: int,
+    failed: bool = False,
+) -> None:
+    command_name = next(iter(command))
+    monitor.started(
+        mock.Mock(
+            connection_id=("localhost", 27017),
+            request_id=1,
+            database_name="ujcatapi",
+            command_name=command_name,
+            command=command,
+        )
+    )
+    finished_event = mock.Mock(
+        connection_id=("localhost", 27017),
+        request_id=1,
+        command_name=command_name,
+        duration_micros=duration_micros,
+    )
+    if failed:
+        monitor.failed(finished_event)
+    else:
+        monitor.succeeded(finished_event)
+
+
+def _winning_plan(*stages: str) -> Dict[str, Any]:
+    plan: Dict[str, Any] = {}
+    for stage in reversed(stages):
+        plan = {"stage": stage, "inputStage": plan} if plan else {"stage": stage}
+    return {"queryPlanner": {"winningPlan": plan}}
+
+
+def test_command_monitor_records_duration() -> None:
+    monitor = CommandMonitor(
+        slow_threshold_ms=100, explain_sample_rate=0, get_explain_client=mock.Mock()
+    )
+    before = MONGO_COMMAND_DURATION_SECONDS.get_count(command="find")
+
+    with mock.patch.object(command_monitoring, "logger") as mock_logger:
+        _run_command(monitor, _FIND_COMMAND, duration_micros=5000)
+
+    assert MONGO_COMMAND_DURATION_SECONDS.get_count(command="find") == before + 1
+    mock_logger.warning.assert_not_called()
+    assert monitor._started_commands == {}
+
+
+@pytest.mark.parametrize(
+    "command, failed, expected_message",
+    [
+        (
+            _FIND_COMMAND,
+            False,
+            "Slow MongoDB command find on ujcatapi took 250.0 ms: {'find': 'cats', 'filter': "
+            "{'organization_id': '000000000000000000000001'}, 'sort': {'name': 1}}",
+        ),
+        (
+            {"insert": "cats", "documents": [{"name": "Cat"}, {"name": "Cat"}], "$db": "ujcatapi"},
+            True,
+            "Slow MongoDB command insert on ujcatapi took 250.0 ms and failed: "
+            "{'insert': 'cats', 'documents': '<2 documents>'}",
+        ),
+    ],
+)
+def test_command_monitor_logs_slow_commands(
+    command: Dict[str, Any], failed: bool, expected_message: str
+) -> None:
+    monitor = CommandMonitor(
+        slow_threshold_ms=100, explain_sample_rate=0, get_explain_client=mock.Mock()
+    )
+
+    with mock.patch.object(command_monitoring, "logger") as mock_logger:
+        _run_command(monitor, command, duration_micros=250000, failed=failed)
+
+    mock_logger.warning.assert_called_once_with(expected_message)
+
+
+@pytest.mark.parametrize(
+    "stages, expected_log_method",
+    [
+        (["COLLSCAN"], "warning"),
+        (["FETCH", "IXSCAN"], "info"),
+    ],
+)
+def test_command_monitor_explains_slow_commands(
+    stages: List[str], expected_log_method: str
+) -> None:
+    mock_client = mock.MagicMock()
+    mock_client.__getitem__.return_value.command.return_value = _winning_plan(*stages)
+    monitor = CommandMonitor(
+        slow_threshold_ms=100, explain_sample_rate=1, get_explain_client=lambda: mock_client
+    )
+
+    command = {
+        **_FIND_COMMAND,
+        "readConcern": {"level": "majority", "afterClusterTime": 1},
+        "startTransaction": True,
+        "txnNumber": 1,
+        "autocommit": False,
+    }
+
+    with mock.patch.object(command_monitoring, "logger") as mock_logger:
+        _run_command(monitor, command, duration_micros=250000)
+        monitor._explain_executor.shutdown(wait=True)
+
+    mock_client.__getitem__.assert_called_once_with("ujcatapi")
+    mock_client.__getitem__.return_value.command.assert_called_once_with(
+        {
+            "explain": {
+                "find": "cats",
+                "filter": {"organization_id": "000000000000000000000001"},
+                "sort": {"name": 1},
+            },
+            "verbosity": "queryPlanner",
+        }
+    )
+    log_message = getattr(mock_logger, expected_log_method).call_args_list[-1][0][0]
+    assert f"uses stages {', '.join(sorted(stages))}" in log_message
+
+
+@pytest.mark.parametrize(
+    "command, explain_sample_rate",
+    [
+        (_FIND_COMMAND, 0),
+        ({"insert": "cats", "documents": [{"name": "Cat"}]}, 1),
+    ],
+)
+def test_command_monitor_does_not_explain(
+    command: Dict[str, Any], explain_sample_rate: float
+) -> None:
+    mock_get_explain_client = mock.Mock()
+    monitor = CommandMonitor(
+        slow_threshold_ms=100,
+        explain_sample_rate=explain_sample_rate,
+        get_explain_client=mock_get_explain_client,
+    )
+
+    with mock.patch.object(command_monitoring, "logger"):
+        _run_command(monitor, command, duration_micros=250000)
+        monitor._explain_executor.shutdown(wait=True)
+
+    mock_get_explain_client.assert_not_called()
+
+
+def test_command_monitor_logs_explain_failures() -> None:
+    monitor = CommandMonitor(
+        slow_threshold_ms=100,
+        explain_sample_rate=1,
+        get_explain_client=mock.Mock(side_effect=Exception("Connection refused")),
+    )
+
+    with mock.patch.object(command_monitoring, "logger") as mock_logger:
+        _run_command(monitor, _FIND_COMMAND, duration_micros=250000)
+        monitor._explain_executor.shutdown(wait=True)
+
+    mock_logger.exception.assert_called_once_with(
+        "Failed to explain slow MongoDB command because of Connection refused"
+    )
+    assert monitor._explain_slot.acquire(blocking=False)
@@ -0,0 +1,257 @@
+import asyncio
+import base64
+from typing import Any, Dict, Optional
+from unittest import mock
+
+import pytest
+from bson import ObjectId, Timestamp, json_util
+from pymongo.read_preferences import ReadPreference, SecondaryPreferred
+
+from tests import conftest
+from ujcatapi import dto
+from ujcatapi.exceptions import InvalidPageTokenError
+from ujcatapi.models import common
+
+
+@pytest.mark.parametrize(
+    "enable_mongodb, warm_up_connections, expected_pings",
+    [
+        (True, 3, 3),
+        (True, 0, 0),
+        (False, 3, 0),
+    ],
+)
+@conftest.async_test
+async def test_warm_up_pool(
+    enable_mongodb: bool, warm_up_connections: int, expected_pings: int
+) -> None:
+    mock_db = mock.Mock(command=mock.AsyncMock(return_value={"ok": 1}))
+
+    with mock.patch.multiple(
+        "ujcatapi.config",
+        ENABLE_MONGODB=enable_mongodb,
+        MONGO_WARM_UP_CONNECTIONS=warm_up_connections,
+    ), mock.patch.object(common, "_get_db", mock.AsyncMock(return_value=mock_db)):
+        await common.warm_up_pool()
+
+    assert mock_db.command.await_count == expected_pings
+
+
+@conftest.async_test
+async def test_warm_up_pool_failure() -> None:
+    mock_db = mock.Mock(command=mock.AsyncMock(side_effect=Exception("No servers available")))
+
+    with mock.patch.multiple(
+        "ujcatapi.config", ENABLE_MONGODB=True, MONGO_WARM_UP_CONNECTIONS=2
+    ), mock.patch.object(
+        common, "_get_db", mock.AsyncMock(return_value=mock_db)
+    ), mock.patch.object(
+        common, "logger"
+    ) as mock_logger:
+        await common.warm_up_pool()
+
+    mock_logger.warning.assert_called_once_with(
+        "Failed to warm up the MongoDB connection pool because of No servers available"
+    )
+
+
+@conftest.async_test
+async def test_connect() -> None:
+    mock_db = mock.Mock(
+        command=mock.AsyncMock(side_effect=[Exception("No servers available"), {"ok": 1}])
+    )
+
+    with mock.patch.multiple(
+        "ujcatapi.config",
+        ENABLE_MONGODB=True,
+        MONGO_WARM_UP_CONNECTIONS=0,
+        MONGO_CONNECT_RETRY_INTERVAL_SECONDS=0,
+    ), mock.patch.object(
+        common, "_get_db", mock.AsyncMock(return_value=mock_db)
+    ), mock.patch.object(
+        common, "_db", mock_db
+    ):
+        await common.connect()
+        assert not common._is_connected
+
+        assert common._connect_task is not None
+        await common._connect_task
+        assert common._is_connected
+        assert mock_db.command.await_count == 2
+
+        await common.close()
+        assert not common._is_connected
+        mock_db.client.close.assert_called_once_with()
+
+
+@conftest.async_test
+async def test_close_while_connecting() -> None:
+    mock_db = mock.Mock(command=mock.AsyncMock(side_effect=Exception("No servers available")))
+
+    with mock.patch.multiple(
+        "ujcatapi.config", ENABLE_MONGODB=True, MONGO_CONNECT_RETRY_INTERVAL_SECONDS=60
+    ), mock.patch.object(
+        common, "_get_db", mock.AsyncMock(return_value=mock_db)
+    ), mock.patch.object(
+        common, "_db", mock_db
+    ):
+        await common.connect()
+        await asyncio.sleep(0)
+
+        await common.close()
+
+        assert common._connect_task is None
+        assert not common._is_connected
+        mock_db.client.close.assert_called_once_with()
+
+
+@pytest.mark.parametrize(
+    "enable_mongodb, is_connected, ping, expected_is_ready",
+    [
+        (False, False, None, True),
+        (True, False, {"ok": 1}, False),
+        (True, True, {"ok": 1}, True),
+        (True, True, Exception("No servers available"), False),
+    ],
+)
+@conftest.async_test
+async def test_is_ready(
+    enable_mongodb: bool, is_connected: bool, ping: Any, expected_is_ready: bool
+) -> None:
+    mock_db = mock.Mock(command=mock.AsyncMock(side_effect=[ping]))
+
+    with mock.patch("ujcatapi.config.ENABLE_MONGODB", enable_mongodb), mock.patch.object(
+        common, "_get_db", mock.AsyncMock(return_value=mock_db)
+    ), mock.patch.object(common, "_is_connected", is_connected):
+        assert await common.is_ready() == expected_is_ready
+
+
+@pytest.mark.parametrize(
+    "read_preferences, max_staleness_seconds, expected_read_preference",
+    [
+        ({}, -1, None),
+        ({"find_many": "primary"}, -1, None),
+        ({"find_many": "secondaryPreferred"}, -1, ReadPreference.SECONDARY_PREFERRED),
+        ({"find_many": "secondaryPreferred"}, 90, SecondaryPreferred(max_staleness=90)),
+        ({"find_one": "secondaryPreferred"}, -1, None),
+    ],
+)
+def test_get_read_preference(
+    read_preferences: Dict[str, str],
+    max_staleness_seconds: int,
+    expected_read_preference: Optional[SecondaryPreferred],
+) -> None:
+    with mock.patch.multiple(
+        "ujcatapi.config",
+        MONGO_READ_PREFERENCES=read_preferences,
+        MONGO_READ_MAX_STALENESS_SECONDS=max_staleness_seconds,
+    ):
+        assert common.get_read_preference("find_many") == expected_read_preference
+
+
+@conftest.async_test
+async def test_get_collection_with_read_preference() -> None:
+    mock_db = mock.MagicMock()
+
+    with mock.patch.object(common, "_get_db", mock.AsyncMock(return_value=mock_db)):
+        collection = await common.get_collection("cats", ReadPreference.SECONDARY_PREFERRED)
+
+    assert collection is mock_db.get_collection.return_value
+    mock_db.get_collection.assert_called_once_with(
+        "cats", read_preference=ReadPreference.SECONDARY_PREFERRED
+    )
+
+
+@pytest.mark.parametrize("read_preferences", [{}, {"find_many": "primary"}])
+@conftest.async_test
+async def test_causal_session_without_starting_one(read_preferences: Dict[str, str]) -> None:
+    mock_get_db = mock.AsyncMock()
+
+    with mock.patch("ujcatapi.config.MONGO_READ_PREFERENCES", read_preferences), mock.patch.object(
+        common, "_get_db", mock_get_db
+    ):
+        async with common.causal_session() as session:
+            assert session is None
+
+    mock_get_db.assert_not_awaited()
+
+
+@conftest.async_test
+async def test_causal_session() -> None:
+    sessions = [
+        mock.MagicMock(cluster_time={"clusterTime": Timestamp(10, 1)}, operation_time=time)
+        for time in [Timestamp(10, 1), Timestamp(5, 1), Timestamp(20, 1)]
+    ]
+    for session in sessions:
+        session.__aenter__.return_value = session
+    mock_db = mock.Mock()
+    mock_db.client.start_session = mock.AsyncMock(side_effect=sessions)
+    is_written = asyncio.Event()
+
+    async def read_in_other_request() -> None:
+        await is_written.wait()
+        async with common.causal_session() as session:
+            assert session is sessions[2]
+
+    with mock.patch(
+        "ujcatapi.config.MONGO_READ_PREFERENCES", {"find_many": "secondaryPreferred"}
+    ), mock.patch.object(common, "_get_db", mock.AsyncMock(return_value=mock_db)):
+        # Requests run in tasks of their own, which copy the context when they are created.
+        other_request = asyncio.create_task(read_in_other_request())
+        async with common.causal_session() as first_session:
+            assert first_session is sessions[0]
+        async with common.causal_session() as second_session:
+            assert second_session is sessions[1]
+        is_written.set()
+        await other_request
+
+        # An older operation time does not replace the latest one, and the times of other
+        # requests are not seen.
+        assert common._last_causal_times.get() == (
+            {"clusterTime": Timestamp(10, 1)},
+            Timestamp(10, 1),
+        )
+
+    mock_db.client.start_session.assert_awaited_with(causal_consistency=True)
+    sessions[0].advance_operation_time.assert_not_called()
+    sessions[1].advance_cluster_time.assert_called_once_with({"clusterTime": Timestamp(10, 1)})
+    sessions[1].advance_operation_time.assert_called_once_with(Timestamp(10, 1))
+    # The other request did not wait for the writes of this one.
+    sessions[2].advance_operation_time.assert_not_called()
+
+
+_SORT = {"name": dto.SortOrder.asc, "_id": dto.SortOrder.asc}
+_SORT_VALUE_TYPES = {"name": str, "_id": ObjectId}
+
+
+def _page_token(after: Any) -> dto.PageToken:
+    payload = {"sort": [["name", 1], ["_id", 1]], "after": after}
+    return dto.PageToken(base64.urlsafe_b64encode(json_util.dumps(payload).encode()).decode())
+
+
+def test_calculate_db_keyset_match() -> None:
+    token = common._encode_page_token(
+        _SORT, {"name": "Sammybridge Cat", "_id": ObjectId("000000000000000000000101")}
+    )
+
+    assert common._calculate_db_keyset_match(token, _SORT, _SORT_VALUE_TYPES) == {
+        "$or": [
+            {"name": {"$gt": "Sammybridge Cat"}},
+            {"name": "Sammybridge Cat", "_id": {"$gt": ObjectId("000000000000000000000101")}},
+        ]
+    }
+
+
+@pytest.mark.parametrize(
+    "after",
+    [
+        [{"$regex": "^(a+)+$"}, {"$ne": None}],
+        ["Sammybridge Cat", {"$ne": None}],
+        ["Sammybridge Cat", "000000000000000000000101"],
+        [None, ObjectId("000000000000000000000101")],
+        [["Sammybridge Cat"], ObjectId("000000000000000000000101")],
+    ],
+)
+def test_calculate_db_keyset_match_rejects_values_of_other_types(after: Any) -> None:
+    with pytest.raises(InvalidPageTokenError):
+        common._calculate_db_keyset_match(_page_token(after), _SORT, _SORT_VALUE_TYPES)
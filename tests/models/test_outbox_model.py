@@ -0,0 +1,111 @@
+import logging
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+from tests import conftest
+from ujcatapi import dto
+from ujcatapi.models import outbox_model
+from ujcatapi.models.common import get_collection
+
+UTC = timezone.utc
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture(autouse=True)
+async def remove_outbox_events() -> None:
+    logger.warning("removing all outbox events")
+    collection = await get_collection(outbox_model._COLLECTION_NAME)
+    await collection.delete_many({})
+
+
+def test_new_pending_event() -> None:
+    now = datetime(2020, 1, 1, 0, 0, tzinfo=UTC)
+
+    document = outbox_model.new_pending_event(
+        "cat.created", {"cat_id": "000000000000000000000101"}, now=now
+    )
+
+    assert isinstance(document["_id"], ObjectId)
+    assert outbox_model.outbox_event_from_bson(document) == dto.OutboxEvent(
+        id=dto.OutboxEventID(str(document["_id"])),
+        event_name="cat.created",
+        data={"cat_id": "000000000000000000000101"},
+        ctime=now,
+    )
+
+
+@conftest.async_test
+async def test_create_events() -> None:
+    now = datetime(2020, 1, 1, 0, 0, tzinfo=UTC)
+
+    event_ids = await outbox_model.create_events(
+        [
+            ("cat.created", {"cat_id": "000000000000000000000101"}),
+            ("cat.created", {"cat_id": "000000000000000000000102"}),
+        ],
+        now=now,
+    )
+
+    collection = await get_collection(outbox_model._COLLECTION_NAME)
+    assert [document async for document in collection.find({}, sort=[("_id", 1)])] == [
+        {
+            "_id": ObjectId(event_ids[0]),
+            "event_name": "cat.created",
+            "data": {"cat_id": "000000000000000000000101"},
+            "ctime": now,
+        },
+        {
+            "_id": ObjectId(event_ids[1]),
+            "event_name": "cat.created",
+            "data": {"cat_id": "000000000000000000000102"},
+            "ctime": now,
+        },
+    ]
+
+
+@conftest.async_test
+async def test_create_events_without_events() -> None:
+    now = datetime(2020, 1, 1, 0, 0, tzinfo=UTC)
+
+    assert await outbox_model.create_events([], now=now) == []
+
+
+@conftest.async_test
+async def test_find_pending_and_delete_many() -> None:
+    now = datetime(2020, 1, 1, 0, 0, tzinfo=UTC)
+    collection = await get_collection(outbox_model._COLLECTION_NAME)
+    await collection.insert_many(
+        [
+            {
+                "_id": ObjectId(f"00000000000000000000010{index}"),
+                "event_name": "cat.created",
+                "data": {"cat_id": f"00000000000000000000020{index}"},
+                "ctime": now,
+            }
+            for index in (2, 0, 1)
+        ]
+    )
+
+    pending_events = await outbox_model.find_pending(limit=2)
+
+    assert pending_events == [
+        dto.OutboxEvent(
+            id=dto.OutboxEventID(f"00000000000000000000010{index}"),
+            event_name="cat.created",
+            data={"cat_id": f"00000000000000000000020{index}"},
+            ctime=now,
+        )
+        for index in (0, 1)
+    ]
+    assert await outbox_model.delete_many([event.id for event in pending_events]) == 2
+    assert await outbox_model.find_pending(limit=2) == [
+        dto.OutboxEvent(
+            id=dto.OutboxEventID("000000000000000000000102"),
+            event_name="cat.created",
+            data={"cat_id": "000000000000000000000202"},
+            ctime=now,
+        )
+    ]
+    assert await outbox_model.delete_many([]) == 0
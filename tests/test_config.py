@@ -0,0 +1,34 @@
+from typing import Any, Dict
+
+import pytest
+
+from ujcatapi import config
+
+
+@pytest.mark.parametrize(
+    "value, expected_read_preferences",
+    [
+        ("", {}),
+        (
+            "find_many=secondaryPreferred, find_one = nearest",
+            {"find_many": "secondaryPreferred", "find_one": "nearest"},
+        ),
+    ],
+)
+def test_get_read_preferences_env_variable(
+    value: str, expected_read_preferences: Dict[str, str], monkeypatch: Any
+) -> None:
+    monkeypatch.setenv("MONGO_READ_PREFERENCES", value)
+
+    assert (
+        config._get_read_preferences_env_variable("MONGO_READ_PREFERENCES")
+        == expected_read_preferences
+    )
+
+
+@pytest.mark.parametrize("value", ["find_many=secondary_preferred", "find_many"])
+def test_get_read_preferences_env_variable_invalid(value: str, monkeypatch: Any) -> None:
+    monkeypatch.setenv("MONGO_READ_PREFERENCES", value)
+
+    with pytest.raises(ValueError, match="invalid read preference"):
+        config._get_read_preferences_env_variable("MONGO_READ_PREFERENCES")
@@ -0,0 +1,66 @@
+from typing import Any, Dict
+from unittest import mock
+
+import pytest
+
+from ujcatapi import main
+
+
+@pytest.mark.parametrize(
+    "enable_reload, limit_concurrency, expected_options",
+    [
+        (False, 0, {"workers": 4, "limit_concurrency": None}),
+        (False, 100, {"workers": 4, "limit_concurrency": 100}),
+        (True, 0, {"reload": True, "limit_concurrency": None}),
+    ],
+)
+def test_get_uvicorn_options(
+    enable_reload: bool, limit_concurrency: int, expected_options: Dict[str, Any]
+) -> None:
+    with mock.patch.multiple(
+        "ujcatapi.config",
+        ENABLE_RELOAD_UVICORN=enable_reload,
+        ENABLE_METRICS=False,
+        API_WORKERS=4,
+        API_LOOP="uvloop",
+        API_HTTP="httptools",
+        API_KEEP_ALIVE_TIMEOUT_SECONDS=75,
+        API_BACKLOG=4096,
+        API_LIMIT_CONCURRENCY=limit_concurrency,
+    ):
+        options = main.get_uvicorn_options()
+
+    assert options == {
+        "host": "0.0.0.0",
+        "port": 10000,
+        "log_level": "info",
+        "loop": "uvloop",
+        "http": "httptools",
+        "timeout_keep_alive": 75,
+        "backlog": 4096,
+        **expected_options,
+    }
+
+
+@pytest.mark.parametrize(
+    "enable_reload, workers, is_allowed",
+    [
+        (False, 1, True),
+        (False, 2, False),
+        (True, 2, True),
+    ],
+)
+def test_get_uvicorn_options_with_metrics(
+    enable_reload: bool, workers: int, is_allowed: bool
+) -> None:
+    with mock.patch.multiple(
+        "ujcatapi.config",
+        ENABLE_RELOAD_UVICORN=enable_reload,
+        ENABLE_METRICS=True,
+        API_WORKERS=workers,
+    ):
+        if is_allowed:
+            main.get_uvicorn_options()
+        else:
+            with pytest.raises(ValueError, match="ENABLE_METRICS cannot be used"):
+                main.get_uvicorn_options()
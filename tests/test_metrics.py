@@ -0,0 +1,34 @@
+import pytest
+
+from tests import conftest
+from ujcatapi.metrics import MONGO_OPERATION_DURATION_SECONDS, time_mongo_operation
+
+
+@conftest.async_test
+async def test_time_mongo_operation() -> None:
+    @time_mongo_operation("cats", "test_find")
+    async def find(name: str) -> str:
+        return name
+
+    before = MONGO_OPERATION_DURATION_SECONDS.get_count(collection="cats", operation="test_find")
+
+    assert await find("Sammybridge Cat") == "Sammybridge Cat"
+    assert find.__name__ == "find"
+    assert MONGO_OPERATION_DURATION_SECONDS.get_count(
+        collection="cats", operation="test_find"
+    ) == (before + 1)
+
+
+@conftest.async_test
+async def test_time_mongo_operation_failure() -> None:
+    @time_mongo_operation("cats", "test_insert")
+    async def insert() -> None:
+        raise ValueError("Duplicate")
+
+    before = MONGO_OPERATION_DURATION_SECONDS.get_count(collection="cats", operation="test_insert")
+
+    with pytest.raises(ValueError):
+        await insert()
+    assert MONGO_OPERATION_DURATION_SECONDS.get_count(
+        collection="cats", operation="test_insert"
+    ) == (before + 1)
@@ -0,0 +1,270 @@
+import gzip
+import zlib
+from typing import AsyncIterator, List, Optional
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.testclient import TestClient
+from starlette.types import Message, Receive, Scope, Send
+
+from tests import conftest
+from ujcatapi.metrics import HTTP_REQUEST_DURATION_SECONDS, HTTP_REQUESTS_TOTAL
+from ujcatapi.middlewares import CompressionMiddleware, ContentTypeMiddleware, MetricsMiddleware
+
+app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+
+
+@app.get("/test-metrics/cats/{cat_id}")
+async def get_test_cat(cat_id: str) -> dict:
+    if cat_id == "missing":
+        raise HTTPException(status_code=404)
+    return {"id": cat_id}
+
+
+@app.get("/test-metrics/error")
+async def get_test_error() -> None:
+    raise ValueError("Unexpected")
+
+
+client = TestClient(app, raise_server_exceptions=False)
+
+
+def test_metrics_middleware() -> None:
+    route = "/test-metrics/cats/{cat_id}"
+    requests_before = HTTP_REQUEST_DURATION_SECONDS.get_count(method="GET", route=route)
+    ok_before = HTTP_REQUESTS_TOTAL.get(method="GET", route=route, status_code="200")
+    not_found_before = HTTP_REQUESTS_TOTAL.get(method="GET", route=route, status_code="404")
+
+    client.get("/test-metrics/cats/1")
+    client.get("/test-metrics/cats/2")
+    client.get("/test-metrics/cats/missing")
+
+    assert HTTP_REQUEST_DURATION_SECONDS.get_count(method="GET", route=route) == (
+        requests_before + 3
+    )
+    assert HTTP_REQUESTS_TOTAL.get(method="GET", route=route, status_code="200") == ok_before + 2
+    assert HTTP_REQUESTS_TOTAL.get(method="GET", route=route, status_code="404") == (
+        not_found_before + 1
+    )
+
+
+def test_metrics_middleware_unmatched_route() -> None:
+    before = HTTP_REQUESTS_TOTAL.get(method="GET", route="<unmatched>", status_code="404")
+
+    client.get("/test-metrics/unknown")
+
+    assert HTTP_REQUESTS_TOTAL.get(method="GET", route="<unmatched>", status_code="404") == (
+        before + 1
+    )
+
+
+def test_metrics_middleware_server_error() -> None:
+    route = "/test-metrics/error"
+    before = HTTP_REQUESTS_TOTAL.get(method="GET", route=route, status_code="500")
+
+    response = client.get(route)
+
+    assert response.status_code == 500
+    assert HTTP_REQUESTS_TOTAL.get(method="GET", route=route, status_code="500") == before + 1
+
+
+content_type_app = FastAPI()
+content_type_app.add_middleware(ContentTypeMiddleware)
+
+
+@content_type_app.get("/test-content-type/json")
+async def get_test_json() -> dict:
+    return {"name": "Sammybridge Cat"}
+
+
+@content_type_app.get("/test-content-type/text")
+async def get_test_text() -> PlainTextResponse:
+    return PlainTextResponse("Sammybridge Cat")
+
+
+@content_type_app.get("/test-content-type/json-with-charset")
+async def get_test_json_with_charset() -> Response:
+    return Response("{}", media_type="application/json; charset=latin-1")
+
+
+content_type_client = TestClient(content_type_app)
+
+
+@pytest.mark.parametrize(
+    "path, expected_content_type, expected_body",
+    [
+        (
+            "/test-content-type/json",
+            "application/json; charset=utf-8",
+            b'{"name":"Sammybridge Cat"}',
+        ),
+        ("/test-content-type/text", "text/plain; charset=utf-8", b"Sammybridge Cat"),
+        ("/test-content-type/json-with-charset", "application/json; charset=latin-1", b"{}"),
+    ],
+)
+def test_content_type_middleware(
+    path: str, expected_content_type: str, expected_body: bytes
+) -> None:
+    response = content_type_client.get(path)
+
+    assert (response.status_code, response.headers["content-type"], response.content) == (
+        200,
+        expected_content_type,
+        expected_body,
+    )
+    assert response.headers["content-length"] == str(len(expected_body))
+
+
+_CAT_LINE = b'{"name":"Sammybridge Cat"}\n'
+
+compression_app = FastAPI()
+compression_app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=1024,
+    content_types=["application/json", "application/x-ndjson"],
+    encodings=["gzip"],
+)
+
+
+@compression_app.get("/test-compression/{size}")
+async def get_test_compression(size: int, media_type: str = "application/json") -> Response:
+    return Response(_CAT_LINE * size, media_type=media_type)
+
+
+@compression_app.get("/test-compression-encoded")
+async def get_test_compression_encoded() -> Response:
+    return Response(
+        gzip.compress(_CAT_LINE * 100),
+        media_type="application/json",
+        headers={"Content-Encoding": "gzip"},
+    )
+
+
+@compression_app.get("/test-compression-stream")
+async def get_test_compression_stream() -> StreamingResponse:
+    async def lines() -> AsyncIterator[bytes]:
+        for _ in range(1000):
+            yield _CAT_LINE
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+compression_client = TestClient(compression_app)
+
+
+@pytest.mark.parametrize(
+    "size, media_type, accept_encoding, expected_content_encoding",
+    [
+        (100, "application/json", "gzip", "gzip"),
+        (100, "application/json; charset=utf-8", "gzip, br", "gzip"),
+        (10, "application/json", "gzip", None),
+        (100, "application/json", "identity", None),
+        (100, "image/png", "gzip", None),
+    ],
+)
+def test_compression_middleware(
+    size: int, media_type: str, accept_encoding: str, expected_content_encoding: Optional[str]
+) -> None:
+    response = compression_client.get(
+        f"/test-compression/{size}",
+        params={"media_type": media_type},
+        headers={"Accept-Encoding": accept_encoding},
+        stream=True,
+    )
+    raw_body = response.raw.read(decode_content=False)
+
+    assert response.status_code == 200
+    assert response.headers.get("content-encoding") == expected_content_encoding
+    assert response.headers["content-length"] == str(len(raw_body))
+    body = gzip.decompress(raw_body) if expected_content_encoding else raw_body
+    assert body == _CAT_LINE * size
+
+
+def test_compression_middleware_vary_header() -> None:
+    response = compression_client.get("/test-compression/10", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_compression_middleware_encoded_response() -> None:
+    response = compression_client.get(
+        "/test-compression-encoded", headers={"Accept-Encoding": "gzip"}, stream=True
+    )
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(response.raw.read(decode_content=False)) == _CAT_LINE * 100
+
+
+def test_compression_middleware_streaming_response() -> None:
+    response = compression_client.get(
+        "/test-compression-stream", headers={"Accept-Encoding": "gzip"}, stream=True
+    )
+    raw_body = response.raw.read(decode_content=False)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    # Chunks are not flushed one by one, so the stream compresses as well as the whole body.
+    assert len(raw_body) <= len(gzip.compress(_CAT_LINE * 1000)) * 1.1
+    assert gzip.decompress(raw_body) == _CAT_LINE * 1000
+
+
+async def _stream_through_compression(
+    chunks: List[bytes], minimum_size: int, flush_size: int
+) -> List[Message]:
+    async def streaming_app(scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/x-ndjson")],
+            }
+        )
+        for index, chunk in enumerate(chunks):
+            more_body = index < len(chunks) - 1
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    messages: List[Message] = []
+
+    async def receive() -> Message:
+        return {"type": "http.request"}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    middleware = CompressionMiddleware(
+        streaming_app,
+        minimum_size=minimum_size,
+        content_types=["application/x-ndjson"],
+        encodings=["gzip"],
+        flush_size=flush_size,
+    )
+    await middleware({"type": "http", "headers": [(b"accept-encoding", b"gzip")]}, receive, send)
+    return messages
+
+
+@conftest.async_test
+async def test_compression_middleware_flushes_streamed_chunks() -> None:
+    messages = await _stream_through_compression(
+        [_CAT_LINE] * 5 + [b""], minimum_size=0, flush_size=2 * len(_CAT_LINE)
+    )
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    bodies = [message["body"] for message in messages[1:]]
+    # The compressor is flushed after every second line, but not after the fifth.
+    assert decompressor.decompress(b"".join(bodies[:-1])) == _CAT_LINE * 4
+    assert decompressor.decompress(bodies[-1]) == _CAT_LINE
+    assert decompressor.eof
+
+
+@conftest.async_test
+async def test_compression_middleware_small_streamed_response() -> None:
+    messages = await _stream_through_compression(
+        [_CAT_LINE, _CAT_LINE, b""], minimum_size=1024, flush_size=1024
+    )
+
+    assert (b"content-encoding", b"gzip") not in messages[0]["headers"]
+    assert messages[1:] == [
+        {"type": "http.response.body", "body": _CAT_LINE * 2, "more_body": False}
+    ]
@@ -0,0 +1,71 @@
+import enum
+from datetime import datetime, timezone
+from typing import AsyncIterator, List
+
+import pytest
+from bson import ObjectId
+
+from tests import conftest
+from ujcatapi.responses import FastJSONResponse, render_json, render_ndjson_chunks
+
+UTC = timezone.utc
+
+
+class DummyEnum(str, enum.Enum):
+    foo = "foo"
+
+
+@pytest.mark.parametrize(
+    "content, expected_body",
+    [
+        (
+            {"id": "000000000000000000000101", "name": "Sammybridge Cat", "tags": []},
+            b'{"id":"000000000000000000000101","name":"Sammybridge Cat","tags":[]}',
+        ),
+        (
+            {"ctime": datetime(2020, 1, 1, 0, 0, tzinfo=UTC)},
+            b'{"ctime":"2020-01-01T00:00:00+00:00"}',
+        ),
+        ({"_id": ObjectId("000000000000000000000101")}, b'{"_id":"000000000000000000000101"}'),
+        ({"type": DummyEnum.foo}, b'{"type":"foo"}'),
+        ({"name": "Café"}, '{"name":"Café"}'.encode("utf-8")),
+    ],
+)
+def test_render_json(content: object, expected_body: bytes) -> None:
+    assert render_json(content) == expected_body
+
+
+def test_render_json_raises_on_unknown_type() -> None:
+    with pytest.raises(TypeError) as type_error:
+        render_json({"value": object()})
+
+    assert str(type_error.value) == "Object of type object is not JSON serializable"
+
+
+def test_fast_json_response() -> None:
+    response = FastJSONResponse({"id": "000000000000000000000101"}, status_code=201)
+
+    assert (response.status_code, response.body, response.media_type) == (
+        201,
+        b'{"id":"000000000000000000000101"}',
+        "application/json",
+    )
+
+
+@pytest.mark.parametrize(
+    "chunk_size, expected_chunks",
+    [
+        (1, [b'{"id":1}\n', b'{"id":2}\n', b'{"id":3}\n']),
+        (18, [b'{"id":1}\n{"id":2}\n', b'{"id":3}\n']),
+        (1024, [b'{"id":1}\n{"id":2}\n{"id":3}\n']),
+    ],
+)
+@conftest.async_test
+async def test_render_ndjson_chunks(chunk_size: int, expected_chunks: List[bytes]) -> None:
+    async def contents() -> AsyncIterator[dict]:
+        for index in range(1, 4):
+            yield {"id": index}
+
+    chunks = [chunk async for chunk in render_ndjson_chunks(contents(), chunk_size=chunk_size)]
+
+    assert chunks == expected_chunks
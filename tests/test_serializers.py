@@ -1,4 +1,7 @@
+from typing import Optional
+
 import pytest
+from fastapi.exceptions import RequestValidationError
 
 from ujcatapi import dto, serializers
 
@@ -93,3 +96,53 @@ def test_cat_sort_by_from_str_raises_exception(sort_by: str, expected_error_mess
         serializers._cat_sort_by_from_str(sort_by)
 
     assert str(sort_by_value_error.value) == expected_error_message
+
+
+@pytest.mark.parametrize(
+    "page_number, page_size, page_token, expected_page",
+    [
+        (None, None, None, None),
+        (2, 30, None, dto.Page(number=2, size=30)),
+        (None, 30, "abc", dto.Page(size=30, token=dto.PageToken("abc"))),
+    ],
+)
+def test_page_from_query_param(
+    page_number: Optional[int],
+    page_size: Optional[int],
+    page_token: Optional[str],
+    expected_page: Optional[dto.Page],
+) -> None:
+    assert serializers.page_from_query_param(page_number, page_size, page_token) == expected_page
+
+
+@pytest.mark.parametrize(
+    "page_number, page_size, page_token",
+    [
+        (2, None, None),
+        (None, 30, None),
+        (2, 30, "abc"),
+    ],
+)
+def test_page_from_query_param_raises_exception(
+    page_number: Optional[int],
+    page_size: Optional[int],
+    page_token: Optional[str],
+) -> None:
+    with pytest.raises(RequestValidationError):
+        serializers.page_from_query_param(page_number, page_size, page_token)
+
+
+@pytest.mark.parametrize(
+    "stream, accept, expected_stream",
+    [
+        (False, None, False),
+        (False, "application/json", False),
+        (True, None, True),
+        (False, "application/x-ndjson", True),
+        (False, "application/x-ndjson, application/json;q=0.9", True),
+    ],
+)
+def test_stream_from_request_params(
+    stream: bool, accept: Optional[str], expected_stream: bool
+) -> None:
+    assert serializers.stream_from_request_params(stream, accept) == expected_stream
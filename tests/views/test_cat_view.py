@@ -1,11 +1,12 @@
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from unittest import mock
 
 import pytest
 from starlette.testclient import TestClient
 
 from ujcatapi import dto
+from ujcatapi.exceptions import DuplicateCatError, InvalidPageTokenError
 from ujcatapi.main import app
 
 client = TestClient(app)
@@ -74,6 +75,59 @@ def test_create_cat_validation_error(
     mock_cat_domain_create_cat.assert_not_called()
 
 
+@mock.patch("ujcatapi.domains.cat_domain.create_cats")
+def test_bulk_create_cats(mock_cat_domain_create_cats: mock.Mock) -> None:
+    mock_cat_domain_create_cats.return_value = [
+        dto.Cat(
+            id=dto.CatID("000000000000000000000101"),
+            name="Sammybridge Cat",
+            ctime=datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+            mtime=datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+        ),
+        DuplicateCatError("Cat with name Gengo Cat already exists."),
+    ]
+
+    response = client.post(
+        "/v1/cats:bulkCreate", json={"cats": [{"name": "Sammybridge Cat"}, {"name": "Gengo Cat"}]}
+    )
+
+    assert (response.status_code, response.json()) == (
+        200,
+        {
+            "results": [
+                {
+                    "status_code": 201,
+                    "cat": {
+                        "id": "000000000000000000000101",
+                        "name": "Sammybridge Cat",
+                        "ctime": "2020-01-01T00:00:00+00:00",
+                        "mtime": "2020-01-01T00:00:00+00:00",
+                    },
+                },
+                {"status_code": 409, "error": "Cat with name Gengo Cat already exists."},
+            ]
+        },
+    )
+    mock_cat_domain_create_cats.assert_called_once_with(
+        [dto.UnsavedCat(name="Sammybridge Cat"), dto.UnsavedCat(name="Gengo Cat")]
+    )
+
+
+@mock.patch("ujcatapi.domains.cat_domain.create_cats")
+def test_bulk_create_cats_validation_error(mock_cat_domain_create_cats: mock.Mock) -> None:
+    response = client.post("/v1/cats:bulkCreate", json={"cats": [{}]})
+
+    assert (response.status_code, response.json()) == (
+        422,
+        {
+            "errors": [
+                {"body.cats.0.name": {"msg": "field required", "type": "value_error.missing"}}
+            ]
+        },
+    )
+    mock_cat_domain_create_cats.assert_not_called()
+
+
 @pytest.mark.parametrize(
     "cat_id, query_params, expected_cat, expected_response",
     [
@@ -122,6 +176,120 @@ def test_get_cat_not_found(
     assert (response.status_code, response.json()) == (404, {"detail": "Cat not found."})
 
 
+@pytest.mark.parametrize(
+    "query_params, json_request_body, expected_scope, expected_response",
+    [
+        (
+            "",
+            {"ids": ["000000000000000000000101", "000000000000000000000102"]},
+            None,
+            {
+                "results": [
+                    {
+                        "id": "000000000000000000000101",
+                        "name": "Sammybridge Cat",
+                        "ctime": "2020-01-01T00:00:00+00:00",
+                        "mtime": "2020-01-02T00:00:00+00:00",
+                    }
+                ],
+                "not_found": ["000000000000000000000102"],
+            },
+        ),
+        (
+            "?scope=org:000000000000000000000b00",
+            {"ids": ["000000000000000000000101"]},
+            dto.Scope(
+                id=dto.OrganizationID("000000000000000000000b00"),
+                type=dto.MembershipType.organization,
+            ),
+            {
+                "results": [
+                    {
+                        "id": "000000000000000000000101",
+                        "name": "Sammybridge Cat",
+                        "ctime": "2020-01-01T00:00:00+00:00",
+                        "mtime": "2020-01-02T00:00:00+00:00",
+                    }
+                ],
+                "not_found": ["000000000000000000000102"],
+            },
+        ),
+    ],
+)
+@mock.patch("ujcatapi.domains.cat_domain.find_many_by_ids")
+def test_batch_get_cats(
+    mock_cat_domain_find_many_by_ids: mock.Mock,
+    query_params: str,
+    json_request_body: dto.JSON,
+    expected_scope: Optional[dto.Scope],
+    expected_response: dto.JSON,
+) -> None:
+    mock_cat_domain_find_many_by_ids.return_value = dto.CatBatchGetResponse(
+        results=[
+            dto.Cat(
+                id=dto.CatID("000000000000000000000101"),
+                name="Sammybridge Cat",
+                ctime=datetime(2020, 1, 1, 0, 0, tzinfo=UTC),
+                mtime=datetime(2020, 1, 2, 0, 0, tzinfo=UTC),
+            )
+        ],
+        not_found=[dto.CatID("000000000000000000000102")],
+    )
+
+    response = client.post(f"/v1/cats:batchGet{query_params}", json=json_request_body)
+
+    assert (response.status_code, response.json()) == (200, expected_response)
+    mock_cat_domain_find_many_by_ids.assert_called_once_with(
+        cat_ids=json_request_body["ids"], scope=expected_scope
+    )
+
+
+@pytest.mark.parametrize(
+    "json_request_body, expected_error_message",
+    [
+        (
+            {"ids": []},
+            {
+                "errors": [
+                    {
+                        "body.ids": {
+                            "msg": "Between 1 and 2 ids must be provided.",
+                            "type": "value_error",
+                        }
+                    }
+                ]
+            },
+        ),
+        (
+            {"ids": ["000000000000000000000101"] * 3},
+            {
+                "errors": [
+                    {
+                        "body.ids": {
+                            "msg": "Between 1 and 2 ids must be provided.",
+                            "type": "value_error",
+                        }
+                    }
+                ]
+            },
+        ),
+    ],
+)
+@mock.patch("ujcatapi.domains.cat_domain.find_many_by_ids")
+def test_batch_get_cats_validation_error(
+    mock_cat_domain_find_many_by_ids: mock.Mock,
+    json_request_body: dto.JSON,
+    expected_error_message: dto.JSON,
+    monkeypatch: Any,
+) -> None:
+    monkeypatch.setattr("ujcatapi.config.CAT_BATCH_MAX_SIZE", 2)
+
+    response = client.post("/v1/cats:batchGet", json=json_request_body)
+
+    assert (response.status_code, response.json()) == (422, expected_error_message)
+    mock_cat_domain_find_many_by_ids.assert_not_called()
+
+
 @pytest.mark.parametrize(
     "query_params, "
     "expected_cat_filter, "
@@ -180,6 +348,29 @@ def test_get_cat_not_found(
                 "metadata": {"has_next_page": False},
             },
         ),
+        (
+            "?sort_by=name&page_size=1&page_token=abc",
+            dto.CatFilter(),
+            [dto.CatSortPredicate(key=dto.CatSortKey.name, order=dto.SortOrder.asc)],
+            dto.Page(size=1, token=dto.PageToken("abc")),
+            dto.PagedResult[dto.CatSummary](
+                results=[
+                    dto.CatSummary(
+                        id=dto.CatID("000000000000000000000102"),
+                        name="Shirasu Sleep Industries Cat",
+                    ),
+                ],
+                metadata=dto.PageMetadata(
+                    has_next_page=True, next_page_token=dto.PageToken("def")
+                ),
+            ),
+            {
+                "results": [
+                    {"id": "000000000000000000000102", "name": "Shirasu Sleep Industries Cat"},
+                ],
+                "metadata": {"has_next_page": True, "next_page_token": "def"},
+            },
+        ),
     ],
 )
 @mock.patch("ujcatapi.domains.cat_domain.find_many")
@@ -204,6 +395,52 @@ def test_list_cats(
     )
 
 
+@pytest.mark.parametrize(
+    "query_params, headers",
+    [
+        ("?stream=true", {}),
+        ("", {"Accept": "application/x-ndjson"}),
+    ],
+)
+@mock.patch("ujcatapi.domains.cat_domain.find_many")
+@mock.patch("ujcatapi.domains.cat_domain.stream_many")
+def test_list_cats_stream(
+    mock_cat_domain_stream_many: mock.Mock,
+    mock_cat_domain_find_many: mock.Mock,
+    query_params: str,
+    headers: Dict[str, str],
+) -> None:
+    async def cat_summaries() -> AsyncIterator[dto.CatSummary]:
+        yield dto.CatSummary(id=dto.CatID("000000000000000000000101"), name="Sammybridge Cat")
+        yield dto.CatSummary(
+            id=dto.CatID("000000000000000000000102"), name="Shirasu Sleep Industries Cat"
+        )
+
+    mock_cat_domain_stream_many.return_value = cat_summaries()
+
+    response = client.get(f"/v1/cats{query_params}", headers=headers)
+
+    assert (response.status_code, response.headers["content-type"], response.text) == (
+        200,
+        "application/x-ndjson",
+        '{"id":"000000000000000000000101","name":"Sammybridge Cat"}\n'
+        '{"id":"000000000000000000000102","name":"Shirasu Sleep Industries Cat"}\n',
+    )
+    mock_cat_domain_stream_many.assert_called_once_with(
+        cat_filter=dto.CatFilter(), cat_sort_params=None, page=None
+    )
+    mock_cat_domain_find_many.assert_not_called()
+
+
+@mock.patch("ujcatapi.domains.cat_domain.find_many")
+def test_list_cats_invalid_page_token(mock_cat_domain_find_many: mock.Mock) -> None:
+    mock_cat_domain_find_many.side_effect = InvalidPageTokenError("Invalid page token.")
+
+    response = client.get("/v1/cats?page_size=1&page_token=abc")
+
+    assert (response.status_code, response.json()) == (400, {"errors": "Invalid page token."})
+
+
 @mock.patch("ujcatapi.domains.cat_domain.delete_one")
 def test_delete_cat_not_found(
     mock_cat_domain_delete_not_found: mock.Mock,
@@ -234,3 +471,89 @@ def test_delete_cat(
 
     response = client.delete(f"/v1/cats/{cat_id}")
     assert (response.status_code, response.json()) == (200, None)
+
+
+@pytest.mark.parametrize(
+    "query_params, json_request_body, expected_cat_filter, expected_cat_ids",
+    [
+        (
+            "",
+            {"ids": ["000000000000000000000101", "000000000000000000000102"]},
+            dto.CatFilter(),
+            [dto.CatID("000000000000000000000101"), dto.CatID("000000000000000000000102")],
+        ),
+        (
+            "?scope=org:000000000000000000000b00",
+            {"ids": ["000000000000000000000101"]},
+            dto.CatFilter(
+                scope=dto.Scope(
+                    id=dto.OrganizationID("000000000000000000000b00"),
+                    type=dto.MembershipType.organization,
+                ),
+            ),
+            [dto.CatID("000000000000000000000101")],
+        ),
+    ],
+)
+@mock.patch("ujcatapi.domains.cat_domain.delete_many")
+def test_bulk_delete_cats(
+    mock_cat_domain_delete_many: mock.Mock,
+    query_params: str,
+    json_request_body: dto.JSON,
+    expected_cat_filter: dto.CatFilter,
+    expected_cat_ids: List[dto.CatID],
+) -> None:
+    mock_cat_domain_delete_many.return_value = 2
+
+    response = client.post(f"/v1/cats:bulkDelete{query_params}", json=json_request_body)
+
+    assert (response.status_code, response.json()) == (200, {"deleted_count": 2})
+    mock_cat_domain_delete_many.assert_called_once_with(
+        cat_filter=expected_cat_filter, cat_ids=expected_cat_ids
+    )
+
+
+@pytest.mark.parametrize(
+    "json_request_body, expected_error_message",
+    [
+        (
+            {"name": "Sammybridge Cat"},
+            {
+                "errors": [
+                    {
+                        "body.ids": {
+                            "msg": "field required",
+                            "type": "value_error.missing",
+                        }
+                    }
+                ]
+            },
+        ),
+        (
+            {"ids": ["000000000000000000000101"] * 3},
+            {
+                "errors": [
+                    {
+                        "body.ids": {
+                            "msg": "At most 2 ids can be provided.",
+                            "type": "value_error",
+                        }
+                    }
+                ]
+            },
+        ),
+    ],
+)
+@mock.patch("ujcatapi.domains.cat_domain.delete_many")
+def test_bulk_delete_cats_validation_error(
+    mock_cat_domain_delete_many: mock.Mock,
+    json_request_body: dto.JSON,
+    expected_error_message: dto.JSON,
+    monkeypatch: Any,
+) -> None:
+    monkeypatch.setattr("ujcatapi.config.CAT_BATCH_MAX_SIZE", 2)
+
+    response = client.post("/v1/cats:bulkDelete", json=json_request_body)
+
+    assert (response.status_code, response.json()) == (422, expected_error_message)
+    mock_cat_domain_delete_many.assert_not_called()
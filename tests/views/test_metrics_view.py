@@ -0,0 +1,33 @@
+from typing import Any
+
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from ujcatapi import main, metrics
+
+
+def _create_client(monkeypatch: Any, enable_metrics: bool) -> TestClient:
+    monkeypatch.setattr("ujcatapi.config.ENABLE_METRICS", enable_metrics)
+    app = FastAPI()
+    main.include_routers(app)
+    return TestClient(app)
+
+
+def test_metrics_view(monkeypatch: Any) -> None:
+    client = _create_client(monkeypatch, enable_metrics=True)
+    metrics.EVENTS_CONSUMED_TOTAL.inc(event_name="ping", result="handled")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    assert "# TYPE ujcatapi_http_request_duration_seconds histogram" in response.text
+    assert 'ujcatapi_events_consumed_total{event_name="ping",result="handled"}' in response.text
+
+
+def test_metrics_view_disabled(monkeypatch: Any) -> None:
+    client = _create_client(monkeypatch, enable_metrics=False)
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 404
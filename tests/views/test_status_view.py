@@ -1,7 +1,15 @@
+from typing import Tuple
+from unittest import mock
+
+import pytest
 from starlette.testclient import TestClient
 
-from ujcatapi import config
+from ujcatapi import config, dto
+from ujcatapi.domains import cat_domain
+from ujcatapi.events import common as events_common
+from ujcatapi.libs import log_queue, log_sanitizer
 from ujcatapi.main import app
+from ujcatapi.models import common as models_common
 
 client = TestClient(app)
 
@@ -15,6 +23,12 @@ def test_status_view() -> None:
             "version": config.VERSION,
             "links": [{"href": "/docs", "rel": "documentation", "type": "GET"}],
             "feature_flags": {"ENABLE_FOO": config.ENABLE_FOO, "ENABLE_BAR": config.ENABLE_BAR},
+            "caches": {
+                "cat": cat_domain.get_cat_cache_stats(),
+                "log_sanitizer": log_sanitizer.get_cache_stats(),
+            },
+            "events": events_common.get_event_publisher_stats(),
+            "logging": log_queue.get_stats(),
         },
     )
 
@@ -22,3 +36,24 @@ def test_status_view() -> None:
 def test_status_view_response_content_type() -> None:
     response = client.get("/status")
     assert response.headers["content-type"] == "application/json; charset=utf-8"
+
+
+def test_status_view_does_not_depend_on_mongodb() -> None:
+    with mock.patch.object(models_common, "is_ready", mock.AsyncMock(return_value=False)):
+        response = client.get("/status")
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "is_ready, expected_response",
+    [
+        (True, (200, {"ready": True})),
+        (False, (503, {"ready": False})),
+    ],
+)
+def test_readiness_view(is_ready: bool, expected_response: Tuple[int, dto.JSON]) -> None:
+    with mock.patch.object(models_common, "is_ready", mock.AsyncMock(return_value=is_ready)):
+        response = client.get("/status/ready")
+
+    assert (response.status_code, response.json()) == expected_response
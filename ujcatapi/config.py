@@ -1,6 +1,6 @@
 import logging
 import os
-from typing import List
+from typing import Dict, List
 
 logger = logging.getLogger(__name__)
 
@@ -13,23 +13,140 @@ def _get_comma_separated_env_variable(name: str) -> List[str]:
     return [element.strip() for element in os.getenv(name, "").split(",") if element.strip() != ""]
 
 
+_READ_PREFERENCE_MODES = {
+    "primary",
+    "primaryPreferred",
+    "secondary",
+    "secondaryPreferred",
+    "nearest",
+}
+
+
+def _get_read_preferences_env_variable(name: str) -> Dict[str, str]:
+    """
+    Parses comma separated <operation>=<read preference> pairs, so that a wrong mode name stops
+    the service on startup rather than failing its first query.
+    """
+    read_preferences = {}
+    for element in _get_comma_separated_env_variable(name):
+        operation, _, mode = element.partition("=")
+        if mode.strip() not in _READ_PREFERENCE_MODES:
+            raise ValueError(
+                f"{name} has an invalid read preference in {element!r}. Choices are: "
+                f"{', '.join(sorted(_READ_PREFERENCE_MODES))}."
+            )
+        read_preferences[operation.strip()] = mode.strip()
+    return read_preferences
+
+
 VERSION = "1.8.8"
 LOG_LEVEL = int(os.getenv("LOG_LEVEL", logging.NOTSET))
+# "text" or "json"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+ENABLE_QUEUED_LOGGING = _get_boolean_env_variable("ENABLE_QUEUED_LOGGING")
+LOG_QUEUE_MAX_SIZE = int(os.getenv("LOG_QUEUE_MAX_SIZE", 10000))
 ENVIRONMENT = os.getenv("ENVIRONMENT")
 
 ENABLE_RELOAD_UVICORN = _get_boolean_env_variable("ENABLE_RELOAD_UVICORN")
+# Number of API worker processes. Ignored when reloading is enabled. Every worker has its own Cat
+# cache, /status counters and metrics registry, so metrics cannot be enabled with more than one:
+# scale out with replicas instead.
+API_WORKERS = int(os.getenv("API_WORKERS", 1))
+# "auto" uses uvloop and httptools when they are installed, as with uvicorn[standard].
+API_LOOP = os.getenv("API_LOOP", "auto")
+API_HTTP = os.getenv("API_HTTP", "auto")
+API_KEEP_ALIVE_TIMEOUT_SECONDS = int(os.getenv("API_KEEP_ALIVE_TIMEOUT_SECONDS", 5))
+API_BACKLOG = int(os.getenv("API_BACKLOG", 2048))
+# Connections and tasks per worker above which requests are answered with 503, 0 for no limit.
+API_LIMIT_CONCURRENCY = int(os.getenv("API_LIMIT_CONCURRENCY", 0))
 
 ENABLE_MONGODB = _get_boolean_env_variable("ENABLE_MONGODB")
 MONGODB_URL = os.environ["MONGODB_URL"]
 MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+MONGO_FIND_BATCH_SIZE = int(os.getenv("MONGO_FIND_BATCH_SIZE", 500))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+# Connections each API worker opens on startup, so that the first requests do not wait for them.
+MONGO_WARM_UP_CONNECTIONS = int(os.getenv("MONGO_WARM_UP_CONNECTIONS", MONGO_MIN_POOL_SIZE))
+MONGO_CONNECT_RETRY_INTERVAL_SECONDS = float(os.getenv("MONGO_CONNECT_RETRY_INTERVAL_SECONDS", 1))
+MONGO_READINESS_TIMEOUT_SECONDS = float(os.getenv("MONGO_READINESS_TIMEOUT_SECONDS", 2))
+ENABLE_MONGO_COMMAND_MONITORING = _get_boolean_env_variable("ENABLE_MONGO_COMMAND_MONITORING")
+MONGO_SLOW_QUERY_THRESHOLD_MS = float(os.getenv("MONGO_SLOW_QUERY_THRESHOLD_MS", 100))
+# Fraction of the slow find, aggregate, count, distinct and delete commands that are explained.
+MONGO_SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.getenv("MONGO_SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0))
+# Comma separated <operation>=<read preference> pairs for the Cat reads find_one,
+# find_many_by_ids, find_many and stream_many, e.g. "find_many=secondaryPreferred". Other reads
+# go to the primary. Reads that are routed elsewhere run in causally consistent sessions, so that
+# they still see the writes that the same request made before them.
+MONGO_READ_PREFERENCES = _get_read_preferences_env_variable("MONGO_READ_PREFERENCES")
+# How far, at most, a secondary may lag behind the primary to be read from. At least 90, or -1
+# for no limit.
+MONGO_READ_MAX_STALENESS_SECONDS = int(os.getenv("MONGO_READ_MAX_STALENESS_SECONDS", -1))
 DEFAULT_LOCALE = "en_US"
 
+CAT_BATCH_MAX_SIZE = int(os.getenv("CAT_BATCH_MAX_SIZE", 1000))
+CAT_BULK_DELETE_CHUNK_SIZE = int(os.getenv("CAT_BULK_DELETE_CHUNK_SIZE", 1000))
+# Streamed lists are sent in chunks of this many bytes, rather than one Cat at a time.
+CAT_STREAM_CHUNK_SIZE_BYTES = int(os.getenv("CAT_STREAM_CHUNK_SIZE_BYTES", 64 * 1024))
+
+# The Cat cache is per API worker and only invalidated by the writes of that worker. A Cat
+# changed or deleted elsewhere stays visible on the other workers and replicas for up to
+# CAT_CACHE_TTL_SECONDS.
+ENABLE_CAT_CACHE = _get_boolean_env_variable("ENABLE_CAT_CACHE")
+CAT_CACHE_MAX_SIZE = int(os.getenv("CAT_CACHE_MAX_SIZE", 1024))
+CAT_CACHE_TTL_SECONDS = float(os.getenv("CAT_CACHE_TTL_SECONDS", 5))
+
 ENABLE_AMQP = _get_boolean_env_variable("ENABLE_AMQP")
 AMQP_URL = os.environ["AMQP_URL"]
+EVENT_PUBLISH_QUEUE_SIZE = int(os.getenv("EVENT_PUBLISH_QUEUE_SIZE", 10000))
+EVENT_PUBLISH_BATCH_SIZE = int(os.getenv("EVENT_PUBLISH_BATCH_SIZE", 100))
+EVENT_PUBLISH_MAX_RETRIES = int(os.getenv("EVENT_PUBLISH_MAX_RETRIES", 3))
+EVENT_PUBLISH_RETRY_BACKOFF_SECONDS = float(os.getenv("EVENT_PUBLISH_RETRY_BACKOFF_SECONDS", 0.5))
+EVENT_PUBLISH_SHUTDOWN_TIMEOUT_SECONDS = float(
+    os.getenv("EVENT_PUBLISH_SHUTDOWN_TIMEOUT_SECONDS", 10)
+)
+CONSUMER_WORKERS = int(os.getenv("CONSUMER_WORKERS", 1))
+# Comma separated <event name>=<limit> pairs, e.g. "cat.created=4,cat.deleted=8".
+CONSUMER_HANDLER_CONCURRENCY = {
+    event_name.strip(): int(limit)
+    for event_name, limit in (
+        element.split("=", 1)
+        for element in _get_comma_separated_env_variable("CONSUMER_HANDLER_CONCURRENCY")
+    )
+}
+# Messages of batched events are acked once they are in a batch, so a batch that fails, or that
+# is lost with the process, is not redelivered.
+CONSUMER_BATCH_MAX_SIZE = int(os.getenv("CONSUMER_BATCH_MAX_SIZE", 100))
+CONSUMER_BATCH_MAX_WAIT_MS = int(os.getenv("CONSUMER_BATCH_MAX_WAIT_MS", 50))
+
+# With the outbox, cat.created is stored in the new Cat document, so that creating a Cat is still
+# a single write. Deleted Cats cannot hold their cat.deleted events, which are stored in the
+# event_outbox collection right after the delete instead, and are lost if the process dies in
+# between. The outbox-relay command publishes both.
+ENABLE_EVENT_OUTBOX = _get_boolean_env_variable("ENABLE_EVENT_OUTBOX")
+OUTBOX_RELAY_BATCH_SIZE = int(os.getenv("OUTBOX_RELAY_BATCH_SIZE", 100))
+OUTBOX_RELAY_POLL_INTERVAL_SECONDS = float(os.getenv("OUTBOX_RELAY_POLL_INTERVAL_SECONDS", 1))
+
+ENABLE_RESPONSE_COMPRESSION = _get_boolean_env_variable("ENABLE_RESPONSE_COMPRESSION")
+RESPONSE_COMPRESSION_MINIMUM_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MINIMUM_SIZE", 1024))
+# Prefixes of the content types to compress.
+RESPONSE_COMPRESSION_CONTENT_TYPES = _get_comma_separated_env_variable(
+    "RESPONSE_COMPRESSION_CONTENT_TYPES"
+) or ["application/json", "application/x-ndjson", "text/"]
+# In order of preference. br and zstd are used only when brotli and zstandard are installed.
+RESPONSE_COMPRESSION_ENCODINGS = _get_comma_separated_env_variable(
+    "RESPONSE_COMPRESSION_ENCODINGS"
+) or ["br", "zstd", "gzip"]
+RESPONSE_COMPRESSION_GZIP_LEVEL = int(os.getenv("RESPONSE_COMPRESSION_GZIP_LEVEL", 6))
+# Streaming responses are flushed to the client after every this many uncompressed bytes.
+RESPONSE_COMPRESSION_FLUSH_SIZE = int(os.getenv("RESPONSE_COMPRESSION_FLUSH_SIZE", 64 * 1024))
 
 ENABLE_SENTRY = _get_boolean_env_variable("ENABLE_SENTRY")
 SENTRY_DSN = os.getenv("SENTRY_DSN")
 
+ENABLE_METRICS = _get_boolean_env_variable("ENABLE_METRICS")
+# Port of the /metrics server of the consumer and outbox-relay processes, 0 to disable it.
+METRICS_SERVER_PORT = int(os.getenv("METRICS_SERVER_PORT", 0))
+
 ELASTIC_APM_ENABLED = _get_boolean_env_variable("ELASTIC_APM_ENABLED")
 ELASTIC_APM_SERVER_URL = os.getenv("ELASTIC_APM_SERVER_URL")
 
@@ -1,3 +1,5 @@
 from ujcatapi import dto
 
 PREFIX_TO_MEMBERSHIP_TYPE_MAPPING = {"org": dto.MembershipType.organization}
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
@@ -1,20 +1,110 @@
 import logging
-from typing import Optional
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, Union
 
-from ujcatapi import dto
+from ujcatapi import config, dto
+from ujcatapi.events import cat_events
+from ujcatapi.exceptions import DuplicateCatError
 from ujcatapi.libs import dates
+from ujcatapi.libs.cache import TTLCache
 from ujcatapi.models import cat_model
 
 logger = logging.getLogger(__name__)
 
+CatCacheKey = Tuple[dto.CatID, Optional[dto.MembershipType], Optional[dto.OrganizationID]]
+
+# Keys are grouped by Cat ID, so that all the cached lookups of a Cat are dropped at once.
+_cat_cache: TTLCache[CatCacheKey, dto.Cat] = TTLCache(
+    max_size=config.CAT_CACHE_MAX_SIZE,
+    ttl=config.CAT_CACHE_TTL_SECONDS,
+    group_of=lambda key: key[0],
+)
+
+
+def _cat_cache_key(cat_filter: dto.CatFilter) -> Optional[CatCacheKey]:
+    """
+    Only lookups by ID, optionally within a scope, are cached. Returns None for any other filter.
+    """
+    if cat_filter.cat_id is None or cat_filter.name is not None:
+        return None
+
+    scope = cat_filter.scope
+    if scope is None:
+        return (cat_filter.cat_id, None, None)
+    return (cat_filter.cat_id, scope.type, scope.id)
+
+
+def invalidate_cached_cat(cat_id: dto.CatID) -> None:
+    _cat_cache.discard_group(cat_id)
+
+
+def invalidate_cached_cats(cat_ids: Iterable[dto.CatID]) -> None:
+    for cat_id in cat_ids:
+        _cat_cache.discard_group(cat_id)
+
+
+def get_cat_cache_stats() -> dto.JSON:
+    return {"enabled": config.ENABLE_CAT_CACHE, **_cat_cache.stats()}
+
 
 async def create_cat(new_cat: dto.UnsavedCat) -> dto.Cat:
     now = dates.get_utcnow()
-    return await cat_model.create_cat(new_cat, now=now)
+    if config.ENABLE_EVENT_OUTBOX:
+        cat = await cat_model.create_cat(
+            new_cat, now=now, created_event=cat_events.cat_created_event
+        )
+    else:
+        cat = await cat_model.create_cat(new_cat, now=now)
+        cat_events.fire_cat_created(cat.id)
+
+    return cat
+
+
+async def create_cats(new_cats: List[dto.UnsavedCat]) -> List[Union[dto.Cat, DuplicateCatError]]:
+    now = dates.get_utcnow()
+    if config.ENABLE_EVENT_OUTBOX:
+        results = await cat_model.create_cats(
+            new_cats, now=now, created_event=cat_events.cat_created_event
+        )
+    else:
+        results = await cat_model.create_cats(new_cats, now=now)
+        cat_events.fire_cats_created(_created_cat_ids(results))
+
+    return results
+
+
+def _created_cat_ids(results: List[Union[dto.Cat, DuplicateCatError]]) -> List[dto.CatID]:
+    return [result.id for result in results if isinstance(result, dto.Cat)]
 
 
 async def find_one(cat_filter: dto.CatFilter) -> Optional[dto.Cat]:
-    return await cat_model.find_one(cat_filter=cat_filter)
+    cache_key = _cat_cache_key(cat_filter) if config.ENABLE_CAT_CACHE else None
+    if cache_key is None:
+        return await cat_model.find_one(cat_filter=cat_filter)
+
+    cat = _cat_cache.get(cache_key)
+    if cat is None:
+        cat = await cat_model.find_one(cat_filter=cat_filter)
+        # Cats that are not found are not cached, so that a Cat created on another replica is
+        # visible right away.
+        if cat is not None:
+            _cat_cache.set(cache_key, cat)
+
+    return cat
+
+
+async def find_many_by_ids(
+    cat_ids: List[dto.CatID], scope: Optional[dto.Scope] = None
+) -> dto.CatBatchGetResponse:
+    unique_cat_ids = list(dict.fromkeys(cat_ids))
+    found_cats = {
+        cat.id: cat
+        for cat in await cat_model.find_many_by_ids(cat_ids=unique_cat_ids, scope=scope)
+    }
+
+    return dto.CatBatchGetResponse.construct(
+        results=[found_cats[cat_id] for cat_id in unique_cat_ids if cat_id in found_cats],
+        not_found=[cat_id for cat_id in unique_cat_ids if cat_id not in found_cats],
+    )
 
 
 async def find_many(
@@ -30,5 +120,57 @@ async def find_many(
     return results
 
 
+async def stream_many(
+    cat_filter: Optional[dto.CatFilter] = None,
+    cat_sort_params: Optional[dto.CatSortPredicates] = None,
+    page: Optional[dto.Page] = None,
+) -> AsyncIterator[dto.CatSummary]:
+    return await cat_model.stream_many(
+        cat_filter=cat_filter,
+        cat_sort_params=cat_sort_params,
+        page=page,
+    )
+
+
 async def delete_one(cat_id: dto.CatID) -> bool:
-    return await cat_model.delete_one(cat_id=cat_id)
+    deleted_cats = await cat_model.delete_one(cat_id=cat_id)
+    if not deleted_cats.deleted_count:
+        return False
+
+    invalidate_cached_cat(cat_id)
+    if config.ENABLE_EVENT_OUTBOX:
+        await cat_events.store_cats_deleted(deleted_cats, now=dates.get_utcnow())
+    else:
+        cat_events.fire_cat_deleted(cat_id)
+    return True
+
+
+async def delete_many(cat_filter: dto.CatFilter, cat_ids: Optional[List[dto.CatID]] = None) -> int:
+    if config.ENABLE_EVENT_OUTBOX:
+        return await _delete_many_with_event_outbox(cat_filter, cat_ids)
+
+    deleted_cats = await cat_model.delete_many(cat_filter=cat_filter, cat_ids=cat_ids)
+    if deleted_cats.cat_ids:
+        invalidate_cached_cats(deleted_cats.cat_ids)
+        cat_events.fire_cats_deleted(deleted_cats.cat_ids)
+    return deleted_cats.deleted_count
+
+
+async def _delete_many_with_event_outbox(
+    cat_filter: dto.CatFilter, cat_ids: Optional[List[dto.CatID]]
+) -> int:
+    """
+    Stores the events of every chunk right after it has been deleted, so that a process that
+    dies halfway loses the events of one chunk at most.
+    """
+    now = dates.get_utcnow()
+    deleted_count = 0
+    has_more = True
+    while has_more:
+        deleted_cats, has_more = await cat_model.delete_chunk(cat_filter, cat_ids=cat_ids)
+        if deleted_cats.cat_ids:
+            invalidate_cached_cats(deleted_cats.cat_ids)
+            await cat_events.store_cats_deleted(deleted_cats, now=now)
+        deleted_count += deleted_cats.deleted_count
+
+    return deleted_count
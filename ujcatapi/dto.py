@@ -4,14 +4,18 @@ from datetime import datetime
 from typing import Any, Dict, Generic, List, NamedTuple, NewType, Optional, TypeVar
 
 import pymongo
-from pydantic import BaseModel, PositiveInt
+from pydantic import BaseModel, PositiveInt, root_validator, validator
 from pydantic.generics import GenericModel
 
+from ujcatapi import config
+
 ResponseT = TypeVar("ResponseT")
 UnsetT = NewType("UnsetT", str)
 
 OrganizationID = NewType("OrganizationID", str)
 CatID = NewType("CatID", str)
+PageToken = NewType("PageToken", str)
+OutboxEventID = NewType("OutboxEventID", str)
 
 JSON = Dict[str, Any]
 
@@ -32,12 +36,24 @@ class CatSortPredicate(NamedTuple):
 
 
 class Page(BaseModel):
-    number: PositiveInt
+    number: Optional[PositiveInt] = None
     size: PositiveInt
+    token: Optional[PageToken] = None
+
+    @root_validator(skip_on_failure=True)
+    def check_number_or_token(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        A page is either addressed by its number (offset-based pagination) or by the token
+        returned with the previous page (token-based pagination), but never by both.
+        """
+        if (values.get("number") is None) == (values.get("token") is None):
+            raise ValueError("Exactly one of page number and page token must be provided.")
+        return values
 
 
 class PageMetadata(BaseModel):
     has_next_page: bool
+    next_page_token: Optional[PageToken] = None
 
 
 class PagedResult(GenericModel, Generic[ResponseT]):
@@ -78,6 +94,13 @@ class ServiceClientResponse(NamedTuple):
         return json.loads(self.text)
 
 
+class DeletedCats(NamedTuple):
+    deleted_count: int
+    cat_ids: List[CatID]
+    # Outbox events that the deleted Cats still held, see outbox_model.new_pending_event.
+    pending_events: List["OutboxEvent"]
+
+
 class UnsavedCat(BaseModel):
     name: str
 
@@ -94,6 +117,55 @@ class CatSummary(BaseModel):
     name: str
 
 
+class CatBatchGetRequest(BaseModel):
+    ids: List[CatID]
+
+    @validator("ids")
+    def check_ids_count(cls, ids: List[CatID]) -> List[CatID]:
+        if not 1 <= len(ids) <= config.CAT_BATCH_MAX_SIZE:
+            raise ValueError(f"Between 1 and {config.CAT_BATCH_MAX_SIZE} ids must be provided.")
+        return ids
+
+
+class CatBatchGetResponse(BaseModel):
+    results: List[Cat]
+    not_found: List[CatID]
+
+
+class CatBulkCreateRequest(BaseModel):
+    cats: List[UnsavedCat]
+
+    @validator("cats")
+    def check_cats_count(cls, cats: List[UnsavedCat]) -> List[UnsavedCat]:
+        if not 1 <= len(cats) <= config.CAT_BATCH_MAX_SIZE:
+            raise ValueError(f"Between 1 and {config.CAT_BATCH_MAX_SIZE} cats must be provided.")
+        return cats
+
+
+class CatBulkCreateResult(BaseModel):
+    status_code: int
+    cat: Optional[Cat] = None
+    error: Optional[str] = None
+
+
+class CatBulkCreateResponse(BaseModel):
+    results: List[CatBulkCreateResult]
+
+
+class CatBulkDeleteRequest(BaseModel):
+    ids: List[CatID]
+
+    @validator("ids")
+    def check_ids_size(cls, ids: List[CatID]) -> List[CatID]:
+        if len(ids) > config.CAT_BATCH_MAX_SIZE:
+            raise ValueError(f"At most {config.CAT_BATCH_MAX_SIZE} ids can be provided.")
+        return ids
+
+
+class CatBulkDeleteResponse(BaseModel):
+    deleted_count: int
+
+
 class PartialUpdateCat(BaseModel):
     name: Optional[str]
 
@@ -104,6 +176,13 @@ class CatFilter(BaseModel):
     scope: Optional[Scope] = None
 
 
+class OutboxEvent(BaseModel):
+    id: OutboxEventID
+    event_name: str
+    data: JSON
+    ctime: datetime
+
+
 class LinkResponse(BaseModel):
     href: str
     rel: str
@@ -115,6 +194,13 @@ class StatusViewResponse(BaseModel):
     version: str
     links: Optional[List[LinkResponse]]
     feature_flags: JSON
+    caches: JSON
+    events: JSON
+    logging: JSON
+
+
+class ReadinessViewResponse(BaseModel):
+    ready: bool
 
 
 class ListResponse(GenericModel, Generic[ResponseT]):
@@ -39,6 +39,7 @@ async def exception_handler(request: Optional[Request], exc: Exception) -> JSONR
     exception_to_http_error_mapping: Mapping[Type[Exception], int] = {
         ujcatapi.exceptions.EntityNotFoundError: status.HTTP_404_NOT_FOUND,
         ujcatapi.exceptions.DuplicateEntityError: status.HTTP_409_CONFLICT,
+        ujcatapi.exceptions.InvalidPageTokenError: status.HTTP_400_BAD_REQUEST,
     }
 
     # We care for inheritance, so we need to check the error using isinstance(). A direct lookup
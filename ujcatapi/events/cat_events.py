@@ -1,10 +1,59 @@
+from datetime import datetime
+from typing import Sequence, Tuple
+
+from ujcatapi import dto
 from ujcatapi.events import common
 
 
+def cat_created_event(cat_id: str) -> Tuple[str, dto.JSON]:
+    return "cat.created", {"cat_id": cat_id}
+
+
 def fire_cat_created(cat_id: str) -> None:
     """
     Fired after a new Cat has been created, so that this
     service can do some background post-processing and so that other services can subscribe to
     info on new Cats.
     """
-    common.fire_event("cat.created", {"cat_id": cat_id})
+    common.fire_event(*cat_created_event(cat_id))
+
+
+def fire_cats_created(cat_ids: Sequence[str]) -> None:
+    """
+    Fired after Cats have been created in bulk, with one cat.created event per Cat.
+    """
+    for cat_id in cat_ids:
+        fire_cat_created(cat_id)
+
+
+def cat_deleted_event(cat_id: str) -> Tuple[str, dto.JSON]:
+    return "cat.deleted", {"cat_id": cat_id}
+
+
+def fire_cat_deleted(cat_id: str) -> None:
+    """
+    Fired after a Cat has been deleted, so that other services can subscribe to info on deleted
+    Cats.
+    """
+    common.fire_event(*cat_deleted_event(cat_id))
+
+
+def fire_cats_deleted(cat_ids: Sequence[str]) -> None:
+    """
+    Fired after Cats have been deleted in bulk, with one cat.deleted event per Cat.
+    """
+    for cat_id in cat_ids:
+        fire_cat_deleted(cat_id)
+
+
+async def store_cats_deleted(deleted_cats: dto.DeletedCats, now: datetime) -> None:
+    """
+    Same events as fire_cats_deleted, but stored in the outbox with a single insert. The events
+    that the deleted Cats still held are stored first, so that they are not lost with the Cats
+    and are published before the cat.deleted events.
+    """
+    await common.store_events(
+        [(event.event_name, event.data) for event in deleted_cats.pending_events]
+        + [cat_deleted_event(cat_id) for cat_id in deleted_cats.cat_ids],
+        now=now,
+    )
@@ -1,14 +1,19 @@
 import logging
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
 
 from ai_event_pubsub.producer import EventProducer
 
 from ujcatapi import config, dto
+from ujcatapi.events.publisher import EventPublisher
+from ujcatapi.metrics import EVENTS_PUBLISHED_TOTAL
+from ujcatapi.models import outbox_model
 
 logger = logging.getLogger(__name__)
 
 
 _producer: Optional[EventProducer] = None
+_publisher: Optional[EventPublisher] = None
 
 
 def get_producer() -> EventProducer:
@@ -19,13 +24,62 @@ def get_producer() -> EventProducer:
     return _producer
 
 
+def get_publisher() -> EventPublisher:
+    global _publisher
+    if _publisher is None:
+        _publisher = EventPublisher(
+            get_producer=get_producer,
+            max_queue_size=config.EVENT_PUBLISH_QUEUE_SIZE,
+            batch_size=config.EVENT_PUBLISH_BATCH_SIZE,
+            max_retries=config.EVENT_PUBLISH_MAX_RETRIES,
+            retry_backoff=config.EVENT_PUBLISH_RETRY_BACKOFF_SECONDS,
+        )
+
+    return _publisher
+
+
+def start_event_publisher() -> None:
+    """
+    Publish events from a background thread from now on. Until it is started, and after it has
+    been stopped, fire_event produces events synchronously.
+    """
+    if config.ENABLE_AMQP:
+        get_publisher().start()
+
+
+def stop_event_publisher() -> None:
+    if _publisher is not None:
+        _publisher.stop(timeout=config.EVENT_PUBLISH_SHUTDOWN_TIMEOUT_SECONDS)
+
+
+def get_event_publisher_stats() -> Dict[str, Any]:
+    return {"enabled": config.ENABLE_AMQP, **get_publisher().stats()}
+
+
 def fire_event(event_name: str, data: dto.JSON) -> None:
     if not config.ENABLE_AMQP:
         return
 
+    if _publisher is not None and _publisher.is_running:
+        _publisher.publish(event_name, data)
+        return
+
     producer = get_producer()
 
     try:
         producer.produce(event_name, data)
     except Exception as e:
-        logger.exception(f"Failed to create event {event_name} with payload {data} because of {e}")
+        EVENTS_PUBLISHED_TOTAL.inc(event_name=event_name, result="failed")
+        logger.exception(
+            f"Failed to create event {event_name} because of {e}", extra={"payload": data}
+        )
+    else:
+        EVENTS_PUBLISHED_TOTAL.inc(event_name=event_name, result="published")
+
+
+async def store_events(events: Sequence[Tuple[str, dto.JSON]], now: datetime) -> None:
+    """
+    Stores the events, given as (event_name, data) pairs, in the outbox. The outbox relay
+    publishes them, so storing them does not wait on the broker.
+    """
+    await outbox_model.create_events(events, now=now)
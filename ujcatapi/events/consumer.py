@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from ai_event_pubsub.consumer import EventConsumer
+
+from ujcatapi import dto
+from ujcatapi.metrics import EVENTS_CONSUMED_TOTAL
+
+logger = logging.getLogger(__name__)
+
+EventHandlerMap = Mapping[str, Callable]
+# Batch handlers get a list of message payloads and return the exceptions of the messages that
+# could not be handled, by index. They can be coroutine functions as well.
+BatchEventHandlerMap = Mapping[str, Callable[[List[dto.JSON]], Any]]
+BatchFailures = Mapping[int, Exception]
+
+
+class _MessageBatcher:
+    """
+    Collects the messages of one event into batches of up to max_size messages and runs the
+    batch handler on each from a thread of its own, once the batch is full or max_wait seconds
+    after its first message.
+
+    submit returns as soon as the message has been added to a batch, so that the consumer acks it
+    and takes the next message, which lets a single worker fill a batch. It blocks while a full
+    batch waits to be taken, so at most two batches of messages are acked but not yet handled.
+    Failed messages are logged and counted rather than rejected, since they have been acked.
+    """
+
+    def __init__(
+        self,
+        event_name: str,
+        handle_batch: Callable[[List[dto.JSON]], Optional[BatchFailures]],
+        max_size: int,
+        max_wait: float,
+    ):
+        self.event_name = event_name
+        self._handle_batch = handle_batch
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._condition = threading.Condition()
+        self._messages: List[dto.JSON] = []
+        self._deadline = 0.0
+        self._is_stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, data: dto.JSON) -> None:
+        with self._condition:
+            self._start()
+            while len(self._messages) >= self.max_size and not self._is_stopping:
+                self._condition.wait()
+            if not self._is_stopping:
+                if not self._messages:
+                    self._deadline = time.monotonic() + self.max_wait
+                self._messages.append(data)
+                self._condition.notify_all()
+                return
+
+        # Once stopped, messages are handled right away, in a batch of their own.
+        self._run([data])
+
+    def stop(self) -> None:
+        """
+        Handles the messages that are still waiting for their batch to fill up, and stops.
+        """
+        with self._condition:
+            self._is_stopping = True
+            self._condition.notify_all()
+            thread = self._thread
+
+        if thread is not None:
+            thread.join()
+
+    def _start(self) -> None:
+        if self._thread is None and not self._is_stopping:
+            self._thread = threading.Thread(
+                target=self._run_batches, name=f"EventBatcher-{self.event_name}", daemon=True
+            )
+            self._thread.start()
+
+    def _run_batches(self) -> None:
+        while True:
+            with self._condition:
+                while not self._messages and not self._is_stopping:
+                    self._condition.wait()
+                while len(self._messages) < self.max_size and not self._is_stopping:
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                messages, self._messages = self._messages, []
+                self._condition.notify_all()
+
+            if messages:
+                self._run(messages)
+            elif self._is_stopping:
+                return
+
+    def _run(self, messages: List[dto.JSON]) -> None:
+        try:
+            failures = self._handle_batch(messages) or {}
+        except Exception as e:
+            failures = {index: e for index in range(len(messages))}
+
+        for index, failure in failures.items():
+            logger.error(
+                f"Failed to handle event {self.event_name} because of {failure!r}",
+                extra={"payload": messages[index]},
+            )
+        EVENTS_CONSUMED_TOTAL.inc(len(failures), event_name=self.event_name, result="failed")
+        EVENTS_CONSUMED_TOTAL.inc(
+            len(messages) - len(failures), event_name=self.event_name, result="handled"
+        )
+
+
+def _count_consumed(
+    event_name: str, handle: Callable[[dto.JSON], Any]
+) -> Callable[[dto.JSON], None]:
+    def count(data: dto.JSON) -> None:
+        try:
+            handle(data)
+        except Exception:
+            EVENTS_CONSUMED_TOTAL.inc(event_name=event_name, result="failed")
+            raise
+
+        EVENTS_CONSUMED_TOTAL.inc(event_name=event_name, result="handled")
+
+    return count
+
+
+class EventConsumerPool:
+    """
+    Runs `workers` EventConsumers side by side, each in its own thread and with its own AMQP
+    connection, so that the broker hands out up to `workers` messages at a time. Each consumer
+    still acks a message only after its handler has returned.
+
+    Handlers can be plain functions or coroutine functions. Coroutine functions run on one event
+    loop shared by all workers, so they can await cat_domain and the Motor client. The number of
+    messages handled at the same time can be limited per event name with handler_concurrency.
+
+    Batch handlers get the messages that arrive within batch_max_wait seconds of each other, up
+    to batch_max_size of them. Their messages are acked once they are in a batch, see
+    _MessageBatcher.
+    """
+
+    def __init__(
+        self,
+        consumer_factory: Callable[[EventHandlerMap], EventConsumer],
+        event_handler_map: EventHandlerMap,
+        workers: int,
+        handler_concurrency: Optional[Mapping[str, int]] = None,
+        batch_event_handler_map: Optional[BatchEventHandlerMap] = None,
+        batch_max_size: int = 1,
+        batch_max_wait: float = 0,
+    ):
+        self._consumer_factory = consumer_factory
+        self.workers = workers
+        self._handler_semaphores = {
+            event_name: threading.BoundedSemaphore(limit)
+            for event_name, limit in (handler_concurrency or {}).items()
+        }
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._worker_failed = threading.Event()
+        self.event_handler_map: Dict[str, Callable[[dto.JSON], None]] = {
+            event_name: _count_consumed(event_name, self._wrap_handler(event_name, handler))
+            for event_name, handler in event_handler_map.items()
+        }
+        self._batchers = [
+            _MessageBatcher(
+                event_name,
+                self._wrap_handler(event_name, batch_handler),
+                max_size=batch_max_size,
+                max_wait=batch_max_wait,
+            )
+            for event_name, batch_handler in (batch_event_handler_map or {}).items()
+        ]
+        for batcher in self._batchers:
+            self.event_handler_map[batcher.event_name] = batcher.submit
+
+    def run(self) -> None:
+        """
+        Consumes until any of the workers stops, e.g. because it lost its connection, so that the
+        process exits instead of running with fewer workers.
+        """
+        self.start_loop()
+        try:
+            threads = [
+                threading.Thread(
+                    target=self._run_worker, name=f"EventConsumer-{index}", daemon=True
+                )
+                for index in range(self.workers)
+            ]
+            for thread in threads:
+                thread.start()
+            self._worker_failed.wait()
+        finally:
+            self.stop_batchers()
+            self.stop_loop()
+
+    def start_loop(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever, name="EventHandlerLoop", daemon=True
+        )
+        self._loop_thread.start()
+
+    def stop_batchers(self) -> None:
+        for batcher in self._batchers:
+            batcher.stop()
+
+    def stop_loop(self) -> None:
+        if self._loop is None or self._loop_thread is None:
+            return
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def _run_worker(self) -> None:
+        try:
+            self._consumer_factory(self.event_handler_map).run()
+        except Exception as e:
+            logger.exception(f"Event consumer stopped because of {e}")
+        finally:
+            self._worker_failed.set()
+
+    def _wrap_handler(self, event_name: str, handler: Callable) -> Callable[[Any], Any]:
+        semaphore = self._handler_semaphores.get(event_name)
+
+        def handle(payload: Any) -> Any:
+            if semaphore is None:
+                return self._call_handler(handler, payload)
+
+            with semaphore:
+                return self._call_handler(handler, payload)
+
+        return handle
+
+    def _call_handler(self, handler: Callable, payload: Any) -> Any:
+        if not asyncio.iscoroutinefunction(handler):
+            return handler(payload)
+
+        if self._loop is None:
+            raise RuntimeError("The event handler loop has not been started.")
+
+        return asyncio.run_coroutine_threadsafe(handler(payload), self._loop).result()
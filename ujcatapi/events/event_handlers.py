@@ -1,5 +1,5 @@
 import logging
-from typing import Callable, Mapping
+from typing import Callable, Dict, List, Mapping, Set
 
 from ujcatapi import dto
 from ujcatapi.exceptions import EventException
@@ -7,6 +7,16 @@ from ujcatapi.exceptions import EventException
 logger = logging.getLogger(__name__)
 
 
+def _check_required_keys(data: dto.JSON, required_keys: Set[str]) -> None:
+    if not all(key in data for key in required_keys):
+        exception_message = (
+            f"Cannot process event: missing required keys. "
+            f"Got: {', '.join(data.keys())}. Expected: {', '.join(required_keys)}"
+        )
+        logger.exception(f"[{data.get('event_id')}] {exception_message}")
+        raise EventException(exception_message)
+
+
 def handle_ping(data: dto.JSON) -> None:
     """
     All consumers listen to `ping` event.
@@ -22,25 +32,42 @@ def handle_ping(data: dto.JSON) -> None:
     logger.info(f"[{event_id}] pong")
 
 
-def handle_cat_created(data: dto.JSON) -> None:
+def handle_cats_created(messages: List[dto.JSON]) -> Dict[int, Exception]:
+    """
+    Batch handler for `cat.created`. Messages without the required keys fail on their own, all
+    others are handled together.
+    """
+    failures: Dict[int, Exception] = {}
+    cat_ids: List[dto.CatID] = []
+    for index, data in enumerate(messages):
+        try:
+            _check_required_keys(data, {"cat_id"})
+        except EventException as e:
+            failures[index] = e
+            continue
+
+        cat_ids.append(dto.CatID(data["cat_id"]))
+
+    logger.info(f"{len(cat_ids)} Cats have been created: {', '.join(cat_ids)}")
+    # TODO: Handle the async postprocessing of created Cats here, with one query per batch.
+
+    return failures
+
+
+def handle_cat_deleted(data: dto.JSON) -> None:
     event_id = data.get("event_id")
     cat_id = data.get("cat_id")
-    required_keys = {"cat_id"}
-
-    if not all(key in data for key in required_keys):
-        exception_message = (
-            f"Cannot process event: missing required keys. "
-            f"Got: {', '.join(data.keys())}. Expected: {', '.join(required_keys)}"
-        )
-        logger.exception(f"[{event_id}] {exception_message}")
-        raise EventException(exception_message)
+    _check_required_keys(data, {"cat_id"})
 
-    logger.info(f"[{event_id}] Cat {cat_id} has been created")
-    # TODO: Handle the async postprocessing of a created Cat here.
+    logger.info(f"[{event_id}] Cat {cat_id} has been deleted")
 
 
 EVENT_HANDLERS: Mapping[str, Callable] = {
     "ping": handle_ping,
     "ujcatapi-ping": handle_ping,
-    "cat.created": handle_cat_created,
+    "cat.deleted": handle_cat_deleted,
+}
+
+BATCH_EVENT_HANDLERS: Mapping[str, Callable[[List[dto.JSON]], Dict[int, Exception]]] = {
+    "cat.created": handle_cats_created,
 }
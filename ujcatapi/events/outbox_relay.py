@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List
+
+from ujcatapi import config, dto
+from ujcatapi.events import common
+from ujcatapi.metrics import EVENTS_PUBLISHED_TOTAL
+from ujcatapi.models import cat_model, outbox_model
+
+logger = logging.getLogger(__name__)
+
+
+async def relay_batch(batch_size: int) -> int:
+    """
+    Publishes the oldest events that are pending in Cats and in the outbox collection, and removes
+    the published ones. Each of the two stops at the first event that fails to publish, so that it
+    is retried before any newer event of it is published. An event is removed only after it has
+    been published, so a relay that dies in between publishes it again: delivery is
+    at-least-once.
+
+    :return: The number of published events.
+    """
+    published_count = await _relay_events(
+        await cat_model.find_pending_events(limit=batch_size), cat_model.delete_pending_events
+    )
+    published_count += await _relay_events(
+        await outbox_model.find_pending(limit=batch_size), outbox_model.delete_many
+    )
+    return published_count
+
+
+async def _relay_events(
+    events: List[dto.OutboxEvent],
+    delete_published: Callable[[List[dto.OutboxEventID]], Awaitable[int]],
+) -> int:
+    if not events:
+        return 0
+
+    producer = common.get_producer()
+    loop = asyncio.get_running_loop()
+    published_event_ids = []
+    for event in events:
+        try:
+            # produce blocks until the broker has confirmed the event, so it runs in a thread.
+            await loop.run_in_executor(None, producer.produce, event.event_name, event.data)
+        except Exception as e:
+            EVENTS_PUBLISHED_TOTAL.inc(event_name=event.event_name, result="failed")
+            logger.exception(
+                f"Failed to relay event {event.event_name} because of {e}",
+                extra={"payload": event.data},
+            )
+            break
+
+        EVENTS_PUBLISHED_TOTAL.inc(event_name=event.event_name, result="published")
+        published_event_ids.append(event.id)
+
+    await delete_published(published_event_ids)
+    logger.info(f"Relayed {len(published_event_ids)} events from the outbox")
+    return len(published_event_ids)
+
+
+async def run() -> None:  # pragma: no cover
+    """
+    Relays outbox events until the process is stopped. Only one relay should run at a time.
+    """
+    while True:
+        published_count = await relay_batch(config.OUTBOX_RELAY_BATCH_SIZE)
+        # A full batch means that more events are probably waiting.
+        if published_count < config.OUTBOX_RELAY_BATCH_SIZE:
+            await asyncio.sleep(config.OUTBOX_RELAY_POLL_INTERVAL_SECONDS)
@@ -0,0 +1,156 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ai_event_pubsub.producer import EventProducer
+
+from ujcatapi import dto
+from ujcatapi.metrics import EVENTS_PUBLISHED_TOTAL
+
+logger = logging.getLogger(__name__)
+
+Event = Tuple[str, dto.JSON]
+
+_STOP = object()
+
+
+class EventPublisher:
+    """
+    Publishes events from a dedicated thread, so that firing an event from the event loop only
+    costs a non-blocking put onto a bounded in-memory queue.
+
+    The thread takes whatever is queued, up to batch_size events at a time, and produces them
+    back to back on the same producer. A failed publish is retried max_retries times with a
+    linear backoff before the event is dropped. When the queue is full, new events are dropped
+    instead of blocking the caller. Dropped events are counted and logged.
+    """
+
+    def __init__(
+        self,
+        get_producer: Callable[[], EventProducer],
+        max_queue_size: int,
+        batch_size: int,
+        max_retries: int,
+        retry_backoff: float,
+    ):
+        self._get_producer = get_producer
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self.published = 0
+        self.retried = 0
+        # Counted both by publish and by the thread, hence the lock.
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="EventPublisher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float) -> None:
+        """
+        Publish everything that is still queued and stop the thread, waiting at most timeout
+        seconds for it.
+        """
+        if self._thread is None:
+            return
+
+        self._stopping.set()
+        try:
+            # Wakes the thread up if it waits for events.
+            self._queue.put_nowait(_STOP)
+        except queue.Full:
+            # The thread is busy with a full queue, and stops once it has emptied it.
+            pass
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(
+                f"Event publisher did not flush within {timeout} seconds, "
+                f"{self._queue.qsize()} events are left unpublished"
+            )
+        self._thread = None
+
+    def publish(self, event_name: str, data: dto.JSON) -> bool:
+        try:
+            self._queue.put_nowait((event_name, data))
+        except queue.Full:
+            self._count_dropped()
+            EVENTS_PUBLISHED_TOTAL.inc(event_name=event_name, result="dropped")
+            logger.error(
+                f"Event queue is full, dropping event {event_name}", extra={"payload": data}
+            )
+            return False
+
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running,
+            "queued": self._queue.qsize(),
+            "published": self.published,
+            "retried": self.retried,
+            "dropped": self.dropped,
+        }
+
+    def _count_dropped(self) -> None:
+        with self._dropped_lock:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Event] = []
+            item = self._queue.get()
+            while True:
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._publish_batch(batch)
+            if self._stopping.is_set() and self._queue.empty():
+                stopping = True
+
+    def _publish_batch(self, batch: List[Event]) -> None:
+        for event_name, data in batch:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self._get_producer().produce(event_name, data)
+                except Exception as e:
+                    if attempt < self.max_retries:
+                        self.retried += 1
+                        time.sleep(self.retry_backoff * (attempt + 1))
+                        continue
+
+                    self._count_dropped()
+                    EVENTS_PUBLISHED_TOTAL.inc(event_name=event_name, result="failed")
+                    logger.exception(
+                        f"Failed to create event {event_name} because of {e}",
+                        extra={"payload": data},
+                    )
+                else:
+                    self.published += 1
+                    EVENTS_PUBLISHED_TOTAL.inc(event_name=event_name, result="published")
+
+                break
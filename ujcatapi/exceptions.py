@@ -24,3 +24,7 @@ class EntityNotFoundError(UjcatapiError):
 
 class CatNotFoundError(EntityNotFoundError):
     pass
+
+
+class InvalidPageTokenError(UjcatapiError):
+    pass
@@ -0,0 +1,84 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Set, Tuple, TypeVar
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ValueT = TypeVar("ValueT")
+
+
+class TTLCache(Generic[KeyT, ValueT]):
+    """
+    In-process cache with a bounded size, least-recently-used eviction and a time-to-live per
+    entry. It is not thread-safe, which is fine as long as it is only used from the event loop.
+
+    Keys can be grouped with group_of, e.g. all the keys of one record, so that discard_group
+    drops a group without scanning the whole cache.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        timer: Callable[[], float] = time.monotonic,
+        group_of: Optional[Callable[[KeyT], Hashable]] = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._timer = timer
+        self._group_of = group_of
+        self._entries: "OrderedDict[KeyT, Tuple[float, ValueT]]" = OrderedDict()
+        self._groups: Dict[Hashable, Set[KeyT]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: KeyT) -> Optional[ValueT]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self._timer():
+            self._delete(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: KeyT, value: ValueT) -> None:
+        self._entries[key] = (self._timer() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if self._group_of is not None:
+            self._groups.setdefault(self._group_of(key), set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._delete(next(iter(self._entries)))
+            self.evictions += 1
+
+    def discard_group(self, group: Hashable) -> None:
+        for key in self._groups.pop(group, set()):
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._groups.clear()
+
+    def _delete(self, key: KeyT) -> None:
+        del self._entries[key]
+        if self._group_of is not None:
+            group = self._group_of(key)
+            keys = self._groups[group]
+            keys.discard(key)
+            if not keys:
+                del self._groups[group]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
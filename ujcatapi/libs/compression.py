@@ -0,0 +1,131 @@
+import zlib
+from typing import Any, Callable, Dict, Optional, Protocol, Sequence
+
+# brotli and zstandard are optional: their encodings are offered only when they are installed.
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# Qualities suited to compressing responses on the fly rather than static assets.
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    def flush(self) -> bytes:
+        """
+        Returns everything compressed so far, so that the client can decompress it before the
+        stream has finished.
+        """
+        ...
+
+    def finish(self) -> bytes:
+        ...
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        # A window of 16 + MAX_WBITS makes zlib write the gzip header and trailer.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int = BROTLI_QUALITY):
+        self._compressor: Any = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int = ZSTD_LEVEL):
+        self._compressor: Any = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def get_compressor_factories(
+    encodings: Sequence[str], gzip_level: int
+) -> Dict[str, Callable[[], Compressor]]:
+    """
+    Returns a compressor factory for each of the encodings that is available, in the given order
+    of preference. Unknown encodings and the ones whose library is not installed are left out.
+    """
+    available: Dict[str, Optional[Callable[[], Compressor]]] = {
+        "gzip": lambda: GzipCompressor(gzip_level),
+        "br": BrotliCompressor if brotli is not None else None,
+        "zstd": ZstdCompressor if zstandard is not None else None,
+    }
+    factories: Dict[str, Callable[[], Compressor]] = {}
+    for encoding in encodings:
+        factory = available.get(encoding)
+        if factory is not None:
+            factories[encoding] = factory
+    return factories
+
+
+def _parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+    qualities = {}
+    for element in accept_encoding.split(","):
+        name, _, parameters = element.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+
+        quality = 1.0
+        parameter, _, value = parameters.partition("=")
+        if parameter.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        qualities[name] = quality
+    return qualities
+
+
+def negotiate_encoding(accept_encoding: str, encodings: Sequence[str]) -> Optional[str]:
+    """
+    Picks the encoding with the highest quality in the Accept-Encoding header of the request
+    among the given ones, preferring the earlier ones on equal quality. Returns None if the
+    client accepts none of them.
+    """
+    qualities = _parse_accept_encoding(accept_encoding)
+    default_quality = qualities.get("*", 0.0)
+
+    best_encoding, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, default_quality)
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
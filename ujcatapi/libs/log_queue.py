@@ -0,0 +1,123 @@
+import atexit
+import queue
+from logging import Handler, Logger, LogRecord
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Puts records onto a bounded queue without ever blocking the logging thread. Records that do
+    not fit are dropped and counted.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[Any]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        # Unlike QueueHandler.prepare, this does not format the record: formatting and
+        # sanitizing happen on the listener thread. Only the arguments are merged into the
+        # message, so that objects mutated after the call are logged as they were.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _BlockingSentinelQueueListener(QueueListener):
+    def __init__(self, log_queue: "queue.Queue[Any]", *handlers: Handler):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self._log_queue = log_queue
+
+    def enqueue_sentinel(self) -> None:
+        # The queue may be full when stopping, in which case put_nowait would raise.
+        self._log_queue.put(self._sentinel)  # type: ignore[attr-defined]
+
+
+class QueuedLogging:
+    """
+    Moves the handlers of a logger behind a queue, so that formatting, sanitizing and writing
+    records happen on a background thread.
+    """
+
+    def __init__(self, logger: Logger, max_size: int):
+        log_queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_size)
+        self.logger = logger
+        self.max_size = max_size
+        self._queue = log_queue
+        self._handlers = list(logger.handlers)
+        self.handler = DroppingQueueHandler(log_queue)
+        self._listener = _BlockingSentinelQueueListener(log_queue, *self._handlers)
+        self._is_running = False
+
+    def start(self) -> None:
+        if self._is_running:
+            return
+
+        for handler in self._handlers:
+            self.logger.removeHandler(handler)
+        self.logger.addHandler(self.handler)
+        self._listener.start()
+        self._is_running = True
+
+    def stop(self) -> None:
+        """
+        Writes all queued records, stops the background thread and gives the logger back its
+        handlers, so that records logged afterwards are written right away.
+        """
+        if not self._is_running:
+            return
+
+        self.logger.removeHandler(self.handler)
+        self._listener.stop()
+        for handler in self._handlers:
+            self.logger.addHandler(handler)
+        self._is_running = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._is_running,
+            "queued": self._queue.qsize(),
+            "max_size": self.max_size,
+            "dropped": self.handler.dropped,
+        }
+
+
+_queued_logging: Optional[QueuedLogging] = None
+
+
+def install(logger: Logger, max_size: int) -> None:
+    """
+    Replaces the handlers of the logger with a queue handler and starts writing queued records
+    to the original handlers from a background thread. Queued records are flushed at exit, or
+    earlier by calling stop. Calling it again restarts the installed queue instead of chaining a
+    second one in front of it.
+    """
+    global _queued_logging
+    if _queued_logging is not None:
+        _queued_logging.start()
+        return
+    if any(isinstance(handler, DroppingQueueHandler) for handler in logger.handlers):
+        return
+
+    _queued_logging = QueuedLogging(logger, max_size=max_size)
+    _queued_logging.start()
+    atexit.register(stop)
+
+
+def stop() -> None:
+    if _queued_logging is not None:
+        _queued_logging.stop()
+
+
+def get_stats() -> Dict[str, Any]:
+    if _queued_logging is None:
+        return {"enabled": False}
+
+    return {"enabled": True, **_queued_logging.stats()}
@@ -1,6 +1,10 @@
+import copy
+import functools
+import json
 import re
+from datetime import datetime, timezone
 from logging import Formatter, Handler, LogRecord
-from typing import Any, List, Optional, Pattern
+from typing import Any, Dict, List, Optional, Pattern
 
 SENSITIVE_FIELDS = [
     "access_token",
@@ -28,14 +32,33 @@ VALUE_PATTERN = f"{LEFT_PAREN}{NON_GREEDY_VALUE}{MATCHING_RIGHT_PAREN_UNESCAPED_
 
 EMAIL_PATTERN = re.compile(r"([\w_\.+-]+@[\w_\.-]+)")
 EMAIL_REPLACEMENT = r"(?=\w{3,})(?<=\w{3})\w|(?!\w{3})\w"
+EMAIL_REPLACEMENT_PATTERN = re.compile(EMAIL_REPLACEMENT)
 EMAIL_SUBSTITUTION = "*"
 
+# Masked email addresses are cached, since the same addresses show up in many different lines.
+# Whole lines are not: they nearly always differ, by their timestamp if not by an ID.
+EMAIL_CACHE_MAX_SIZE = 1024
 
-def _get_sensitive_field_regex(field: str) -> Pattern:
-    return re.compile(f"({field}|'{field}'|\"{field}\"){SEPARATOR_PATTERN}{VALUE_PATTERN}")
 
-
-SENSITIVE_FIELD_PATTERNS = [_get_sensitive_field_regex(field) for field in SENSITIVE_FIELDS]
+def _get_sensitive_fields_regex(fields: List[str]) -> Pattern:
+    """
+    One alternation for all fields, so that a message is scanned once instead of once per field.
+    Longer fields come first, so that e.g. password_reset_token is tried before password.
+    """
+    field = "|".join(re.escape(field) for field in sorted(fields, key=len, reverse=True))
+    return re.compile(
+        f"((?:{field})|'(?:{field})'|\"(?:{field})\"){SEPARATOR_PATTERN}{VALUE_PATTERN}"
+    )
+
+
+SENSITIVE_FIELDS_PATTERN = _get_sensitive_fields_regex(SENSITIVE_FIELDS)
+# Every message that contains a sensitive field contains one of these, e.g. "secret" covers
+# "client_secret". Checking for them with `in` is much cheaper than running the regex.
+SENSITIVE_FIELD_KEYWORDS = [
+    field
+    for field in SENSITIVE_FIELDS
+    if not any(other != field and other in field for other in SENSITIVE_FIELDS)
+]
 
 
 FIELD_CAP = r"\1"
@@ -48,6 +71,11 @@ FIELD_SUBSTITUTION_PATTERN = (
 )
 
 
+@functools.lru_cache(maxsize=EMAIL_CACHE_MAX_SIZE)
+def _mask_email(email: str) -> str:
+    return EMAIL_REPLACEMENT_PATTERN.sub(EMAIL_SUBSTITUTION, email)
+
+
 def _sanitize_string(msg: str) -> str:
     """
     Replaces PII from string input, which could be an email address or a string
@@ -55,13 +83,33 @@ def _sanitize_string(msg: str) -> str:
     truncated to a certain length, thus the value pattern above also captures
     values when hitting end-of-string.
     """
-    for email in EMAIL_PATTERN.findall(msg):
-        msg = msg.replace(email, re.sub(EMAIL_REPLACEMENT, EMAIL_SUBSTITUTION, email))
-    for field_pattern in SENSITIVE_FIELD_PATTERNS:
-        msg = field_pattern.sub(FIELD_SUBSTITUTION_PATTERN, msg)
+    if "@" in msg:
+        for email in EMAIL_PATTERN.findall(msg):
+            msg = msg.replace(email, _mask_email(email))
+    if any(keyword in msg for keyword in SENSITIVE_FIELD_KEYWORDS):
+        msg = SENSITIVE_FIELDS_PATTERN.sub(FIELD_SUBSTITUTION_PATTERN, msg)
     return msg
 
 
+def _lru_cache_stats(cache_info: Any) -> Dict[str, Any]:
+    lookups = cache_info.hits + cache_info.misses
+    return {
+        "size": cache_info.currsize,
+        "max_size": cache_info.maxsize,
+        "hits": cache_info.hits,
+        "misses": cache_info.misses,
+        "hit_rate": cache_info.hits / lookups if lookups else 0.0,
+    }
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    return {"emails": _lru_cache_stats(_mask_email.cache_info())}
+
+
+def clear_caches() -> None:
+    _mask_email.cache_clear()
+
+
 def _sanitize_object(obj: object) -> object:
     if isinstance(obj, str):
         return _sanitize_string(obj)
@@ -72,6 +120,8 @@ def _sanitize_object(obj: object) -> object:
             else _sanitize_object(obj=value)
             for key, value in obj.items()
         }
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize_object(obj=value) for value in obj]
     return obj
 
 
@@ -79,6 +129,22 @@ class LogSanitizerException(Exception):
     pass
 
 
+# Attributes every LogRecord has. Any other attribute was passed to the log call in `extra`.
+_LOG_RECORD_ATTRIBUTES = set(vars(LogRecord("", 0, "", 0, "", None, None))) | {"message"}
+
+
+def _sanitized_extra(record: LogRecord) -> Dict[str, Any]:
+    """
+    Returns the fields passed in `extra`, sanitized by key like Sentry event params, so that
+    structured data such as event payloads does not have to be scanned as text.
+    """
+    return {
+        key: HIDDEN_FIELD_DISPLAY_VALUE if key in SENSITIVE_FIELDS else _sanitize_object(value)
+        for key, value in vars(record).items()
+        if key not in _LOG_RECORD_ATTRIBUTES
+    }
+
+
 class SanitizedFormatter(Formatter):
     """
     Custom formatter object which sanitizes logs before they are passed to a Handler.
@@ -91,15 +157,51 @@ class SanitizedFormatter(Formatter):
         self.orig_formatter = orig_formatter
 
     def format(self, record: LogRecord) -> str:
+        """
+        Sanitizes the whole formatted line. Fields passed in `extra` are sanitized by key and
+        appended to the message as JSON, in a copy of the record that other handlers do not see.
+        """
         if not self.orig_formatter:
             raise LogSanitizerException()
-        msg = self.orig_formatter.format(record)
-        return _sanitize_string(msg=msg)
+        extra = _sanitized_extra(record)
+        if extra:
+            record = copy.copy(record)
+            record.msg = (
+                f"{record.getMessage()} {json.dumps(extra, default=str, ensure_ascii=False)}"
+            )
+            record.args = None
+        return _sanitize_string(self.orig_formatter.format(record))
 
     def __getattr__(self, attr: str) -> Any:
         return getattr(self.orig_formatter, attr)
 
 
+class SanitizedJSONFormatter(Formatter):
+    """
+    Formats records as one JSON object per line. Fields passed in `extra` are added to the object
+    and sanitized by key, like Sentry event params, so that only the free-text message and the
+    exception text have to be scanned with the sanitizer regexes.
+    """
+
+    def format(self, record: LogRecord) -> str:
+        log_entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "thread": record.threadName,
+            "message": _sanitize_string(record.getMessage()),
+        }
+        for key, value in _sanitized_extra(record).items():
+            log_entry.setdefault(key, value)
+        if record.exc_info:
+            log_entry["exception"] = _sanitize_string(self.formatException(record.exc_info))
+        if record.stack_info:
+            log_entry["stack"] = _sanitize_string(self.formatStack(record.stack_info))
+
+        return json.dumps(log_entry, default=str, ensure_ascii=False)
+
+
 def sanitize_formatters(handlers: List[Handler]) -> None:
     for h in handlers:
         h.setFormatter(fmt=SanitizedFormatter(orig_formatter=h.formatter))
@@ -110,3 +212,8 @@ def sentry_event_log_sanitizer(event: Any, hint: Any) -> Any:
     for index, param in enumerate(log_params):
         log_params[index] = _sanitize_object(obj=param)
     return event
+
+
+def use_json_formatters(handlers: List[Handler]) -> None:
+    for h in handlers:
+        h.setFormatter(fmt=SanitizedJSONFormatter())
@@ -1,25 +1,33 @@
+import asyncio
 import logging
 import sys
-from typing import Callable
+from typing import Any, Dict
 
 import sentry_sdk
 import uvicorn  # type: ignore
 from ai_event_pubsub.consumer import EventConsumer
 from ai_event_pubsub.healthcheck import run_healthcheck
 from elasticapm.contrib.starlette import ElasticAPM, make_apm_client  # type: ignore
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse, Response
+from fastapi.responses import RedirectResponse
 from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
 from sentry_sdk.integrations.logging import LoggingIntegration
 
 from ujcatapi import config
 from ujcatapi.error_handler import exception_handler, validation_exception_handler
-from ujcatapi.events.event_handlers import EVENT_HANDLERS
+from ujcatapi.events import common as events_common
+from ujcatapi.events import outbox_relay
+from ujcatapi.events.consumer import EventConsumerPool, EventHandlerMap
+from ujcatapi.events.event_handlers import BATCH_EVENT_HANDLERS, EVENT_HANDLERS
 from ujcatapi.exceptions import UjcatapiError
-from ujcatapi.libs import log_sanitizer
-from ujcatapi.views import cat_view, status_view
+from ujcatapi.libs import log_queue, log_sanitizer
+from ujcatapi.libs.metrics import start_http_server
+from ujcatapi.metrics import REGISTRY
+from ujcatapi.middlewares import CompressionMiddleware, ContentTypeMiddleware, MetricsMiddleware
+from ujcatapi.models import common as models_common
+from ujcatapi.views import cat_view, metrics_view, status_view
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +37,17 @@ def init_logging() -> None:
         format="%(asctime)s %(levelname)-5.5s [%(name)s:%(lineno)s][%(threadName)s] %(message)s",
         level=config.LOG_LEVEL,
     )
-    log_sanitizer.sanitize_formatters(logging.root.handlers)
+    if config.LOG_FORMAT == "json":
+        log_sanitizer.use_json_formatters(logging.root.handlers)
+    else:
+        log_sanitizer.sanitize_formatters(logging.root.handlers)
+
+
+def start_queued_logging() -> None:
+    # Not called at import time: `python -m ujcatapi.main api` imports this module twice, once
+    # as __main__ and once when uvicorn loads the app.
+    if config.ENABLE_QUEUED_LOGGING:
+        log_queue.install(logging.root, max_size=config.LOG_QUEUE_MAX_SIZE)
 
 
 def init_sentry(app: FastAPI) -> None:  # pragma: no cover
@@ -62,17 +80,58 @@ def init_apm(app: FastAPI) -> None:  # pragma: no cover
     app.add_middleware(ElasticAPM, client=apm)
 
 
-def init_event_consumer() -> EventConsumer:
+def init_event_consumer(event_handler_map: EventHandlerMap) -> EventConsumer:
     return EventConsumer(
         service_name="ujcatapi",
         environment_name=config.ENVIRONMENT,
         amqp_url=config.AMQP_URL,
+        event_handler_map=event_handler_map,
+    )
+
+
+def init_event_consumer_pool() -> EventConsumerPool:
+    return EventConsumerPool(
+        consumer_factory=init_event_consumer,
         event_handler_map=EVENT_HANDLERS,
+        workers=config.CONSUMER_WORKERS,
+        handler_concurrency=config.CONSUMER_HANDLER_CONCURRENCY,
+        batch_event_handler_map=BATCH_EVENT_HANDLERS,
+        batch_max_size=config.CONSUMER_BATCH_MAX_SIZE,
+        batch_max_wait=config.CONSUMER_BATCH_MAX_WAIT_MS / 1000,
     )
 
 
+def get_uvicorn_options() -> Dict[str, Any]:
+    if config.ENABLE_RELOAD_UVICORN:
+        # Reloading runs a single worker.
+        workers_options: Dict[str, Any] = {"reload": True}
+    else:
+        if config.ENABLE_METRICS and config.API_WORKERS > 1:
+            # A scrape would land on a random worker, so counters would seem to reset and go
+            # backwards.
+            raise ValueError(
+                "ENABLE_METRICS cannot be used with API_WORKERS > 1, since every worker has "
+                "its own metrics. Run more replicas with one worker each instead."
+            )
+        workers_options = {"workers": config.API_WORKERS}
+
+    return {
+        "host": "0.0.0.0",
+        "port": 10000,
+        "log_level": "info",
+        "loop": config.API_LOOP,
+        "http": config.API_HTTP,
+        "timeout_keep_alive": config.API_KEEP_ALIVE_TIMEOUT_SECONDS,
+        "backlog": config.API_BACKLOG,
+        "limit_concurrency": config.API_LIMIT_CONCURRENCY or None,
+        **workers_options,
+    }
+
+
 def include_routers(app: FastAPI) -> None:
     app.include_router(status_view.router)
+    if config.ENABLE_METRICS:
+        app.include_router(metrics_view.router)
     app.include_router(cat_view.router, prefix="/v1")
 
 
@@ -81,6 +140,18 @@ def add_exception_handlers(app: FastAPI) -> None:
     app.add_exception_handler(UjcatapiError, exception_handler)
 
 
+def add_event_handlers(app: FastAPI) -> None:
+    # Registered first, so that records logged by the other startup handlers are queued too.
+    app.add_event_handler("startup", start_queued_logging)
+    app.add_event_handler("startup", events_common.start_event_publisher)
+    # Runs in every worker process, since each of them has a connection pool of its own.
+    app.add_event_handler("startup", models_common.connect)
+    app.add_event_handler("shutdown", events_common.stop_event_publisher)
+    app.add_event_handler("shutdown", models_common.close)
+    # Registered last, so that records logged by the other shutdown handlers are written too.
+    app.add_event_handler("shutdown", log_queue.stop)
+
+
 def add_middlewares(app: FastAPI) -> None:
     app.add_middleware(
         CORSMiddleware,
@@ -99,12 +170,21 @@ def add_middlewares(app: FastAPI) -> None:
         max_age=1728000,
     )
 
-    @app.middleware("http")
-    async def replace_content_type_header(request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
-        if response.headers.get("content-type") == "application/json":
-            response.headers["content-type"] = "application/json; charset=utf-8"
-        return response
+    app.add_middleware(ContentTypeMiddleware)
+
+    if config.ENABLE_RESPONSE_COMPRESSION:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=config.RESPONSE_COMPRESSION_MINIMUM_SIZE,
+            content_types=config.RESPONSE_COMPRESSION_CONTENT_TYPES,
+            encodings=config.RESPONSE_COMPRESSION_ENCODINGS,
+            gzip_level=config.RESPONSE_COMPRESSION_GZIP_LEVEL,
+            flush_size=config.RESPONSE_COMPRESSION_FLUSH_SIZE,
+        )
+
+    if config.ENABLE_METRICS:
+        # Added last, so that it wraps all other middlewares.
+        app.add_middleware(MetricsMiddleware)
 
 
 init_logging()
@@ -116,6 +196,7 @@ init_sentry(app)
 init_apm(app)
 include_routers(app)
 add_exception_handlers(app)
+add_event_handlers(app)
 add_middlewares(app)
 
 
@@ -128,21 +209,28 @@ if __name__ == "__main__":
     args = sys.argv[1:]
 
     if len(args) == 0 or args[0] == "api":
-        uvicorn.run(
-            "ujcatapi.main:app",
-            host="0.0.0.0",
-            port=10000,
-            log_level="info",
-            reload=config.ENABLE_RELOAD_UVICORN,
-        )
+        uvicorn.run("ujcatapi.main:app", **get_uvicorn_options())
 
     elif args[0] == "consumer":
         if not config.ENABLE_AMQP:
             logger.warning("AMQP is not enabled, consumer will not start")
             sys.exit(0)
 
-        event_consumer = init_event_consumer()
-        event_consumer.run()
+        start_queued_logging()
+        if config.METRICS_SERVER_PORT:
+            start_http_server(REGISTRY, port=config.METRICS_SERVER_PORT)
+        event_consumer_pool = init_event_consumer_pool()
+        event_consumer_pool.run()
+
+    elif args[0] == "outbox-relay":
+        if not config.ENABLE_AMQP:
+            logger.warning("AMQP is not enabled, outbox-relay will not start")
+            sys.exit(0)
+
+        start_queued_logging()
+        if config.METRICS_SERVER_PORT:
+            start_http_server(REGISTRY, port=config.METRICS_SERVER_PORT)
+        asyncio.run(outbox_relay.run())
 
     elif args[0] == "consumer-healthcheck":
         if not config.ENABLE_AMQP:
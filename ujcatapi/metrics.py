@@ -0,0 +1,67 @@
+import functools
+from typing import Any, Awaitable, Callable, TypeVar, cast
+
+from ujcatapi.libs.metrics import Counter, Histogram, Registry
+
+AsyncFunctionT = TypeVar("AsyncFunctionT", bound=Callable[..., Awaitable[Any]])
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS_TOTAL = Counter(
+    "ujcatapi_http_requests_total",
+    "Number of HTTP requests by method, route and status code.",
+    ["method", "route", "status_code"],
+)
+HTTP_REQUEST_DURATION_SECONDS = Histogram(
+    "ujcatapi_http_request_duration_seconds",
+    "Time until the response has been sent, by method and route.",
+    ["method", "route"],
+)
+MONGO_OPERATION_DURATION_SECONDS = Histogram(
+    "ujcatapi_mongo_operation_duration_seconds",
+    "Duration of model operations against MongoDB, by collection and operation.",
+    ["collection", "operation"],
+)
+MONGO_COMMAND_DURATION_SECONDS = Histogram(
+    "ujcatapi_mongo_command_duration_seconds",
+    "Duration of the commands sent to MongoDB, by command name.",
+    ["command"],
+)
+EVENTS_PUBLISHED_TOTAL = Counter(
+    "ujcatapi_events_published_total",
+    "Number of events handed to the broker or dropped, by event name and result.",
+    ["event_name", "result"],
+)
+EVENTS_CONSUMED_TOTAL = Counter(
+    "ujcatapi_events_consumed_total",
+    "Number of consumed events, by event name and result.",
+    ["event_name", "result"],
+)
+
+for metric in [
+    HTTP_REQUESTS_TOTAL,
+    HTTP_REQUEST_DURATION_SECONDS,
+    MONGO_OPERATION_DURATION_SECONDS,
+    MONGO_COMMAND_DURATION_SECONDS,
+    EVENTS_PUBLISHED_TOTAL,
+    EVENTS_CONSUMED_TOTAL,
+]:
+    REGISTRY.register(metric)
+
+
+def time_mongo_operation(
+    collection: str, operation: str
+) -> Callable[[AsyncFunctionT], AsyncFunctionT]:
+    """
+    Records the duration of the decorated model function in MONGO_OPERATION_DURATION_SECONDS.
+    """
+
+    def decorator(function: AsyncFunctionT) -> AsyncFunctionT:
+        @functools.wraps(function)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with MONGO_OPERATION_DURATION_SECONDS.time(collection=collection, operation=operation):
+                return await function(*args, **kwargs)
+
+        return cast(AsyncFunctionT, wrapper)
+
+    return decorator
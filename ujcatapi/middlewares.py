@@ -0,0 +1,200 @@
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ujcatapi.libs.compression import Compressor, get_compressor_factories, negotiate_encoding
+from ujcatapi.metrics import HTTP_REQUEST_DURATION_SECONDS, HTTP_REQUESTS_TOTAL
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class ContentTypeMiddleware:
+    """
+    Adds the charset to JSON responses, which FastAPI sends as plain application/json. The header
+    is rewritten in the response start message, so that the body is passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_charset(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if headers.get("content-type") == "application/json":
+                    headers["content-type"] = "application/json; charset=utf-8"
+            await send(message)
+
+        await self.app(scope, receive, send_with_charset)
+
+
+class MetricsMiddleware:
+    """
+    Counts requests and records their latency per route. Routes are labelled with their path
+    template, e.g. /v1/cats/{cat_id}, so that the number of label values stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._route_paths: Dict[Callable, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = self._get_route_path(scope)
+            HTTP_REQUEST_DURATION_SECONDS.observe(
+                time.perf_counter() - start, method=scope["method"], route=route
+            )
+            HTTP_REQUESTS_TOTAL.inc(
+                method=scope["method"], route=route, status_code=str(status_code)
+            )
+
+    def _get_route_path(self, scope: Scope) -> str:
+        # The router stores the matched endpoint in the scope.
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+
+        if endpoint not in self._route_paths:
+            router = scope.get("router")
+            for route in getattr(router, "routes", []):
+                if getattr(route, "endpoint", None) is endpoint:
+                    self._route_paths[endpoint] = route.path
+                    break
+            else:
+                return UNMATCHED_ROUTE
+
+        return self._route_paths[endpoint]
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses whose content type starts with one of content_types, with the first of
+    encodings that the client accepts. Responses smaller than minimum_size are sent as they are,
+    so the chunks of a streaming response are held back until that much has been produced.
+    Compressed output is sent whenever the compressor has some, and the compressor is flushed
+    after every flush_size bytes of input, so that the client receives a long stream as it is
+    produced without every chunk ending a compressed block of its own.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        content_types: Sequence[str],
+        encodings: Sequence[str] = ("br", "zstd", "gzip"),
+        gzip_level: int = 6,
+        flush_size: int = 64 * 1024,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.flush_size = flush_size
+        self.content_types = tuple(content_types)
+        self._compressor_factories = get_compressor_factories(encodings, gzip_level=gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), list(self._compressor_factories)
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        compressor: Optional[Compressor] = None
+        is_passthrough = False
+        held_back_chunks: List[bytes] = []
+        held_back_size = 0
+        unflushed_size = 0
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressor, is_passthrough, held_back_size, unflushed_size
+            if is_passthrough or message["type"] not in (
+                "http.response.start",
+                "http.response.body",
+            ):
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not self._is_compressible(
+                    headers.get("content-type", "")
+                ):
+                    is_passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the body tells whether the response is large enough.
+                    start_message = message
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                held_back_chunks.append(body)
+                held_back_size += len(body)
+                if more_body and held_back_size < self.minimum_size:
+                    return
+
+                body = b"".join(held_back_chunks)
+                held_back_chunks.clear()
+                assert start_message is not None
+                start_headers = MutableHeaders(raw=start_message["headers"])
+                start_headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.minimum_size:
+                    is_passthrough = True
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body, "more_body": False})
+                    return
+
+                compressor = self._compressor_factories[encoding]()
+                start_headers["content-encoding"] = encoding
+                del start_headers["content-length"]
+                compressed = compressor.compress(body)
+                if not more_body:
+                    compressed += compressor.finish()
+                    start_headers["content-length"] = str(len(compressed))
+                await send(start_message)
+            else:
+                compressed = compressor.compress(body)
+                if not more_body:
+                    compressed += compressor.finish()
+
+            unflushed_size += len(body)
+            if more_body and unflushed_size >= self.flush_size:
+                compressed += compressor.flush()
+                unflushed_size = 0
+
+            if compressed or not more_body:
+                await send(
+                    {"type": "http.response.body", "body": compressed, "more_body": more_body}
+                )
+
+        await self.app(scope, receive, send_compressed)
+
+    def _is_compressible(self, content_type: str) -> bool:
+        return content_type.split(";")[0].strip().lower().startswith(self.content_types)
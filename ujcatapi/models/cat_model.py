@@ -1,55 +1,114 @@
 import logging
 from datetime import datetime
-from typing import Dict, Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 
 import bson.errors
 import pymongo
 import pymongo.errors
 from bson import ObjectId
+from pymongo.client_session import ClientSession
+from pymongo.cursor import Cursor
 
 from ujcatapi import config, dto
 from ujcatapi.exceptions import DuplicateCatError, EmptyResultsFilter
+from ujcatapi.metrics import time_mongo_operation
+from ujcatapi.models import outbox_model
 from ujcatapi.models.common import (
+    MONGO_DUPLICATION_ERROR,
     BSONDocument,
+    _calculate_db_keyset_match,
     _calculate_db_skip_value,
+    _encode_page_token,
     bson_id_to_cat_id,
+    causal_session,
     get_collection,
+    get_read_preference,
 )
 
 _COLLECTION_NAME = "cats"
+# Outbox events written together with the Cat, see outbox_model.new_pending_event.
+_PENDING_EVENTS_FIELD = "pending_events"
 _CAT_SUMMARY_PROJECTION = {
     "_id": 1,
     "name": 1,
 }
+# Type of the values of each sort key, which page tokens are checked against.
+_CAT_SORT_VALUE_TYPES = {
+    f"_{dto.CatSortKey.id}": ObjectId,
+    dto.CatSortKey.name.value: str,
+}
 
 
 logger = logging.getLogger(__name__)
 
+# Returns the name and the data of an event about the Cat with the given ID.
+CatEventFactory = Callable[[dto.CatID], Tuple[str, dto.JSON]]
+
 
-async def create_cat(new_cat: dto.UnsavedCat, now: datetime) -> dto.Cat:
-    unsaved_cat_as_bson = unsaved_cat_to_bson(new_cat, now)
+@time_mongo_operation(_COLLECTION_NAME, "create_cat")
+async def create_cat(
+    new_cat: dto.UnsavedCat, now: datetime, created_event: Optional[CatEventFactory] = None
+) -> dto.Cat:
+    """
+    Creates a Cat. If created_event is given, the event it returns for the new Cat is stored in
+    the Cat document as a pending outbox event, so that both are written by the same insert.
+    """
+    unsaved_cat_as_bson = unsaved_cat_to_bson(new_cat, now, created_event)
     collection = await get_collection(_COLLECTION_NAME)
     try:
-        result = await collection.insert_one(unsaved_cat_as_bson)
+        async with causal_session() as session:
+            result = await collection.insert_one(unsaved_cat_as_bson, session=session)
     except pymongo.errors.DuplicateKeyError:
         raise DuplicateCatError(f"Cat with name {new_cat.name} already exists.")
     cat_id = bson_id_to_cat_id(result.inserted_id)
     logger.info(f"Successfully created Cat {cat_id} in Ujcatapi")
-    return dto.Cat(
-        id=cat_id,
-        **unsaved_cat_as_bson,
-    )
+    return cat_from_bson(unsaved_cat_as_bson)
+
+
+@time_mongo_operation(_COLLECTION_NAME, "create_cats")
+async def create_cats(
+    new_cats: List[dto.UnsavedCat],
+    now: datetime,
+    created_event: Optional[CatEventFactory] = None,
+) -> List[Union[dto.Cat, DuplicateCatError]]:
+    """
+    Creates many Cats with a single unordered insert_many. Cats whose name already exists are not
+    created, and a DuplicateCatError is returned in their place. created_event works as for
+    create_cat.
+    """
+    documents = [unsaved_cat_to_bson(new_cat, now, created_event) for new_cat in new_cats]
+    collection = await get_collection(_COLLECTION_NAME)
+
+    write_errors: Dict[int, BSONDocument] = {}
+    try:
+        # insert_many sets the generated _id on each document.
+        async with causal_session() as session:
+            await collection.insert_many(documents, ordered=False, session=session)
+    except pymongo.errors.BulkWriteError as bulk_write_error:
+        write_errors = {error["index"]: error for error in bulk_write_error.details["writeErrors"]}
+        if any(error["code"] != MONGO_DUPLICATION_ERROR for error in write_errors.values()):
+            raise
+
+    results: List[Union[dto.Cat, DuplicateCatError]] = [
+        DuplicateCatError(f"Cat with name {new_cat.name} already exists.")
+        if index in write_errors
+        else cat_from_bson(document)
+        for index, (new_cat, document) in enumerate(zip(new_cats, documents))
+    ]
+    logger.info(f"Successfully created {len(documents) - len(write_errors)} Cats in Ujcatapi")
+    return results
 
 
+@time_mongo_operation(_COLLECTION_NAME, "find_one")
 async def find_one(cat_filter: dto.CatFilter) -> Optional[dto.Cat]:
     try:
         match = cat_filter_to_db_match(cat_filter)
     except EmptyResultsFilter:
         return None
 
-    collection = await get_collection(_COLLECTION_NAME)
-
-    found = await collection.find_one(match)
+    collection = await get_collection(_COLLECTION_NAME, get_read_preference("find_one"))
+    async with causal_session() as session:
+        found = await collection.find_one(match, session=session)
 
     if found is None:
         return None
@@ -57,52 +116,144 @@ async def find_one(cat_filter: dto.CatFilter) -> Optional[dto.Cat]:
     return cat_from_bson(found)
 
 
+@time_mongo_operation(_COLLECTION_NAME, "find_many_by_ids")
+async def find_many_by_ids(
+    cat_ids: List[dto.CatID], scope: Optional[dto.Scope] = None
+) -> List[dto.Cat]:
+    """
+    Finds all Cats with one of the given IDs in a single query. IDs that are not valid ObjectIds
+    cannot match any Cat and are skipped.
+    """
+    object_ids = [ObjectId(cat_id) for cat_id in cat_ids if ObjectId.is_valid(cat_id)]
+    if not object_ids:
+        return []
+
+    try:
+        match = cat_filter_to_db_match(dto.CatFilter(scope=scope))
+    except EmptyResultsFilter:
+        return []
+    match["_id"] = {"$in": object_ids}
+
+    collection = await get_collection(_COLLECTION_NAME, get_read_preference("find_many_by_ids"))
+    async with causal_session() as session:
+        cursor = collection.find(match, batch_size=config.MONGO_FIND_BATCH_SIZE, session=session)
+        return [cat_from_bson(document) async for document in cursor]
+
+
+@time_mongo_operation(_COLLECTION_NAME, "find_many")
 async def find_many(
     cat_filter: Optional[dto.CatFilter] = None,
     cat_sort_params: Optional[dto.CatSortPredicates] = None,
     page: Optional[dto.Page] = None,
 ) -> dto.PagedResult[dto.CatSummary]:
     cat_filter = cat_filter or dto.CatFilter()
-    match = cat_filter_to_db_match(cat_filter)
+    sort, collation = _cat_sort_params_to_db_sort_and_collation(cat_sort_params)
 
-    # Default sort order. Prepend "_" if the intention is to sort results by ObjectId.
-    sort = {f"_{dto.CatSortKey.id}": dto.SortOrder.desc}
-    collation = None
-    if cat_sort_params is not None:
-        sort = cat_sort_params_to_db_sort(cat_sort_params)
-        collation = pymongo.collation.Collation(locale=config.DEFAULT_LOCALE)
+    match = _find_many_match(cat_filter, sort, page)
+    async with causal_session() as session:
+        cursor = await _find_many_cursor(match, sort, collation, page, "find_many", session)
+        documents = [document async for document in cursor]
 
-    facet = {
-        "results": [{"$project": _CAT_SUMMARY_PROJECTION}],
-    }
-    skip_limit = (
-        []
-        if page is None
-        else [{"$skip": _calculate_db_skip_value(page)}, {"$limit": page.size + 1}]
+    has_next_page = page is not None and len(documents) == page.size + 1
+    next_page_token = None
+    if has_next_page:
+        # We are fetching one document more to make sure that there is another page. The last
+        # document of the current page marks where the next page starts.
+        documents = documents[:-1]
+        next_page_token = _encode_page_token(sort, documents[-1])
+
+    cat_summaries = [cat_summary_from_bson(document) for document in documents]
+
+    return dto.PagedResult[dto.CatSummary](
+        results=cat_summaries,
+        metadata=dto.PageMetadata(has_next_page=has_next_page, next_page_token=next_page_token),
     )
 
-    pipeline = [
-        {"$match": match},
-        {"$sort": sort},
-        *skip_limit,
-        {"$facet": facet},
-        {"$project": {"results": _CAT_SUMMARY_PROJECTION}},
-    ]
-    collection = await get_collection(_COLLECTION_NAME)
-    results = collection.aggregate(pipeline=pipeline, collation=collation)
 
-    async for document in results:
-        cat_summaries = [cat_summary_from_bson(results) for results in document["results"]]
+async def stream_many(
+    cat_filter: Optional[dto.CatFilter] = None,
+    cat_sort_params: Optional[dto.CatSortPredicates] = None,
+    page: Optional[dto.Page] = None,
+) -> AsyncIterator[dto.CatSummary]:
+    """
+    Like find_many, but yields the Cat summaries while they are read from the cursor instead of
+    collecting them first. The match is built before returning, so that invalid filters and page
+    tokens raise here rather than while iterating.
+    """
+    cat_filter = cat_filter or dto.CatFilter()
+    sort, collation = _cat_sort_params_to_db_sort_and_collation(cat_sort_params)
+
+    match = _find_many_match(cat_filter, sort, page)
+    return _stream_cat_summaries(match, sort, collation, page)
 
-    has_next_page = page is not None and len(cat_summaries) == page.size + 1
-    if has_next_page:
-        # We are fetching one document more to make sure that there is another page. The extra
-        # document will be used in the future to enable token-based pagination.
-        cat_summaries = cat_summaries[:-1]
 
-    return dto.PagedResult[dto.CatSummary](
-        results=cat_summaries, metadata=dto.PageMetadata(has_next_page=has_next_page)
+async def _stream_cat_summaries(
+    match: BSONDocument,
+    sort: Dict[str, dto.SortOrder],
+    collation: Optional[pymongo.collation.Collation],
+    page: Optional[dto.Page],
+) -> AsyncIterator[dto.CatSummary]:
+    # The session is started by the generator, so that it stays open until the cursor is read.
+    async with causal_session() as session:
+        cursor = await _find_many_cursor(match, sort, collation, page, "stream_many", session)
+        if page is not None:
+            cursor = cursor.limit(page.size)
+
+        async for document in cursor:
+            yield cat_summary_from_bson(document)
+
+
+def _find_many_match(
+    cat_filter: dto.CatFilter, sort: Dict[str, dto.SortOrder], page: Optional[dto.Page]
+) -> BSONDocument:
+    match = cat_filter_to_db_match(cat_filter)
+    if page is not None and page.token is not None:
+        match = {
+            "$and": [match, _calculate_db_keyset_match(page.token, sort, _CAT_SORT_VALUE_TYPES)]
+        }
+    return match
+
+
+async def _find_many_cursor(
+    match: BSONDocument,
+    sort: Dict[str, dto.SortOrder],
+    collation: Optional[pymongo.collation.Collation],
+    page: Optional[dto.Page],
+    operation: str,
+    session: Optional[ClientSession],
+) -> Cursor:
+    """
+    Returns a plain find() cursor over the Cat summaries, so that results are streamed from the
+    server in batches instead of being built into a single document on the server. The cursor
+    reads with the read preference of the operation.
+    """
+    collection = await get_collection(_COLLECTION_NAME, get_read_preference(operation))
+    cursor = collection.find(
+        match,
+        projection=_CAT_SUMMARY_PROJECTION,
+        sort=list(sort.items()),
+        collation=collation,
+        batch_size=config.MONGO_FIND_BATCH_SIZE,
+        session=session,
     )
+    if page is not None:
+        cursor = cursor.skip(_calculate_db_skip_value(page)).limit(page.size + 1)
+
+    return cursor
+
+
+def _cat_sort_params_to_db_sort_and_collation(
+    cat_sort_params: Optional[dto.CatSortPredicates],
+) -> Tuple[Dict[str, dto.SortOrder], Optional[pymongo.collation.Collation]]:
+    # Default sort order. Prepend "_" if the intention is to sort results by ObjectId.
+    sort = {f"_{dto.CatSortKey.id}": dto.SortOrder.desc}
+    collation = None
+    if cat_sort_params is not None:
+        sort = cat_sort_params_to_db_sort(cat_sort_params)
+        collation = pymongo.collation.Collation(locale=config.DEFAULT_LOCALE)
+    # Break ties by ObjectId so that the order is total, which token-based pagination relies on.
+    sort.setdefault(f"_{dto.CatSortKey.id}", dto.SortOrder.asc)
+    return sort, collation
 
 
 def cat_sort_params_to_db_sort(
@@ -121,16 +272,25 @@ def cat_sort_params_to_db_sort(
     return sort_list
 
 
-def unsaved_cat_to_bson(new_cat: dto.UnsavedCat, now: datetime) -> BSONDocument:
-    return {
+def unsaved_cat_to_bson(
+    new_cat: dto.UnsavedCat, now: datetime, created_event: Optional[CatEventFactory] = None
+) -> BSONDocument:
+    document: BSONDocument = {
         **new_cat.dict(),
         "ctime": now,
         "mtime": now,
     }
+    if created_event is not None:
+        # The ID is generated here rather than by the insert, since the event refers to it.
+        document["_id"] = ObjectId()
+        event_name, data = created_event(bson_id_to_cat_id(document["_id"]))
+        document[_PENDING_EVENTS_FIELD] = [outbox_model.new_pending_event(event_name, data, now)]
+    return document
 
 
 def cat_from_bson(cat: BSONDocument) -> dto.Cat:
-    return dto.Cat(
+    # Documents are validated when they are written, so they are not validated again on reads.
+    return dto.Cat.construct(
         id=bson_id_to_cat_id(cat["_id"]),
         name=cat["name"],
         ctime=cat["ctime"],
@@ -165,25 +325,172 @@ def cat_filter_to_db_match(cat_filter: dto.CatFilter) -> BSONDocument:
 
 
 def cat_summary_from_bson(cat: BSONDocument) -> dto.CatSummary:
-    return dto.CatSummary(
+    return dto.CatSummary.construct(
         id=bson_id_to_cat_id(cat["_id"]),
-        **cat,
+        name=cat["name"],
     )
 
 
-async def delete_one(cat_id: dto.CatID) -> bool:
-    query: BSONDocument = {}
+@time_mongo_operation(_COLLECTION_NAME, "delete_one")
+async def delete_one(cat_id: dto.CatID) -> dto.DeletedCats:
     try:
-        query["_id"] = ObjectId(cat_id)
+        object_id = ObjectId(cat_id)
     except bson.errors.InvalidId:
         raise EmptyResultsFilter()
 
     collection = await get_collection(_COLLECTION_NAME)
 
-    result = await collection.delete_one({"_id": query["_id"]})
+    async with causal_session() as session:
+        deleted = await collection.find_one_and_delete(
+            {"_id": object_id}, projection={_PENDING_EVENTS_FIELD: 1}, session=session
+        )
+
+    if deleted is None:
+        return dto.DeletedCats(deleted_count=0, cat_ids=[], pending_events=[])
+    return dto.DeletedCats(
+        deleted_count=1, cat_ids=[cat_id], pending_events=_pending_events_from_bson(deleted)
+    )
+
+
+@time_mongo_operation(_COLLECTION_NAME, "delete_many")
+async def delete_many(
+    cat_filter: dto.CatFilter, cat_ids: Optional[List[dto.CatID]] = None
+) -> dto.DeletedCats:
+    """
+    Deletes all Cats that match the filter and, if given, have one of the IDs, one chunk at a
+    time with delete_chunk, so that a large delete does not hold locks for long.
+    """
+    count = 0
+    deleted_cat_ids: List[dto.CatID] = []
+    pending_events: List[dto.OutboxEvent] = []
+    while True:
+        deleted_cats, has_more = await delete_chunk(cat_filter, cat_ids=cat_ids)
+        count += deleted_cats.deleted_count
+        deleted_cat_ids.extend(deleted_cats.cat_ids)
+        pending_events.extend(deleted_cats.pending_events)
+        if not has_more:
+            break
+
+    logger.info(f"Successfully deleted {count} Cats in Ujcatapi")
+    return dto.DeletedCats(
+        deleted_count=count, cat_ids=deleted_cat_ids, pending_events=pending_events
+    )
+
+
+@time_mongo_operation(_COLLECTION_NAME, "delete_chunk")
+async def delete_chunk(
+    cat_filter: dto.CatFilter, cat_ids: Optional[List[dto.CatID]] = None
+) -> Tuple[dto.DeletedCats, bool]:
+    """
+    Deletes up to config.CAT_BULK_DELETE_CHUNK_SIZE Cats that match the filter and, if given,
+    have one of the IDs, with one delete_many by _id. Returns the deleted Cats and whether more
+    Cats may match.
+
+    The count is the deleted count of the server, so it does not include Cats that a concurrent
+    delete removed after they were found. Those Cats cannot be told apart from the others, so
+    their IDs and pending events are returned too and may be reported by both deletes.
+    """
+    empty_result = dto.DeletedCats(deleted_count=0, cat_ids=[], pending_events=[])
+    try:
+        match = cat_filter_to_db_match(cat_filter)
+    except EmptyResultsFilter:
+        return empty_result, False
+    if cat_ids is not None:
+        match["_id"] = {
+            "$in": [ObjectId(cat_id) for cat_id in cat_ids if ObjectId.is_valid(cat_id)]
+        }
+
+    collection = await get_collection(_COLLECTION_NAME)
+
+    async with causal_session() as session:
+        cursor = collection.find(
+            match,
+            projection={"_id": 1, _PENDING_EVENTS_FIELD: 1},
+            limit=config.CAT_BULK_DELETE_CHUNK_SIZE,
+            session=session,
+        )
+        documents = [document async for document in cursor]
+        if not documents:
+            return empty_result, False
+
+        object_ids = [document["_id"] for document in documents]
+        result = await collection.delete_many({"_id": {"$in": object_ids}}, session=session)
+
+    deleted_cats = dto.DeletedCats(
+        deleted_count=result.deleted_count,
+        cat_ids=[bson_id_to_cat_id(object_id) for object_id in object_ids],
+        pending_events=[
+            event for document in documents for event in _pending_events_from_bson(document)
+        ],
+    )
+    # Cats that a concurrent delete removed count toward a full chunk too, so that a chunk they
+    # emptied does not end the delete early.
+    has_more = len(object_ids) == config.CAT_BULK_DELETE_CHUNK_SIZE
+    return deleted_cats, has_more
+
+
+@time_mongo_operation(_COLLECTION_NAME, "find_pending_events")
+async def find_pending_events(limit: int) -> List[dto.OutboxEvent]:
+    """
+    Finds the outbox events that are still pending in Cats, of at most limit Cats, oldest first.
+    """
+    collection = await get_collection(_COLLECTION_NAME)
+    cursor = collection.find(
+        {_PENDING_EVENTS_FIELD: {"$exists": True}},
+        projection={_PENDING_EVENTS_FIELD: 1},
+        sort=[(f"{_PENDING_EVENTS_FIELD}._id", 1)],
+        limit=limit,
+    )
+    pending_events: List[dto.OutboxEvent] = []
+    async for document in cursor:
+        pending_events.extend(_pending_events_from_bson(document))
+    return pending_events
+
+
+@time_mongo_operation(_COLLECTION_NAME, "delete_pending_events")
+async def delete_pending_events(event_ids: List[dto.OutboxEventID]) -> int:
+    """
+    Removes the given pending events from the Cats that hold them, once they have been published.
+    """
+    if not event_ids:
+        return 0
+
+    object_ids = [ObjectId(event_id) for event_id in event_ids]
+    collection = await get_collection(_COLLECTION_NAME)
+    remaining_events = {
+        "$filter": {
+            "input": f"${_PENDING_EVENTS_FIELD}",
+            "cond": {"$not": [{"$in": ["$$this._id", object_ids]}]},
+        }
+    }
+    # The field is removed once it is empty, so that the Cat drops out of the partial index that
+    # find_pending_events uses.
+    result = await collection.update_many(
+        {f"{_PENDING_EVENTS_FIELD}._id": {"$in": object_ids}},
+        [
+            {
+                "$set": {
+                    _PENDING_EVENTS_FIELD: {
+                        "$let": {
+                            "vars": {"remaining": remaining_events},
+                            "in": {
+                                "$cond": [
+                                    {"$eq": [{"$size": "$$remaining"}, 0]},
+                                    "$$REMOVE",
+                                    "$$remaining",
+                                ]
+                            },
+                        }
+                    }
+                }
+            }
+        ],
+    )
+    return result.modified_count
 
-    is_deleted = True
-    if result.deleted_count == 0:
-        is_deleted = False
 
-    return is_deleted
+def _pending_events_from_bson(document: BSONDocument) -> List[dto.OutboxEvent]:
+    return [
+        outbox_model.outbox_event_from_bson(event)
+        for event in document.get(_PENDING_EVENTS_FIELD, [])
+    ]
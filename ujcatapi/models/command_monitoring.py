@@ -0,0 +1,122 @@
+import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Mapping, Tuple
+
+import pymongo
+from pymongo import monitoring
+
+from ujcatapi.metrics import MONGO_COMMAND_DURATION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Commands whose query plan can be explained.
+EXPLAINABLE_COMMANDS = {"aggregate", "count", "delete", "distinct", "find", "findAndModify"}
+# Fields that drivers add to every command and that are not part of the query.
+_DRIVER_FIELDS = {"lsid", "txnNumber", "$clusterTime", "$db", "$readPreference", "autocommit"}
+# Fields tied to the session or transaction of a command, which explain does not accept.
+_SESSION_FIELDS = {"readConcern", "startTransaction"}
+# Fields holding the documents of a write, which are summarized instead of logged.
+_DOCUMENT_FIELDS = {"documents", "updates"}
+
+BSONDocument = Mapping[str, Any]
+CommandKey = Tuple[Any, int]
+
+
+def _query_shape(command: BSONDocument) -> Dict[str, Any]:
+    return {
+        key: f"<{len(value)} documents>" if key in _DOCUMENT_FIELDS else value
+        for key, value in command.items()
+        if key not in _DRIVER_FIELDS
+    }
+
+
+def _find_stages(plan: Any) -> Iterator[str]:
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _find_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _find_stages(value)
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """
+    Records the duration of every command sent to MongoDB and logs commands slower than
+    slow_threshold_ms together with their filter, sort or pipeline. A fraction of the slow
+    commands, explain_sample_rate, is explained in a background thread, and the plan is logged
+    with a warning when it scans the whole collection.
+    """
+
+    def __init__(
+        self,
+        slow_threshold_ms: float,
+        explain_sample_rate: float,
+        get_explain_client: Callable[[], pymongo.MongoClient],
+    ):
+        self.slow_threshold_ms = slow_threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self._get_explain_client = get_explain_client
+        self._started_commands: Dict[CommandKey, Tuple[str, BSONDocument]] = {}
+        self._explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Explain")
+        # At most one explain runs at a time, others are skipped rather than queued.
+        self._explain_slot = threading.Semaphore(1)
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        self._started_commands[(event.connection_id, event.request_id)] = (
+            event.database_name,
+            event.command,
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, failed=True)
+
+    def _finish(self, event: Any, failed: bool) -> None:
+        database_name, command = self._started_commands.pop(
+            (event.connection_id, event.request_id), ("", {})
+        )
+        duration_ms = event.duration_micros / 1000
+        MONGO_COMMAND_DURATION_SECONDS.observe(duration_ms / 1000, command=event.command_name)
+
+        if duration_ms < self.slow_threshold_ms:
+            return
+
+        logger.warning(
+            f"Slow MongoDB command {event.command_name} on {database_name} took "
+            f"{duration_ms:.1f} ms{' and failed' if failed else ''}: {_query_shape(command)}"
+        )
+        if (
+            not failed
+            and event.command_name in EXPLAINABLE_COMMANDS
+            and random.random() < self.explain_sample_rate
+            and self._explain_slot.acquire(blocking=False)
+        ):
+            self._explain_executor.submit(self._explain, database_name, command)
+
+    def _explain(self, database_name: str, command: BSONDocument) -> None:
+        try:
+            client = self._get_explain_client()
+            explained = {
+                key: value
+                for key, value in command.items()
+                if key not in _DRIVER_FIELDS and key not in _SESSION_FIELDS
+            }
+            result: Dict[str, Any] = client[database_name].command(
+                {"explain": explained, "verbosity": "queryPlanner"}
+            )
+            stages = set(_find_stages(result.get("queryPlanner", {}).get("winningPlan", {})))
+            log = logger.warning if "COLLSCAN" in stages else logger.info
+            log(
+                f"Query plan of slow MongoDB command {_query_shape(command)} uses stages "
+                f"{', '.join(sorted(stages))}: {result.get('queryPlanner', {}).get('winningPlan')}"
+            )
+        except Exception as e:
+            logger.exception(f"Failed to explain slow MongoDB command because of {e}")
+        finally:
+            self._explain_slot.release()
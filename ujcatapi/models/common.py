@@ -1,13 +1,35 @@
-from typing import Any, Dict
+import asyncio
+import base64
+import binascii
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple
 
 import motor.motor_asyncio
-from bson import ObjectId
+import pymongo
+from bson import ObjectId, Timestamp, json_util
+from pymongo.client_session import ClientSession
 from pymongo.collection import Collection
 from pymongo.database import Database
+from pymongo.monitoring import CommandListener
+from pymongo.read_preferences import _ServerMode, make_read_preference, read_pref_mode_from_name
 
 from ujcatapi import config, dto
+from ujcatapi.exceptions import InvalidPageTokenError
+from ujcatapi.models.command_monitoring import CommandMonitor
+
+logger = logging.getLogger(__name__)
 
 _db = None
+_explain_client: Optional[pymongo.MongoClient] = None
+_connect_task: "Optional[asyncio.Task[None]]" = None
+_is_connected = False
+# Cluster time and operation time of the latest causally consistent session of the current
+# request, or more generally of the current context: every request runs in a task of its own.
+_last_causal_times: ContextVar[Optional[Tuple[Mapping[str, Any], Timestamp]]] = ContextVar(
+    "last_causal_times", default=None
+)
 MONGO_DUPLICATION_ERROR = 11000
 
 BSONDocument = Dict[str, Any]
@@ -20,16 +42,194 @@ async def _get_db() -> Database:
             host=config.MONGODB_URL,
             tz_aware=True,
             maxPoolSize=config.MONGO_MAX_POOL_SIZE,
+            minPoolSize=config.MONGO_MIN_POOL_SIZE,
             retryWrites=False,
+            event_listeners=_get_event_listeners(),
         )
         _db = client.get_database()
 
     return _db
 
 
-async def get_collection(collection_name: str) -> Collection:
+def _get_explain_client() -> pymongo.MongoClient:
+    # Explains run on a plain pymongo client without listeners, so that they are not monitored
+    # themselves and do not take connections from the pool of the Motor client.
+    global _explain_client
+    if _explain_client is None:
+        _explain_client = pymongo.MongoClient(config.MONGODB_URL, maxPoolSize=1)
+
+    return _explain_client
+
+
+def _get_event_listeners() -> List[CommandListener]:
+    if not config.ENABLE_MONGO_COMMAND_MONITORING:
+        return []
+
+    return [
+        CommandMonitor(
+            slow_threshold_ms=config.MONGO_SLOW_QUERY_THRESHOLD_MS,
+            explain_sample_rate=config.MONGO_SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+            get_explain_client=_get_explain_client,
+        )
+    ]
+
+
+async def warm_up_pool() -> None:
+    """
+    Opens config.MONGO_WARM_UP_CONNECTIONS connections of the pool by running as many pings at
+    the same time, since each of them needs a connection of its own. A failure is only logged:
+    the connections are then opened by the first requests instead.
+    """
+    if not config.ENABLE_MONGODB or config.MONGO_WARM_UP_CONNECTIONS <= 0:
+        return
+
+    db = await _get_db()
+    try:
+        await asyncio.gather(
+            *(db.command("ping") for _ in range(config.MONGO_WARM_UP_CONNECTIONS))
+        )
+    except Exception as e:
+        logger.warning(f"Failed to warm up the MongoDB connection pool because of {e}")
+    else:
+        logger.info(f"Opened {config.MONGO_WARM_UP_CONNECTIONS} MongoDB connections")
+
+
+async def is_ready() -> bool:
+    """
+    Tells whether the service can handle requests, i.e. whether connect() has finished and the
+    server still answers a ping within config.MONGO_READINESS_TIMEOUT_SECONDS. Pinging on every
+    check lets the instance be taken out of rotation again when the server becomes unreachable.
+    """
+    if not config.ENABLE_MONGODB:
+        return True
+    if not _is_connected:
+        return False
+
+    db = await _get_db()
+    try:
+        await asyncio.wait_for(db.command("ping"), timeout=config.MONGO_READINESS_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning(f"MongoDB is not reachable because of {e!r}")
+        return False
+    return True
+
+
+async def _connect() -> None:
+    global _is_connected
+    db = await _get_db()
+    while True:
+        try:
+            await asyncio.wait_for(
+                db.command("ping"), timeout=config.MONGO_READINESS_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            logger.warning(f"MongoDB is not reachable yet because of {e}")
+            await asyncio.sleep(config.MONGO_CONNECT_RETRY_INTERVAL_SECONDS)
+        else:
+            break
+
+    await warm_up_pool()
+    _is_connected = True
+    logger.info("Connected to MongoDB")
+
+
+async def connect() -> None:
+    """
+    Creates the client on startup instead of on the first request, and checks in the background
+    that the server is reachable, retrying until it is, and warms up the pool. Until then,
+    is_ready() is False, so that the instance is kept out of rotation rather than failing.
+    """
+    global _connect_task
+    if not config.ENABLE_MONGODB:
+        return
+
+    _connect_task = asyncio.create_task(_connect())
+
+
+async def close() -> None:
+    """
+    Closes the client and its connections. Run on shutdown, after the server has stopped
+    accepting connections and the requests in flight have completed.
+    """
+    global _db, _connect_task, _is_connected
+    if _connect_task is not None:
+        _connect_task.cancel()
+        try:
+            await _connect_task
+        except asyncio.CancelledError:
+            pass
+        _connect_task = None
+
+    _is_connected = False
+    if _db is not None:
+        _db.client.close()
+        _db = None
+
+
+def get_read_preference(operation: str) -> Optional[_ServerMode]:
+    """
+    Returns the read preference of the operation in config.MONGO_READ_PREFERENCES, or None if it
+    reads from the primary.
+    """
+    mode = config.MONGO_READ_PREFERENCES.get(operation, "primary")
+    if mode == "primary":
+        return None
+
+    return make_read_preference(
+        read_pref_mode_from_name(mode),
+        tag_sets=None,
+        max_staleness=config.MONGO_READ_MAX_STALENESS_SECONDS,
+    )
+
+
+def is_read_routing_enabled() -> bool:
+    return any(mode != "primary" for mode in config.MONGO_READ_PREFERENCES.values())
+
+
+async def get_collection(
+    collection_name: str, read_preference: Optional[_ServerMode] = None
+) -> Collection:
     db = await _get_db()
-    return db[collection_name]
+    if read_preference is None:
+        return db[collection_name]
+    return db.get_collection(collection_name, read_preference=read_preference)
+
+
+def _record_causal_times(session: ClientSession) -> None:
+    if session.cluster_time is None or session.operation_time is None:
+        return
+    last_causal_times = _last_causal_times.get()
+    if last_causal_times is None or session.operation_time > last_causal_times[1]:
+        _last_causal_times.set((session.cluster_time, session.operation_time))
+
+
+@asynccontextmanager
+async def causal_session() -> AsyncIterator[Optional[ClientSession]]:
+    """
+    Yields a causally consistent session that continues from the latest session of the current
+    request, so that a read in it from a secondary waits until the secondary has caught up with
+    the writes this request made before. Writes and routed reads run in one to read their own
+    writes.
+
+    None is yielded when all reads go to the primary, which sees every write anyway. Writes made
+    by other requests are not waited for, so that a read does not wait for the latest write of
+    the whole worker.
+    """
+    if not is_read_routing_enabled():
+        yield None
+        return
+
+    db = await _get_db()
+    async with await db.client.start_session(causal_consistency=True) as session:
+        last_causal_times = _last_causal_times.get()
+        if last_causal_times is not None:
+            cluster_time, operation_time = last_causal_times
+            session.advance_cluster_time(cluster_time)
+            session.advance_operation_time(operation_time)
+        try:
+            yield session
+        finally:
+            _record_causal_times(session)
 
 
 def bson_id_to_organization_id(obj_id: ObjectId) -> dto.OrganizationID:
@@ -41,4 +241,65 @@ def bson_id_to_cat_id(obj_id: ObjectId) -> dto.CatID:
 
 
 def _calculate_db_skip_value(page: dto.Page) -> int:
+    if page.number is None:
+        return 0
     return (page.number - 1) * page.size
+
+
+def _encode_page_token(sort: Dict[str, dto.SortOrder], document: BSONDocument) -> dto.PageToken:
+    """
+    Encodes the sort specification and the sort values of the last document of a page into an
+    opaque token. The sort specification is part of the token, so that a token cannot be reused
+    with a different sort order.
+    """
+    payload = {
+        "sort": [[key, int(order)] for key, order in sort.items()],
+        "after": [document[key] for key in sort],
+    }
+    return dto.PageToken(base64.urlsafe_b64encode(json_util.dumps(payload).encode()).decode())
+
+
+def _decode_page_token(
+    token: dto.PageToken, sort: Dict[str, dto.SortOrder], value_types: Mapping[str, type]
+) -> List[Any]:
+    """
+    Tokens are not signed, so the sort values are checked to be of the type of their sort key
+    before they go into a query. Otherwise a client could pass e.g. {"$regex": ...} as a value.
+    """
+    try:
+        payload = json_util.loads(base64.urlsafe_b64decode(token.encode()).decode())
+        token_sort, after = payload["sort"], payload["after"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidPageTokenError("Invalid page token.")
+
+    expected_sort = [[key, int(order)] for key, order in sort.items()]
+    if token_sort != expected_sort or not isinstance(after, list) or len(after) != len(sort):
+        raise InvalidPageTokenError("Page token does not match the requested sort order.")
+
+    for key, value in zip(sort, after):
+        if key not in value_types or type(value) is not value_types[key]:
+            raise InvalidPageTokenError("Invalid page token.")
+
+    return after
+
+
+def _calculate_db_keyset_match(
+    token: dto.PageToken, sort: Dict[str, dto.SortOrder], value_types: Mapping[str, type]
+) -> BSONDocument:
+    """
+    Builds a match for all documents that come after the ones of the page the token was created
+    from. For a sort on (a, b, _id) this is: a > x or (a == x and b > y) or (a == x and b == y
+    and _id > z), with the comparisons reversed for descending sort keys. The sort must end with
+    a unique key for the keyset to be unambiguous.
+    """
+    after = _decode_page_token(token, sort, value_types)
+    sort_keys = list(sort)
+
+    conditions = []
+    for index, (key, order) in enumerate(sort.items()):
+        operator = "$gt" if order == dto.SortOrder.asc else "$lt"
+        condition = dict(zip(sort_keys[:index], after))
+        condition[key] = {operator: after[index]}
+        conditions.append(condition)
+
+    return {"$or": conditions}
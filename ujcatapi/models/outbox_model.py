@@ -0,0 +1,68 @@
+import logging
+from datetime import datetime
+from typing import List, Sequence, Tuple
+
+from bson import ObjectId
+
+from ujcatapi import dto
+from ujcatapi.models.common import BSONDocument, get_collection
+
+_COLLECTION_NAME = "event_outbox"
+
+logger = logging.getLogger(__name__)
+
+
+def new_pending_event(event_name: str, data: dto.JSON, now: datetime) -> BSONDocument:
+    """
+    Returns an event to be stored in the pending_events field of the document it is about, so
+    that the document and the event are written by the same single-document write. The outbox
+    relay publishes it like the events of the outbox collection.
+    """
+    return {"_id": ObjectId(), "event_name": event_name, "data": data, "ctime": now}
+
+
+async def create_events(
+    events: Sequence[Tuple[str, dto.JSON]], now: datetime
+) -> List[dto.OutboxEventID]:
+    """
+    Stores many events, given as (event_name, data) pairs, with a single insert_many, for changes
+    whose document cannot hold them, such as deletes. They are published in the order they are
+    given.
+    """
+    if not events:
+        return []
+
+    collection = await get_collection(_COLLECTION_NAME)
+    result = await collection.insert_many(
+        [{"event_name": event_name, "data": data, "ctime": now} for event_name, data in events]
+    )
+    return [dto.OutboxEventID(str(inserted_id)) for inserted_id in result.inserted_ids]
+
+
+async def find_pending(limit: int) -> List[dto.OutboxEvent]:
+    """
+    Finds the oldest events that have not been published yet, in the order they were stored.
+    """
+    collection = await get_collection(_COLLECTION_NAME)
+    cursor = collection.find({}, sort=[("_id", 1)], limit=limit)
+    return [outbox_event_from_bson(document) async for document in cursor]
+
+
+async def delete_many(event_ids: List[dto.OutboxEventID]) -> int:
+    if not event_ids:
+        return 0
+
+    collection = await get_collection(_COLLECTION_NAME)
+    result = await collection.delete_many(
+        {"_id": {"$in": [ObjectId(event_id) for event_id in event_ids]}}
+    )
+    return result.deleted_count
+
+
+def outbox_event_from_bson(document: BSONDocument) -> dto.OutboxEvent:
+    return dto.OutboxEvent(
+        id=dto.OutboxEventID(str(document["_id"])),
+        event_name=document["event_name"],
+        data=document["data"],
+        ctime=document["ctime"],
+    )
@@ -0,0 +1,63 @@
+import enum
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+_encoder = json.JSONEncoder(
+    ensure_ascii=False,
+    allow_nan=False,
+    separators=(",", ":"),
+    default=_default,
+)
+
+
+def render_json(content: Any) -> bytes:
+    return _encoder.encode(content).encode("utf-8")
+
+
+async def render_ndjson_chunks(
+    contents: AsyncIterator[Any], chunk_size: int
+) -> AsyncIterator[bytes]:
+    """
+    Renders the contents as newline-delimited JSON, joining the lines into chunks of at least
+    chunk_size bytes, except for the last one, so that a large export is not sent one line at a
+    time.
+    """
+    lines = []
+    size = 0
+    async for content in contents:
+        line = render_json(content) + b"\n"
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield b"".join(lines)
+            lines = []
+            size = 0
+
+    if lines:
+        yield b"".join(lines)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for content that is already known to match the response model, e.g. DTOs read
+    from our own database. Returning it from a view skips FastAPI's response_model validation and
+    jsonable_encoder, and datetimes and ObjectIds are encoded directly by a precompiled encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
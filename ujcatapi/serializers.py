@@ -1,12 +1,12 @@
 from typing import Optional, Tuple
 
-from fastapi import Query
+from fastapi import Header, Query
 from fastapi.exceptions import RequestValidationError
 from pydantic import PositiveInt
 from pydantic.error_wrappers import ErrorWrapper
 
 from ujcatapi import dto
-from ujcatapi.constants import PREFIX_TO_MEMBERSHIP_TYPE_MAPPING
+from ujcatapi.constants import NDJSON_MEDIA_TYPE, PREFIX_TO_MEMBERSHIP_TYPE_MAPPING
 
 
 def scope_from_query_param(
@@ -106,14 +106,43 @@ def page_from_query_param(
         title="Page size",
         description=(
             "A positive integer to indicate the number of results to be fetched per page. "
-            "This parameter should be passed together with a page_number value."
+            "This parameter should be passed together with a page_number or page_token value."
+        ),
+    ),
+    page_token: Optional[str] = Query(
+        None,
+        title="Page token",
+        description=(
+            "The next_page_token returned in the metadata of a previous page, to fetch the page "
+            "that follows it. The sort_by value must be the same as for the previous page. "
+            "This parameter should be passed together with a page_size value, instead of a "
+            "page_number value."
         ),
     ),
 ) -> Optional[dto.Page]:
-    if page_number is None and page_size is None:
+    if page_number is None and page_size is None and page_token is None:
         return None
 
+    token = None
+    if page_token is not None:
+        token = dto.PageToken(page_token)
+
     try:
-        return dto.Page(number=page_number, size=page_size)
+        return dto.Page.parse_obj({"number": page_number, "size": page_size, "token": token})
     except ValueError as error:
         raise RequestValidationError(errors=[ErrorWrapper(exc=error, loc=("query.page"))])
+
+
+def stream_from_request_params(
+    stream: bool = Query(
+        False,
+        title="Stream",
+        description=(
+            "Stream the results as newline-delimited JSON, one object per line, instead of "
+            "returning them in a single JSON document. The same can be requested with an "
+            f"'Accept: {NDJSON_MEDIA_TYPE}' header."
+        ),
+    ),
+    accept: Optional[str] = Header(None),
+) -> bool:
+    return stream or (accept is not None and NDJSON_MEDIA_TYPE in accept)
@@ -1,10 +1,14 @@
 import logging
+from typing import Union
 
 from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi.responses import StreamingResponse
 
-from ujcatapi import dto, serializers
+from ujcatapi import config, dto, serializers
+from ujcatapi.constants import NDJSON_MEDIA_TYPE
 from ujcatapi.domains import cat_domain
 from ujcatapi.exceptions import EntityNotFoundError
+from ujcatapi.responses import FastJSONResponse, render_ndjson_chunks
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -26,11 +30,36 @@ async def create_cat(unsaved_cat: dto.UnsavedCat) -> dto.JSON:
     return cat.dict()
 
 
+@router.post("/cats:bulkCreate", response_model=dto.CatBulkCreateResponse)
+async def bulk_create_cats(bulk_create_request: dto.CatBulkCreateRequest) -> FastJSONResponse:
+    """
+    Bulk view for creating many Cats in one request. Every Cat gets its own result, in request
+    order, with status_code 201 and the created Cat, or 409 and an error if the name is taken.
+
+    \f
+    :return:
+    """
+    results = await cat_domain.create_cats(bulk_create_request.cats)
+
+    bulk_create_response = dto.CatBulkCreateResponse.construct(
+        results=[
+            dto.CatBulkCreateResult.construct(status_code=status.HTTP_201_CREATED, cat=result)
+            if isinstance(result, dto.Cat)
+            else dto.CatBulkCreateResult.construct(
+                status_code=status.HTTP_409_CONFLICT, error=str(result)
+            )
+            for result in results
+        ]
+    )
+
+    return FastJSONResponse(bulk_create_response.dict(exclude_none=True))
+
+
 @router.get("/cats/{cat_id}", response_model=dto.Cat, response_model_exclude_unset=True)
 async def get_cat(
     cat_id: dto.CatID = Path(..., title="Cat ID", description="The ID of the Cat to get."),
     scope: dto.Scope = Depends(serializers.scope_from_query_param),
-) -> dto.JSON:
+) -> FastJSONResponse:
     """
     Detail view for getting one Cat by ID.
 
@@ -43,7 +72,26 @@ async def get_cat(
     if not cat:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cat not found.")
 
-    return cat.dict()
+    return FastJSONResponse(cat.dict(exclude_unset=True))
+
+
+@router.post("/cats:batchGet", response_model=dto.CatBatchGetResponse)
+async def batch_get_cats(
+    batch_get_request: dto.CatBatchGetRequest,
+    scope: dto.Scope = Depends(serializers.scope_from_query_param),
+) -> FastJSONResponse:
+    """
+    Batch view for getting many Cats by ID in one request. IDs that are not found, or not in the
+    given scope, are listed in not_found.
+
+    \f
+    :return:
+    """
+    batch_get_response = await cat_domain.find_many_by_ids(
+        cat_ids=batch_get_request.ids, scope=scope
+    )
+
+    return FastJSONResponse(batch_get_response.dict())
 
 
 @router.get(
@@ -58,10 +106,12 @@ async def list_cats(
         serializers.cat_sort_params_from_query_params
     ),
     page: dto.Page = Depends(serializers.page_from_query_param),
-) -> dto.ListResponse[dto.CatSummary]:
+    stream: bool = Depends(serializers.stream_from_request_params),
+) -> Union[FastJSONResponse, StreamingResponse]:
     """
     List view for API Client Summaries.
     API Clients can optionally be filtered by their ID, name, memberships, and secrets.
+    In stream mode, the summaries are returned as newline-delimited JSON without page metadata.
 
     \f
     :return:
@@ -69,16 +119,35 @@ async def list_cats(
 
     cat_filter = dto.CatFilter(scope=scope, **cat_filter.dict(exclude={"scope"}))
 
+    if stream:
+        cat_summaries = await cat_domain.stream_many(
+            cat_filter=cat_filter,
+            cat_sort_params=cat_sort_params,
+            page=page,
+        )
+        return StreamingResponse(
+            render_ndjson_chunks(
+                (cat_summary.dict() async for cat_summary in cat_summaries),
+                chunk_size=config.CAT_STREAM_CHUNK_SIZE_BYTES,
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
     cats = await cat_domain.find_many(
         cat_filter=cat_filter,
         cat_sort_params=cat_sort_params,
         page=page,
     )
 
+    # The summaries come from our own database and already match the response model, so they
+    # are rendered directly instead of being validated again by FastAPI.
     cat_summary_list_response = [cat_summary.dict() for cat_summary in cats.results]
 
-    return dto.ListResponse[dto.CatSummary](
-        results=cat_summary_list_response, metadata=cats.metadata
+    return FastJSONResponse(
+        {
+            "results": cat_summary_list_response,
+            "metadata": cats.metadata.dict(exclude_unset=True),
+        }
     )
 
 
@@ -97,3 +166,24 @@ async def delete_cat(
     is_deleted = await cat_domain.delete_one(cat_id)
     if not is_deleted:
         raise EntityNotFoundError("Cat is not found")
+
+
+@router.post("/cats:bulkDelete", response_model=dto.CatBulkDeleteResponse)
+async def bulk_delete_cats(
+    bulk_delete_request: dto.CatBulkDeleteRequest,
+    scope: dto.Scope = Depends(serializers.scope_from_query_param),
+) -> dto.JSON:
+    """
+    Bulk view for deleting all Cats with one of the given IDs, optionally within a scope. Returns
+    the number of deleted Cats.
+
+    \f
+    :return:
+    """
+    cat_filter = dto.CatFilter(scope=scope)
+
+    deleted_count = await cat_domain.delete_many(
+        cat_filter=cat_filter, cat_ids=bulk_delete_request.ids
+    )
+
+    return {"deleted_count": deleted_count}
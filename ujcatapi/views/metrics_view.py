@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ujcatapi import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", operation_id="metrics_view", include_in_schema=False)
+async def metrics_view() -> PlainTextResponse:
+    """
+    Metrics of this process in the Prometheus text exposition format.
+    """
+    # The charset is appended by the response.
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
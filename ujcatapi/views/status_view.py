@@ -1,6 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
 
 from ujcatapi import config, dto
+from ujcatapi.domains import cat_domain
+from ujcatapi.events import common as events_common
+from ujcatapi.libs import log_queue, log_sanitizer
+from ujcatapi.models import common as models_common
 
 router = APIRouter()
 
@@ -9,6 +13,7 @@ router = APIRouter()
 async def status_view() -> dto.JSON:
     """
     Status view returning the name and version of this service and a link to Swagger documentation.
+    It does not depend on MongoDB, so that it can serve as the liveness probe.
 
     \f
     :return:
@@ -18,4 +23,28 @@ async def status_view() -> dto.JSON:
         "version": config.VERSION,
         "links": [{"href": "/docs", "rel": "documentation", "type": "GET"}],
         "feature_flags": {"ENABLE_FOO": config.ENABLE_FOO, "ENABLE_BAR": config.ENABLE_BAR},
+        "caches": {
+            "cat": cat_domain.get_cat_cache_stats(),
+            "log_sanitizer": log_sanitizer.get_cache_stats(),
+        },
+        "events": events_common.get_event_publisher_stats(),
+        "logging": log_queue.get_stats(),
     }
+
+
+@router.get(
+    "/status/ready", operation_id="readiness_view", response_model=dto.ReadinessViewResponse
+)
+async def readiness_view(response: Response) -> dto.JSON:
+    """
+    Readiness probe. Responds with 503 while the service cannot handle requests, i.e. until it
+    has connected to MongoDB and whenever MongoDB does not answer a ping.
+
+    \f
+    :return:
+    """
+    is_ready = await models_common.is_ready()
+    if not is_ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return {"ready": is_ready}